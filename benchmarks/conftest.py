@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# conftest.py
+
+"""Benchmarks of deNEST's hot paths.
+
+The benchmarks use ``pytest-benchmark`` and run with NEST if it is installed,
+or with the fake backend otherwise (see :mod:`denest.backend`). Set the
+``DENEST_BACKEND`` environment variable to choose the backend explicitly.
+
+Save a baseline with ``make benchmark-save`` and compare to it with ``make
+benchmark``, which fails if the mean time of a benchmark regressed or if no
+baseline was saved. Baselines are machine-specific and aren't committed.
+"""
+
+import pytest
+
+import denest
+
+# Run the benchmarks with the fake backend if NEST isn't installed
+try:
+    import nest
+except ImportError:
+    denest.backend.use("fake")
+    import nest
+
+# Size of the synthetic networks: ``{<id>: <network_tree kwargs>}``
+NETWORK_SIZES = {
+    "small": {"n_layers": 2, "rows": 10, "columns": 10, "n_populations": 2},
+    "large": {"n_layers": 4, "rows": 40, "columns": 40, "n_populations": 2},
+}
+# Size of the single layers created by the layer creation benchmarks, from 10k
+# to 1M units: ``{<id>: <network_tree kwargs>}``
+LAYER_SIZES = {
+    "10k": {"n_layers": 1, "rows": 50, "columns": 100, "n_populations": 2},
+    "100k": {"n_layers": 1, "rows": 250, "columns": 200, "n_populations": 2},
+    "1M": {"n_layers": 1, "rows": 500, "columns": 1000, "n_populations": 2},
+}
+
+
+@pytest.fixture(params=list(NETWORK_SIZES))
+def network_size(request):
+    """Keyword arguments of :func:`trees.network_tree`."""
+    return NETWORK_SIZES[request.param]
+
+
+@pytest.fixture(params=list(LAYER_SIZES))
+def layer_size(request):
+    """Keyword arguments of :func:`trees.network_tree` for a single layer."""
+    return LAYER_SIZES[request.param]
+
+
+@pytest.fixture(autouse=True)
+def reset_kernel():
+    nest.ResetKernel()
+    nest.SetKernelStatus({"overwrite_files": True})
+    yield
+    nest.ResetKernel()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# test_io.py
+
+"""Benchmark saving simulation metadata and loading recorder data."""
+
+import pytest
+
+from denest import ParamsTree, Simulation
+from denest.io.load import iter_chunks, load, load_yaml, metadata_paths
+
+from trees import simulation_tree
+
+
+@pytest.fixture
+def simulation(tmp_path, network_size):
+    sim = Simulation(
+        ParamsTree(simulation_tree(**network_size)), output_dir=str(tmp_path)
+    )
+    sim.run()
+    return sim
+
+
+def test_save_metadata(benchmark, simulation):
+    benchmark(simulation.save_metadata)
+
+
+@pytest.mark.parametrize("recorder_type", ["multimeter", "spike_detector"])
+def test_load(benchmark, simulation, recorder_type):
+    path = next(
+        path
+        for path in metadata_paths(simulation.output_dir)
+        if load_yaml(path)["type"] == recorder_type
+    )
+    data = benchmark(load, path)
+    assert len(data)
+
+
+def test_iter_chunks(benchmark, simulation):
+    path = next(
+        path
+        for path in metadata_paths(simulation.output_dir)
+        if load_yaml(path)["type"] == "multimeter"
+    )
+
+    def mean_potential():
+        total, count = 0.0, 0
+        for chunk in iter_chunks(path, chunksize=10000, usecols=["V_m"]):
+            total += chunk["V_m"].sum()
+            count += len(chunk)
+        return total / count
+
+    assert benchmark(mean_potential) < 0
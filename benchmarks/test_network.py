@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# test_network.py
+
+"""Benchmark building and creating networks."""
+
+import nest
+import numpy as np
+
+from denest import Network, ParamsTree
+from denest.network.layers import Layer
+
+from trees import network_tree, population_names
+
+
+def _network(network_size):
+    return Network(ParamsTree(network_tree(**network_size)))
+
+
+def _layer(network_size):
+    tree = network_tree(**network_size)
+    layer = Layer(
+        "l0", tree["layers"]["l0"]["params"], tree["layers"]["nest_params"]
+    )
+    for population in layer.populations:
+        nest.CopyModel("iaf_psc_alpha", population)
+    return layer
+
+
+def test_network_build(benchmark, network_size):
+    network = benchmark(_network, network_size)
+    assert len(network.layers) == network_size["n_layers"]
+
+
+def test_network_create(benchmark, network_size):
+    def setup():
+        nest.ResetKernel()
+        return (_network(network_size),), {}
+
+    benchmark.pedantic(Network.create, setup=setup, rounds=5)
+
+
+def test_layer_create(benchmark, layer_size):
+    def setup():
+        nest.ResetKernel()
+        return (_layer(layer_size),), {}
+
+    benchmark.pedantic(Layer.create, setup=setup, rounds=3)
+
+
+def test_layer_gids(benchmark, network_size):
+    layer = _layer(network_size)
+    layer.create()
+    population = population_names(0, network_size["n_populations"])[0]
+    locations = [(row, 0) for row in range(network_size["rows"])]
+
+    def gids():
+        layer.gids()
+        for location in locations:
+            layer.gids(population=population, location=location)
+
+    benchmark(gids)
+
+
+def test_layer_set_state(benchmark, network_size):
+    layer = _layer(network_size)
+    layer.create()
+    population = population_names(0, network_size["n_populations"])[0]
+    values = np.linspace(
+        -70.0, -60.0, np.prod(layer.population_shape[population])
+    ).reshape(layer.population_shape[population])
+    benchmark(
+        layer.set_state,
+        nest_params={"V_m": values},
+        population_name=population,
+        from_array=True,
+    )
+
+
+def test_recorders_create(benchmark, network_size):
+    def setup():
+        nest.ResetKernel()
+        network = _network(network_size)
+        for objects in [
+            network.neuron_models.values(),
+            network.recorder_models.values(),
+            network.layers.values(),
+        ]:
+            for obj in objects:
+                obj.create()
+        return (network.population_recorders,), {}
+
+    def create(recorders):
+        for recorder in recorders:
+            recorder.create()
+
+    benchmark.pedantic(create, setup=setup, rounds=5)
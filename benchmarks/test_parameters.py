@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# test_parameters.py
+
+"""Benchmark loading and merging parameter trees."""
+
+import pytest
+
+import denest
+from denest import ParamsTree
+
+from trees import nested_tree, simulation_tree, write_tree_files
+
+
+@pytest.mark.parametrize("n_files", [1, 4])
+def test_load_trees(benchmark, tmp_path, network_size, n_files):
+    path = write_tree_files(
+        tmp_path, simulation_tree(**network_size), n_files=n_files
+    )
+    tree = benchmark(denest.load_trees, path)
+    assert set(tree.children) == {
+        "kernel", "simulation", "session_models", "network"
+    }
+
+
+@pytest.mark.parametrize("depth", [3, 5])
+def test_merge(benchmark, depth):
+    trees = [ParamsTree(nested_tree(depth=depth, offset=i)) for i in range(3)]
+    merged = benchmark(ParamsTree.merge, *trees)
+    assert merged.params["param_0"] == 0
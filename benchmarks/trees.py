@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# trees.py
+
+"""Generators of synthetic parameter trees of configurable size."""
+
+from pathlib import Path
+
+from denest.io.save import save_as_yaml
+
+
+def population_names(layer_index, n_populations):
+    """Return the names of the populations of a layer."""
+    return [f"l{layer_index}_pop{i}" for i in range(n_populations)]
+
+
+def network_tree(n_layers=2, rows=10, columns=10, n_populations=2,
+                 units_per_location=1, mask_radius=2.0):
+    """Return a tree-like dictionary specifying a network.
+
+    The network has ``n_layers`` layers of ``rows`` x ``columns`` locations.
+    Each layer has ``n_populations`` populations of ``iaf_psc_alpha`` neurons
+    with ``units_per_location`` units at each location. Each population
+    projects onto all the populations of the next layer, and each population
+    is recorded by a spike detector and a multimeter.
+
+    Keyword Args:
+        n_layers (int): Number of layers.
+        rows, columns (int): Shape of the layers.
+        n_populations (int): Number of populations in each layer.
+        units_per_location (int): Number of units of each population at each
+            location.
+        mask_radius (float): Radius of the projections' circular mask, in
+            grid units. Controls the number of connections per unit.
+
+    Returns:
+        dict: Tree-like dictionary that can be used to initialize a
+        :class:`denest.Network`.
+    """
+    layers = {
+        "params": {"type": None},
+        "nest_params": {
+            "rows": rows,
+            "columns": columns,
+            "extent": [float(columns), float(rows)],
+            "edge_wrap": True,
+        },
+    }
+    neuron_models = {"params": {"nest_model": "iaf_psc_alpha"}}
+    projections = []
+    for layer_index in range(n_layers):
+        populations = population_names(layer_index, n_populations)
+        layers[f"l{layer_index}"] = {
+            "params": {
+                "populations": {
+                    population: units_per_location for population in populations
+                }
+            }
+        }
+        neuron_models.update({population: {} for population in populations})
+        if layer_index == 0:
+            continue
+        for source_population in population_names(layer_index - 1, n_populations):
+            for target_population in populations:
+                projections.append(
+                    {
+                        "source_layers": [f"l{layer_index - 1}"],
+                        "source_population": source_population,
+                        "target_layers": [f"l{layer_index}"],
+                        "target_population": target_population,
+                        "projection_model": "feedforward",
+                    }
+                )
+    return {
+        "neuron_models": neuron_models,
+        "synapse_models": {
+            "static_synapse_lbl": {"params": {"nest_model": "static_synapse_lbl"}}
+        },
+        "layers": layers,
+        "projection_models": {
+            "params": {"type": "topological"},
+            "nest_params": {
+                "allow_autapses": False,
+                "allow_multapses": False,
+                "allow_oversized_mask": True,
+            },
+            "feedforward": {
+                "nest_params": {
+                    "connection_type": "convergent",
+                    "synapse_model": "static_synapse_lbl",
+                    "mask": {"circular": {"radius": mask_radius}},
+                    "kernel": 0.8,
+                    "weights": 1.0,
+                    "delays": {"uniform": {"min": 1.0, "max": 2.0}},
+                }
+            },
+        },
+        "topology": {"params": {"projections": projections}},
+        "recorder_models": {
+            "nest_params": {
+                "record_to": ["file", "memory"],
+                "withgid": True,
+                "withtime": True,
+            },
+            "multimeter": {
+                "params": {"nest_model": "multimeter"},
+                "nest_params": {"interval": 1.0, "record_from": ["V_m"]},
+            },
+            "spike_detector": {"params": {"nest_model": "spike_detector"}},
+        },
+        "recorders": {
+            "params": {
+                "population_recorders": [
+                    {"layers": None, "populations": None, "model": model}
+                    for model in ["multimeter", "spike_detector"]
+                ],
+            }
+        },
+    }
+
+
+def simulation_tree(n_sessions=2, simulation_time=10.0, **network_kwargs):
+    """Return a tree-like dictionary specifying a full simulation.
+
+    Each session sets the membrane potential of all the units before
+    simulating for ``simulation_time`` ms.
+
+    Keyword Args:
+        n_sessions (int): Number of sessions.
+        simulation_time (float): Duration of each session in ms.
+        **network_kwargs: Passed to :func:`network_tree`.
+
+    Returns:
+        dict: Tree-like dictionary that can be used to initialize a
+        :class:`denest.Simulation`.
+    """
+    n_layers = network_kwargs.get("n_layers", 2)
+    return {
+        "kernel": {
+            "params": {"extension_modules": [], "nest_seed": 1},
+            "nest_params": {
+                "local_num_threads": 1,
+                "resolution": 1.0,
+                "overwrite_files": True,
+            },
+        },
+        "simulation": {
+            "params": {
+                "sessions": [f"session_{i}" for i in range(n_sessions)],
+            }
+        },
+        "session_models": {
+            "params": {"record": True, "simulation_time": simulation_time},
+            **{
+                f"session_{i}": {
+                    "params": {
+                        "unit_changes": [
+                            {
+                                "layers": [f"l{j}" for j in range(n_layers)],
+                                "population_name": None,
+                                "nest_params": {"V_m": -70.0 + i},
+                            }
+                        ]
+                    }
+                }
+                for i in range(n_sessions)
+            },
+        },
+        "network": network_tree(**network_kwargs),
+    }
+
+
+def nested_tree(depth=3, breadth=3, n_params=10, offset=0):
+    """Return a tree-like dictionary with ``breadth ** depth`` leaves.
+
+    Each node has ``n_params`` ``params`` and ``nest_params``. The values are
+    shifted by ``offset`` so that trees generated with different offsets
+    differ everywhere.
+    """
+    node = {
+        "params": {f"param_{i}": i + offset for i in range(n_params)},
+        "nest_params": {f"nest_param_{i}": float(i + offset) for i in range(n_params)},
+    }
+    if depth > 0:
+        for i in range(breadth):
+            node[f"child_{i}"] = nested_tree(
+                depth=depth - 1, breadth=breadth, n_params=n_params, offset=offset
+            )
+    return node
+
+
+def write_tree_files(directory, tree, n_files=None):
+    """Split a tree across YAML files and write the ``tree_paths.yml`` file.
+
+    The tree is split by top-level children, and each of the ``n_files``
+    files (one per top-level child by default) contains a subset of them.
+
+    Args:
+        directory (str or Path): Directory in which the files are written.
+        tree (dict): Tree-like dictionary.
+
+    Keyword Args:
+        n_files (int | None): Number of parameter files.
+
+    Returns:
+        Path: Path to the ``tree_paths.yml`` file, which can be passed to
+        :func:`denest.load_trees`.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    names = list(tree)
+    if n_files is None:
+        n_files = len(names)
+    filenames = []
+    for i in range(n_files):
+        subtree = {name: tree[name] for name in names[i::n_files]}
+        filenames.append(f"tree_{i}.yml")
+        save_as_yaml(directory / filenames[-1], subtree)
+    path = directory / "tree_paths.yml"
+    save_as_yaml(path, filenames)
+    return path
@@ -4,21 +4,29 @@
 
 """deNEST: a declarative frontend for NEST"""
 
+import hashlib
 import logging.config
+import os
+import pickle
 import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from pprint import pformat
 
+from . import backend
 from .__about__ import *
 from .io.load import load_yaml
+from .io.save import atomic_write
 from .network import Network
 from .parameters import ParamsTree
 from .session import Session
 from .simulation import Simulation
+from .sweeps import sweep
 from .utils import misc
 
 __all__ = [
-    "load_trees", "run", "Simulation", "Network", "Session", "ParamsTree"
+    "load_trees", "run", "sweep", "Simulation", "Network", "Session",
+    "ParamsTree"
 ]
 
 logging.config.dictConfig(
@@ -40,8 +48,11 @@ logging.config.dictConfig(
 )
 log = logging.getLogger(__name__)
 
+if os.environ.get(backend.ENVIRONMENT_VARIABLE):
+    backend.use(os.environ[backend.ENVIRONMENT_VARIABLE])
 
-def load_trees(path, *overrides):
+
+def load_trees(path, *overrides, cache_dir=None, n_workers=1):
     """Load a list of parameter files, optionally overriding some values.
 
     Args:
@@ -49,6 +60,17 @@ def load_trees(path, *overrides):
         *overrides (tree-like): Variable number of tree-like parameters that
             should override those from the path. Last in list is applied first.
 
+    Keyword Args:
+        cache_dir (str | None): Directory in which the merged trees are cached.
+            If specified, the merged tree is saved in ``cache_dir`` and loaded
+            from there instead of parsing and merging the parameter files
+            again, for as long as the list of files, their modification time
+            and size and the override trees are unchanged. Ignored if
+            ``None``. (default ``None``)
+        n_workers (int): Number of processes used to read and validate the
+            parameter files concurrently. The files are read sequentially if
+            ``n_workers`` is 1. (default 1)
+
     Returns:
         ParamsTree: The loaded parameter tree with overrides applied.
     """
@@ -61,15 +83,45 @@ def load_trees(path, *overrides):
     rel_path_list = load_yaml(path)
     log.info("Finished loading parameter file paths")
     log.info("Loading parameters files: \n%s", pformat(rel_path_list))
-    return ParamsTree.merge(
-        *[ParamsTree(overrides_tree) for overrides_tree in overrides],
-        *[
-            ParamsTree.read(Path(path.parent, relative_path))
-            for relative_path in rel_path_list
-        ],
+    override_trees = [ParamsTree(overrides_tree) for overrides_tree in overrides]
+    paths = [Path(path.parent, relative_path) for relative_path in rel_path_list]
+    if cache_dir is not None:
+        cache_path = _trees_cache_path(cache_dir, path, paths, override_trees)
+        if cache_path.exists():
+            log.info("Loading merged parameters from cache at %s", cache_path)
+            with open(cache_path, "rb") as f:
+                return ParamsTree(pickle.load(f), name=path, validate=False)
+    if n_workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            mappings = list(executor.map(ParamsTree.read_mapping, paths))
+    else:
+        mappings = [ParamsTree.read_mapping(tree_path) for tree_path in paths]
+    # Merge in the original order of precedence
+    tree = ParamsTree.merge(
+        *override_trees,
+        *[ParamsTree(mapping, validate=False) for mapping in mappings],
         name=path,
     )
     log.info("Finished loading parameter files.")
+    if cache_dir is not None:
+        log.info("Caching merged parameters at %s", cache_path)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(cache_path) as f:
+            pickle.dump(tree.asdict(), f, protocol=pickle.HIGHEST_PROTOCOL)
+    return tree
+
+
+def _trees_cache_path(cache_dir, path, paths, override_trees):
+    """Return the path to the cached merged tree for a list of files."""
+    key = hashlib.sha256()
+    for tree_path in [path] + paths:
+        stat = tree_path.stat()
+        key.update(
+            f"{tree_path.resolve()}:{stat.st_mtime_ns}:{stat.st_size};".encode()
+        )
+    for override_tree in override_trees:
+        key.update(f"{override_tree.content_hash()};".encode())
+    return Path(cache_dir, f"trees-{key.hexdigest()}.pkl")
 
 
 def run(path, *overrides, output_dir=None, input_dir=None):
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# backend/__init__.py
+
+"""Select the NEST implementation used by deNEST.
+
+deNEST imports ``nest`` and ``nest.topology`` lazily, inside the functions
+that call NEST. The module found under those names can therefore be swapped
+before the first simulation is built:
+
+    >>> import denest
+    >>> denest.backend.use('fake')  # Pure-Python/NumPy stand-in for NEST
+
+The backend can also be selected with the ``DENEST_BACKEND`` environment
+variable, which is read when ``denest`` is imported.
+"""
+
+import importlib
+import sys
+
+BACKENDS = ["nest", "fake"]
+
+ENVIRONMENT_VARIABLE = "DENEST_BACKEND"
+
+
+def use(name):
+    """Select the module imported by deNEST as ``nest``.
+
+    Args:
+        name (str): ``'nest'`` (the PyNEST installation) or ``'fake'`` (the
+            stand-in of :mod:`denest.backend.fake`).
+
+    Returns:
+        module: The module imported as ``nest``.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend `{name}`. Should be in {BACKENDS}")
+    fake = importlib.import_module(".fake", __name__)
+    if name == "fake":
+        sys.modules["nest"] = fake
+        sys.modules["nest.topology"] = fake.topology
+    elif sys.modules.get("nest") is fake:
+        # Let the next import find PyNEST
+        del sys.modules["nest"]
+        del sys.modules["nest.topology"]
+    return importlib.import_module("nest")
+
+
+def current():
+    """Return the name of the backend currently imported as ``nest``."""
+    nest = sys.modules.get("nest")
+    if nest is not None and nest.__name__ == f"{__name__}.fake":
+        return "fake"
+    return "nest"
@@ -0,0 +1,747 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# backend/fake/__init__.py
+
+"""Pure-Python/NumPy stand-in for the subset of PyNEST used by deNEST.
+
+The fake kernel implements the calls made by deNEST (``Create``,
+``CopyModel``, ``Get/SetStatus``, ``Connect``, ``GetConnections``,
+``Simulate``, ...) and the ``topology`` calls (``CreateLayer``,
+``GetElement``, ``GetPosition``, ``ConnectLayers``) with the same argument
+and return shapes as NEST 2.x. There are no dynamics: state variables keep
+the value they were set to, spike detectors record Poisson spike trains and
+multimeters sample the current value of the recorded variables. This is
+enough to exercise and benchmark deNEST's own code paths.
+
+Install it with :func:`denest.backend.use`.
+"""
+
+import bisect
+import copy
+import math
+from pathlib import Path
+
+import numpy as np
+
+__all__ = [
+    "NESTError",
+    "ResetKernel",
+    "ResetNetwork",
+    "SetKernelStatus",
+    "GetKernelStatus",
+    "Install",
+    "version",
+    "Models",
+    "CopyModel",
+    "SetDefaults",
+    "GetDefaults",
+    "Create",
+    "GetStatus",
+    "SetStatus",
+    "GetNodes",
+    "GetLeaves",
+    "Connect",
+    "GetConnections",
+    "Simulate",
+    "topology",
+]
+
+VERSION = "NEST 2.20.0 (deNEST fake backend)"
+
+# Rate (Hz) of the Poisson spike trains recorded by spike detectors
+FAKE_FIRING_RATE = 10.0
+
+_RECORDER_DEFAULTS = {
+    "record_to": ["memory"],
+    "withtime": True,
+    "withgid": True,
+    "label": "",
+    "origin": 0.0,
+    "start": 0.0,
+    "stop": math.inf,
+    "close_on_reset": True,
+    "n_events": 0,
+}
+
+_STIMULATOR_DEFAULTS = {
+    "origin": 0.0,
+    "start": 0.0,
+    "stop": math.inf,
+}
+
+# {<model>: (<element_type>, <defaults>, <recordables>)}
+_BUILTIN_MODELS = {
+    "iaf_psc_alpha": (
+        "neuron",
+        {"V_m": -70.0, "E_L": -70.0, "V_th": -55.0, "C_m": 250.0,
+         "tau_m": 10.0, "I_e": 0.0},
+        ["V_m"],
+    ),
+    "iaf_cond_alpha": (
+        "neuron",
+        {"V_m": -70.0, "E_L": -70.6, "V_th": -55.0, "C_m": 250.0,
+         "g_ex": 0.0, "g_in": 0.0, "g_L": 16.6, "I_e": 0.0},
+        ["V_m", "g_ex", "g_in"],
+    ),
+    "iaf_cond_exp": (
+        "neuron",
+        {"V_m": -70.0, "E_L": -70.0, "V_th": -55.0, "C_m": 250.0,
+         "g_ex": 0.0, "g_in": 0.0, "g_L": 16.6, "I_e": 0.0},
+        ["V_m", "g_ex", "g_in"],
+    ),
+    "ht_neuron": (
+        "neuron",
+        {"V_m": -70.0, "theta": -51.0, "theta_eq": -51.0, "tau_theta": 2.0,
+         "tau_spike": 1.75, "tau_m": 16.0, "g_KL": 1.0, "g_NaL": 0.2,
+         "E_rev_NaP": 55.0, "g_peak_NaP": 1.0, "g_peak_h": 1.0,
+         "g_peak_T": 1.0, "g_peak_KNa": 1.0, "g_peak_AMPA": 0.1,
+         "g_peak_NMDA": 0.075, "g_peak_GABA_A": 0.33, "g_peak_GABA_B": 0.0132,
+         "instant_unblock_NMDA": False, "S_act_NMDA": 0.081,
+         "V_act_NMDA": -25.57,
+         "receptor_types": {"AMPA": 1, "NMDA": 2, "GABA_A": 3, "GABA_B": 4}},
+        ["V_m", "theta", "g_AMPA", "g_NMDA", "g_GABA_A", "g_GABA_B"],
+    ),
+    "parrot_neuron": ("neuron", {}, []),
+    "poisson_generator": (
+        "stimulator", {"rate": 0.0, **_STIMULATOR_DEFAULTS}, []
+    ),
+    "spike_generator": (
+        "stimulator", {"spike_times": [], **_STIMULATOR_DEFAULTS}, []
+    ),
+    "dc_generator": (
+        "stimulator", {"amplitude": 0.0, **_STIMULATOR_DEFAULTS}, []
+    ),
+    "multimeter": (
+        "recorder",
+        {**_RECORDER_DEFAULTS, "record_from": [], "interval": 1.0,
+         "file_extension": "dat"},
+        [],
+    ),
+    "spike_detector": (
+        "recorder", {**_RECORDER_DEFAULTS, "file_extension": "gdf"}, []
+    ),
+    "weight_recorder": (
+        "recorder", {**_RECORDER_DEFAULTS, "file_extension": "csv"}, []
+    ),
+    "static_synapse": ("synapse", {"weight": 1.0, "delay": 1.0}, []),
+    "static_synapse_lbl": (
+        "synapse", {"weight": 1.0, "delay": 1.0, "synapse_label": -1}, []
+    ),
+    "ht_synapse": (
+        "synapse",
+        {"weight": 1.0, "delay": 1.0, "tau_P": 500.0, "delta_P": 0.125,
+         "P": 1.0},
+        [],
+    ),
+    "stdp_synapse": (
+        "synapse",
+        {"weight": 1.0, "delay": 1.0, "tau_plus": 20.0, "lambda": 0.01,
+         "alpha": 1.0, "mu_plus": 1.0, "mu_minus": 1.0, "Wmax": 100.0},
+        [],
+    ),
+}
+
+# Synapse parameters that are stored per connection rather than per model
+_CONNECTION_KEYS = ["weight", "delay"]
+
+
+class NESTError(Exception):
+    """Raised by the fake backend where NEST would raise a ``NESTError``."""
+
+    pass
+
+
+class _Model:
+    """A (builtin or copied) model."""
+
+    def __init__(self, name, type_id, element_type, defaults, recordables):
+        self.name = name
+        self.type_id = type_id
+        self.element_type = element_type
+        self.defaults = defaults
+        self.recordables = recordables
+
+
+class _Block:
+    """A contiguous range of nodes created by a single call."""
+
+    def __init__(self, first, n, model):
+        self.first = first
+        self.n = n
+        self.model = model
+        # Snapshot of the model defaults at creation
+        self.defaults = copy.deepcopy(model.defaults)
+        # {<gid>: {<key>: <value>}} for values that differ from the defaults
+        self.status = {}
+
+
+class _Kernel:
+    """State of the fake NEST kernel."""
+
+    def __init__(self):
+        self.status = {
+            "time": 0.0,
+            "resolution": 0.1,
+            "local_num_threads": 1,
+            "total_num_virtual_procs": 1,
+            "data_path": "",
+            "data_prefix": "",
+            "overwrite_files": False,
+            "print_time": False,
+            "grng_seed": 0,
+            "rng_seeds": (1,),
+        }
+        self.models = {
+            name: _Model(name, name, element_type, copy.deepcopy(defaults),
+                         list(recordables))
+            for name, (element_type, defaults, recordables)
+            in _BUILTIN_MODELS.items()
+        }
+        self.blocks = []
+        self.block_starts = []
+        self.next_gid = 1
+        # Connections are stored as lists of array chunks
+        self.conn_chunks = []
+        self.conn_status = {}  # {<connection_index>: {<key>: <value>}}
+        # {<recorder_gid>: {<column>: list of arrays}}
+        self.events = {}
+        # Files opened by recorders since the last reset
+        self.open_files = set()
+        self.layers = {}
+        self.rng = np.random.RandomState(0)
+
+    # Nodes
+
+    def create(self, model, n):
+        if model not in self.models:
+            raise NESTError(f"UnknownModelName: {model}")
+        block = _Block(self.next_gid, n, self.models[model])
+        self.blocks.append(block)
+        self.block_starts.append(block.first)
+        self.next_gid += n
+        return tuple(range(block.first, block.first + n))
+
+    def block(self, gid):
+        i = bisect.bisect_right(self.block_starts, gid) - 1
+        if i < 0 or gid >= self.next_gid:
+            raise NESTError(f"UnknownNode: {gid}")
+        return self.blocks[i]
+
+    def node_status(self, gid):
+        block = self.block(gid)
+        status = {
+            **block.defaults,
+            **block.status.get(gid, {}),
+            "global_id": gid,
+            "model": block.model.name,
+            "element_type": block.model.element_type,
+        }
+        if gid in self.layers:
+            status["topology"] = self.layers[gid].topology()
+        if block.model.element_type == "recorder":
+            status["events"] = self.get_events(gid)
+            status["n_events"] = len(status["events"].get("times", ()))
+        return status
+
+    def get_node_value(self, gid, key):
+        if key == "model":
+            return self.block(gid).model.name
+        if key in ("events", "n_events", "topology", "global_id",
+                   "element_type"):
+            return self.node_status(gid)[key]
+        block = self.block(gid)
+        if gid in block.status and key in block.status[gid]:
+            return block.status[gid][key]
+        try:
+            return block.defaults[key]
+        except KeyError:
+            raise NESTError(f"DictError: unknown key '{key}' for node {gid}")
+
+    def set_node_status(self, gid, params):
+        block = self.block(gid)
+        params = dict(params)
+        if "n_events" in params:
+            if params.pop("n_events") != 0:
+                raise NESTError("n_events can only be set to 0")
+            self.events.pop(gid, None)
+        block.status.setdefault(gid, {}).update(params)
+
+    # Connections
+
+    def add_connections(self, sources, targets, synapse_model, weights, delays):
+        n = len(sources)
+        if not n:
+            return
+        self.conn_chunks.append({
+            "source": np.asarray(sources, dtype=np.int64),
+            "target": np.asarray(targets, dtype=np.int64),
+            "synapse_model": np.full(n, synapse_model, dtype=object),
+            "weight": np.broadcast_to(
+                np.asarray(weights, dtype=float), (n,)
+            ).copy(),
+            "delay": np.broadcast_to(
+                np.asarray(delays, dtype=float), (n,)
+            ).copy(),
+        })
+
+    def connections(self):
+        if not self.conn_chunks:
+            return {
+                "source": np.zeros(0, dtype=np.int64),
+                "target": np.zeros(0, dtype=np.int64),
+                "synapse_model": np.zeros(0, dtype=object),
+                "weight": np.zeros(0),
+                "delay": np.zeros(0),
+            }
+        if len(self.conn_chunks) > 1:
+            self.conn_chunks = [{
+                key: np.concatenate([chunk[key] for chunk in self.conn_chunks])
+                for key in self.conn_chunks[0]
+            }]
+        return self.conn_chunks[0]
+
+    # Recording
+
+    def get_events(self, gid):
+        return {
+            column: np.concatenate(chunks)
+            for column, chunks in self.events.get(gid, {}).items()
+        }
+
+    def record(self, gid, columns):
+        """Store recorded events in memory and/or in files."""
+        status = self.node_status(gid)
+        n = len(columns["times"])
+        if not n:
+            return
+        if "memory" in status["record_to"]:
+            events = self.events.setdefault(gid, {})
+            for column, values in columns.items():
+                events.setdefault(column, []).append(values)
+        if "file" in status["record_to"]:
+            self.write(gid, status, columns)
+
+    def filenames(self, gid, status):
+        """Return the paths of the per-virtual-process files of a recorder."""
+        n_vp = self.status["local_num_threads"]
+        n_digits = len(str(n_vp))
+        label = status["label"] if status["label"] else status["model"]
+        return [
+            Path(
+                self.status["data_path"],
+                self.status["data_prefix"]
+                + f"{label}-{gid}-{str(vp).zfill(n_digits)}."
+                + status["file_extension"],
+            )
+            for vp in range(n_vp)
+        ]
+
+    def open(self, gid, status):
+        """Create the recorder's files if they are not open yet."""
+        for path in self.filenames(gid, status):
+            if path not in self.open_files:
+                if path.exists() and not self.status["overwrite_files"]:
+                    raise NESTError(
+                        f"IOError: the file {path} already exists and "
+                        f"overwriting is disabled"
+                    )
+                path.write_text("")
+                self.open_files.add(path)
+
+    def write(self, gid, status, columns):
+        """Append events to the per-virtual-process files of a recorder."""
+        n_vp = self.status["local_num_threads"]
+        value_columns = [
+            column for column in columns if column not in ("senders", "times")
+        ]
+        for vp, path in enumerate(self.filenames(gid, status)):
+            mask = columns["senders"] % n_vp == vp
+            rows = [columns["senders"][mask], columns["times"][mask]] + [
+                columns[column][mask] for column in value_columns
+            ]
+            # As in NEST 2.x, every field is followed by a tab, including the
+            # last one of each line
+            with path.open("at") as f:
+                for values in zip(*rows):
+                    f.write(
+                        "".join(
+                            [f"{int(values[0])}\t"]
+                            + [f"{value:.3f}\t" for value in values[1:]]
+                        ) + "\n"
+                    )
+
+    def simulate(self, duration):
+        t_start = self.status["time"]
+        t_stop = t_start + duration
+        conns = self.connections()
+        for block in self.blocks:
+            if block.model.element_type != "recorder":
+                continue
+            for gid in range(block.first, block.first + block.n):
+                status = self.node_status(gid)
+                if "file" in status["record_to"]:
+                    self.open(gid, status)
+                start = max(t_start, status["origin"] + status["start"])
+                stop = min(t_stop, status["origin"] + status["stop"])
+                if stop <= start:
+                    continue
+                if block.model.type_id == "spike_detector":
+                    senders = np.unique(conns["source"][conns["target"] == gid])
+                    self.record(gid, self.spikes(senders, start, stop))
+                elif block.model.type_id == "multimeter":
+                    targets = np.unique(conns["target"][conns["source"] == gid])
+                    self.record(gid, self.samples(targets, status, start, stop))
+        self.status["time"] = t_stop
+
+    def spikes(self, senders, start, stop):
+        rate = FAKE_FIRING_RATE / 1000.0
+        counts = self.rng.poisson(rate * (stop - start), size=len(senders))
+        return {
+            "senders": np.repeat(senders, counts),
+            "times": np.round(
+                self.rng.uniform(start, stop, size=int(counts.sum())),
+                decimals=1,
+            ),
+        }
+
+    def samples(self, targets, status, start, stop):
+        interval = status["interval"]
+        times = np.arange(
+            math.floor(start / interval) * interval + interval, stop + 1e-9,
+            interval,
+        )
+        columns = {
+            "senders": np.tile(targets, len(times)),
+            "times": np.repeat(times, len(targets)),
+        }
+        for variable in status["record_from"]:
+            values = np.array(
+                [self.get_node_value(int(gid), variable) for gid in targets],
+                dtype=float,
+            )
+            columns[variable] = np.tile(values, len(times))
+        return columns
+
+
+_kernel = _Kernel()
+
+
+def _gids(nodes):
+    """Return a list of GIDs from a GID, a tuple of GIDs or a numpy array."""
+    if isinstance(nodes, (int, np.integer)):
+        return [int(nodes)]
+    return [int(gid) for gid in nodes]
+
+
+def _is_connections(nodes):
+    return len(nodes) and isinstance(nodes[0], _Connection)
+
+
+class _Connection(tuple):
+    """Connection identifier: ``(source, target, thread, synapse_id, port)``"""
+
+    __slots__ = ()
+
+
+# Kernel
+
+
+def ResetKernel():
+    """Reset the fake kernel."""
+    global _kernel  # pylint: disable=global-statement,invalid-name
+    _kernel = _Kernel()
+
+
+def ResetNetwork():
+    """Reset the state variables of all nodes and close recorder files."""
+    for block in _kernel.blocks:
+        state_keys = block.model.recordables
+        for status in block.status.values():
+            for key in state_keys:
+                status.pop(key, None)
+    _kernel.open_files = set()
+
+
+def SetKernelStatus(params):
+    """Set kernel parameters."""
+    params = dict(params)
+    if "rng_seeds" in params:
+        params["rng_seeds"] = tuple(params["rng_seeds"])
+        _kernel.rng = np.random.RandomState(params["rng_seeds"][0] % 2**32)
+    if "local_num_threads" in params:
+        params["total_num_virtual_procs"] = params["local_num_threads"]
+    if "time" in params:
+        raise NESTError("The kernel time can't be set.")
+    _kernel.status.update(params)
+
+
+def GetKernelStatus(keys=None):
+    """Return kernel parameters."""
+    status = {
+        **_kernel.status,
+        "network_size": _kernel.next_gid,
+        "num_connections": len(_kernel.connections()["source"]),
+    }
+    if keys is None:
+        return status
+    if isinstance(keys, str):
+        return status[keys]
+    return tuple(status[key] for key in keys)
+
+
+def Install(module_name):
+    """Extension modules can't be installed in the fake backend."""
+    raise NESTError(
+        f"DynamicModuleManagementError in Install: Module '{module_name}' "
+        f"could not be opened.\nThe dynamic loader returned the following "
+        f"error: 'file not found'."
+    )
+
+
+def version():
+    """Return the version string."""
+    return VERSION
+
+
+# Models
+
+
+def Models():
+    """Return the names of all available models."""
+    return tuple(sorted(_kernel.models))
+
+
+def CopyModel(existing, new, params=None):
+    """Copy a model and optionally change its defaults."""
+    if existing not in _kernel.models:
+        raise NESTError(f"UnknownModelName: {existing}")
+    if new in _kernel.models:
+        raise NESTError(f"NewModelNameExists: {new}")
+    model = _kernel.models[existing]
+    _kernel.models[new] = _Model(
+        new,
+        model.type_id,
+        model.element_type,
+        {**copy.deepcopy(model.defaults), **(params or {})},
+        list(model.recordables),
+    )
+
+
+def SetDefaults(model, params, val=None):
+    """Change the defaults of a model."""
+    if val is not None:
+        params = {params: val}
+    if model not in _kernel.models:
+        raise NESTError(f"UnknownModelName: {model}")
+    _kernel.models[model].defaults.update(params)
+
+
+def GetDefaults(model, keys=None):
+    """Return the defaults of a model."""
+    if model not in _kernel.models:
+        raise NESTError(f"UnknownModelName: {model}")
+    model = _kernel.models[model]
+    defaults = {
+        **model.defaults,
+        "model": model.name,
+        "type_id": model.type_id,
+        "element_type": model.element_type,
+        "recordables": tuple(model.recordables),
+    }
+    if keys is None:
+        return defaults
+    if isinstance(keys, str):
+        return defaults[keys]
+    return tuple(defaults[key] for key in keys)
+
+
+# Nodes
+
+
+def Create(model, n=1, params=None):
+    """Create ``n`` nodes of a model."""
+    gids = _kernel.create(model, n)
+    if params is not None:
+        SetStatus(gids, params)
+    return gids
+
+
+def GetStatus(nodes, keys=None):
+    """Return the status of nodes or connections."""
+    if _is_connections(nodes):
+        return _get_connection_status(nodes, keys)
+    gids = _gids(nodes)
+    if keys is None:
+        return tuple(_kernel.node_status(gid) for gid in gids)
+    if isinstance(keys, str):
+        return tuple(_kernel.get_node_value(gid, keys) for gid in gids)
+    return tuple(
+        tuple(_kernel.get_node_value(gid, key) for key in keys) for gid in gids
+    )
+
+
+def SetStatus(nodes, params, val=None):
+    """Set the status of nodes or connections.
+
+    ``params`` is a dictionary applied to all nodes, or a list of
+    dictionaries (one per node). If ``val`` is given, ``params`` is a single
+    parameter name and ``val`` its value (or a list of values, one per node).
+    """
+    if _is_connections(nodes):
+        return _set_connection_status(nodes, params, val=val)
+    gids = _gids(nodes)
+    if val is not None:
+        if isinstance(val, (list, tuple, np.ndarray)) and len(val) == len(gids):
+            params = [{params: v} for v in val]
+        else:
+            params = {params: val}
+    if isinstance(params, dict):
+        params = [params] * len(gids)
+    if len(params) != len(gids):
+        raise NESTError(
+            "TypeMismatch: the number of status dictionaries must match the "
+            "number of nodes"
+        )
+    for gid, node_params in zip(gids, params):
+        _kernel.set_node_status(gid, node_params)
+
+
+def GetNodes(subnets):
+    """Return the GIDs of the nodes of each layer."""
+    return tuple(
+        _kernel.layers[gid].gids for gid in _gids(subnets)
+    )
+
+
+def GetLeaves(subnets):
+    """Return the GIDs of the nodes of each layer."""
+    return GetNodes(subnets)
+
+
+# Connections
+
+
+def Connect(pre, post, conn_spec=None, syn_spec=None):
+    """Connect nodes.
+
+    Supports the ``'all_to_all'`` (default) and ``'one_to_one'`` rules.
+    ``syn_spec`` is a model name or a dictionary with a ``'model'`` key and
+    optional ``'weight'`` and ``'delay'`` keys. Weights and delays are
+    scalars or arrays with one value per connection.
+    """
+    pre = np.asarray(_gids(pre), dtype=np.int64)
+    post = np.asarray(_gids(post), dtype=np.int64)
+    if isinstance(conn_spec, dict):
+        rule = conn_spec["rule"]
+    else:
+        rule = conn_spec or "all_to_all"
+    if syn_spec is None:
+        syn_spec = {}
+    elif isinstance(syn_spec, str):
+        syn_spec = {"model": syn_spec}
+    model = syn_spec.get("model", "static_synapse")
+    if model not in _kernel.models:
+        raise NESTError(f"UnknownSynapseType: {model}")
+    defaults = _kernel.models[model].defaults
+    if rule == "one_to_one":
+        if len(pre) != len(post):
+            raise NESTError(
+                "DimensionMismatch: sources and targets must have the same "
+                "size for the one_to_one rule"
+            )
+        sources, targets = pre, post
+    elif rule == "all_to_all":
+        sources = np.repeat(pre, len(post))
+        targets = np.tile(post, len(pre))
+    else:
+        raise NESTError(f"BadProperty: unsupported connection rule '{rule}'")
+    _kernel.add_connections(
+        sources,
+        targets,
+        model,
+        syn_spec.get("weight", defaults.get("weight", 1.0)),
+        syn_spec.get("delay", defaults.get("delay", 1.0)),
+    )
+
+
+def GetConnections(source=None, target=None, synapse_model=None):
+    """Return the identifiers of the matching connections."""
+    conns = _kernel.connections()
+    mask = np.ones(len(conns["source"]), dtype=bool)
+    if source is not None:
+        mask &= np.isin(conns["source"], _gids(source))
+    if target is not None:
+        mask &= np.isin(conns["target"], _gids(target))
+    if synapse_model is not None:
+        mask &= conns["synapse_model"] == synapse_model
+    return tuple(
+        _Connection((int(conns["source"][i]), int(conns["target"][i]), 0, 0,
+                     int(i)))
+        for i in np.flatnonzero(mask)
+    )
+
+
+def _connection_value(index, key):
+    conns = _kernel.connections()
+    if key in ("source", "target", "weight", "delay"):
+        value = conns[key][index]
+        return float(value) if key in _CONNECTION_KEYS else int(value)
+    if key == "synapse_model":
+        return conns["synapse_model"][index]
+    status = _kernel.conn_status.get(index, {})
+    if key in status:
+        return status[key]
+    return _kernel.models[conns["synapse_model"][index]].defaults[key]
+
+
+def _get_connection_status(connections, keys):
+    indices = [connection[4] for connection in connections]
+    if keys is None:
+        conns = _kernel.connections()
+        return tuple(
+            {
+                **_kernel.models[conns["synapse_model"][i]].defaults,
+                **_kernel.conn_status.get(i, {}),
+                **{key: _connection_value(i, key)
+                   for key in ("source", "target", "weight", "delay",
+                               "synapse_model")},
+            }
+            for i in indices
+        )
+    if isinstance(keys, str):
+        return tuple(_connection_value(i, keys) for i in indices)
+    return tuple(
+        tuple(_connection_value(i, key) for key in keys) for i in indices
+    )
+
+
+def _set_connection_status(connections, params, val=None):
+    indices = [connection[4] for connection in connections]
+    if val is not None:
+        if isinstance(val, (list, tuple, np.ndarray)):
+            params = [{params: v} for v in val]
+        else:
+            params = {params: val}
+    if isinstance(params, dict):
+        params = [params] * len(indices)
+    conns = _kernel.connections()
+    for i, conn_params in zip(indices, params):
+        for key, value in conn_params.items():
+            if key in _CONNECTION_KEYS:
+                conns[key][i] = value
+            else:
+                _kernel.conn_status.setdefault(i, {})[key] = value
+
+
+# Simulation
+
+
+def Simulate(duration):
+    """Advance the kernel time and record events."""
+    if duration < 0:
+        raise NESTError("BadParameter: the simulation time must be positive")
+    _kernel.simulate(float(duration))
+
+
+# Imported last: the topology module uses the kernel defined above
+from . import topology  # noqa: E402 pylint: disable=wrong-import-position
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# backend/fake/topology.py
+
+"""Stand-in for the ``nest.topology`` module (grid layers only)."""
+
+import numpy as np
+
+__all__ = [
+    "CreateLayer",
+    "GetElement",
+    "GetPosition",
+    "ConnectLayers",
+    "GetTargetNodes",
+]
+
+LAYER_MODEL = "topology_layer_grid"
+
+
+def _fake():
+    # Deferred import: the parent module imports this one
+    from .. import fake
+
+    return fake
+
+
+class _Layer:
+    """A grid layer and the positions of its elements."""
+
+    def __init__(self, gid, rows, columns, elements, extent, center, edge_wrap):
+        self.gid = gid
+        self.rows = rows
+        self.columns = columns
+        self.extent = tuple(float(e) for e in extent)
+        self.center = tuple(float(c) for c in center)
+        self.edge_wrap = edge_wrap
+        self.elements = elements
+        gids, rows_, cols_ = [], [], []
+        # Nodes are created model by model, column-major within each model
+        for model, number in elements:
+            model_gids = np.array(
+                _fake().Create(model, number * rows * columns), dtype=np.int64
+            )
+            cols, rws, _ = np.meshgrid(
+                np.arange(columns), np.arange(rows), np.arange(number),
+                indexing="ij",
+            )
+            gids.append(model_gids)
+            rows_.append(rws.ravel())
+            cols_.append(cols.ravel())
+        self.gids_array = np.concatenate(gids)
+        self.row_array = np.concatenate(rows_)
+        self.col_array = np.concatenate(cols_)
+        self.gids = tuple(int(gid) for gid in self.gids_array)
+        self.first = int(self.gids_array.min())
+        self._positions = np.stack(
+            [self.x(self.col_array), self.y(self.row_array)], axis=1
+        )
+
+    def x(self, col):
+        dx = self.extent[0] / self.columns
+        return self.center[0] - self.extent[0] / 2 + (col + 0.5) * dx
+
+    def y(self, row):
+        dy = self.extent[1] / self.rows
+        return self.center[1] + self.extent[1] / 2 - (row + 0.5) * dy
+
+    def positions(self, gids):
+        return self._positions[np.asarray(gids) - self.first]
+
+    def topology(self):
+        return {
+            "rows": self.rows,
+            "columns": self.columns,
+            "extent": self.extent,
+            "center": self.center,
+            "edge_wrap": self.edge_wrap,
+            "depth": sum(number for _, number in self.elements),
+        }
+
+    def displacement(self, source_pos, target_pos):
+        delta = target_pos - source_pos
+        if self.edge_wrap:
+            extent = np.array(self.extent)
+            delta = (delta + extent / 2) % extent - extent / 2
+        return delta
+
+
+def _parse_elements(elements):
+    """Return a list of ``(model, number)`` tuples."""
+    if isinstance(elements, str):
+        return [(elements, 1)]
+    elements = list(elements)
+    parsed = []
+    while elements:
+        model = elements.pop(0)
+        number = 1
+        if elements and not isinstance(elements[0], str):
+            number = int(elements.pop(0))
+        parsed.append((model, number))
+    return parsed
+
+
+def _layer(gid):
+    layers = _fake()._kernel.layers
+    gid = gid[0] if not isinstance(gid, (int, np.integer)) else gid
+    if gid not in layers:
+        raise _fake().NESTError(f"LayerExpected: node {gid} is not a layer")
+    return layers[int(gid)]
+
+
+def _layer_of(gid):
+    for layer in _fake()._kernel.layers.values():
+        if layer.first <= gid < layer.first + len(layer.gids):
+            return layer
+    raise _fake().NESTError(f"Node {gid} is not a layer element")
+
+
+def CreateLayer(specs):
+    """Create a grid layer. Return ``(<layer_gid>,)``."""
+    fake = _fake()
+    kernel = fake._kernel
+    if LAYER_MODEL not in kernel.models:
+        kernel.models[LAYER_MODEL] = fake._Model(
+            LAYER_MODEL, LAYER_MODEL, "subnet", {}, []
+        )
+    if "rows" not in specs or "columns" not in specs:
+        raise fake.NESTError("Only grid layers are supported.")
+    (gid,) = kernel.create(LAYER_MODEL, 1)
+    kernel.layers[gid] = _Layer(
+        gid,
+        int(specs["rows"]),
+        int(specs["columns"]),
+        _parse_elements(specs["elements"]),
+        specs.get("extent", (1.0, 1.0)),
+        specs.get("center", (0.0, 0.0)),
+        specs.get("edge_wrap", False),
+    )
+    return (gid,)
+
+
+def GetElement(layers, locations):
+    """Return the GIDs at a ``(column, row)`` grid location."""
+    layer = _layer(layers)
+    col, row = locations
+    mask = (layer.col_array == col) & (layer.row_array == row)
+    return tuple(sorted(int(gid) for gid in layer.gids_array[mask]))
+
+
+def GetPosition(nodes):
+    """Return the ``(x, y)`` position of layer elements."""
+    if isinstance(nodes, (int, np.integer)):
+        nodes = (nodes,)
+    nodes = np.asarray(nodes, dtype=np.int64)
+    if not len(nodes):
+        return ()
+    layer = _layer_of(int(nodes[0]))
+    return tuple(tuple(float(v) for v in pos) for pos in layer.positions(nodes))
+
+
+def _value(spec, distance, rng, n):
+    """Evaluate a kernel, weight or delay specification."""
+    if not isinstance(spec, dict):
+        return np.full(n, float(spec))
+    (name, params), = spec.items()
+    if name == "gaussian":
+        return params.get("p_center", 1.0) * np.exp(
+            -(distance - params.get("mean", 0.0)) ** 2
+            / (2 * params["sigma"] ** 2)
+        ) + params.get("c", 0.0)
+    if name == "uniform":
+        return rng.uniform(params["min"], params["max"], size=n)
+    if name == "linear":
+        return params.get("c", 0.0) + params.get("a", 1.0) * distance
+    raise _fake().NESTError(f"Unsupported parameter type `{name}`")
+
+
+def _in_mask(mask, delta):
+    if mask is None:
+        return np.ones(len(delta), dtype=bool)
+    (name, params), = mask.items()
+    if name == "circular":
+        return np.hypot(delta[:, 0], delta[:, 1]) <= params["radius"]
+    if name == "rectangular":
+        lower_left = np.asarray(params["lower_left"])
+        upper_right = np.asarray(params["upper_right"])
+        return np.all((delta >= lower_left) & (delta <= upper_right), axis=1)
+    raise _fake().NESTError(f"Unsupported mask type `{name}`")
+
+
+def ConnectLayers(pre, post, projection):
+    """Connect two layers following a topological projection dictionary."""
+    fake = _fake()
+    kernel = fake._kernel
+    source_layer, target_layer = _layer(pre), _layer(post)
+    sources = np.array(source_layer.gids_array)
+    targets = np.array(target_layer.gids_array)
+    if "sources" in projection:
+        model = projection["sources"]["model"]
+        sources = sources[np.array(fake.GetStatus(sources, "model")) == model]
+    if "targets" in projection:
+        model = projection["targets"]["model"]
+        targets = targets[np.array(fake.GetStatus(targets, "model")) == model]
+    synapse_model = projection.get("synapse_model", "static_synapse")
+    if synapse_model not in kernel.models:
+        raise fake.NESTError(f"UnknownSynapseType: {synapse_model}")
+    # Divergent: draw targets for each source. Convergent: the reverse.
+    drivers, pool = sources, targets
+    driver_layer, pool_layer = source_layer, target_layer
+    if projection["connection_type"] == "convergent":
+        drivers, pool = targets, sources
+        driver_layer, pool_layer = target_layer, source_layer
+    pool_positions = pool_layer.positions(pool)
+    rng = kernel.rng
+    all_sources, all_targets, all_weights, all_delays = [], [], [], []
+    for driver, driver_position in zip(
+        drivers, driver_layer.positions(drivers)
+    ):
+        delta = target_layer.displacement(driver_position, pool_positions)
+        if projection["connection_type"] == "convergent":
+            delta = -delta
+        mask = _in_mask(projection.get("mask"), delta)
+        if not projection.get("allow_autapses", True):
+            mask &= pool != driver
+        distance = np.hypot(delta[mask, 0], delta[mask, 1])
+        candidates = pool[mask]
+        p = _value(projection.get("kernel", 1.0), distance, rng, len(distance))
+        chosen = rng.uniform(size=len(candidates)) < p
+        partners = candidates[chosen]
+        distance = distance[chosen]
+        n = len(partners)
+        if projection["connection_type"] == "convergent":
+            all_sources.append(partners)
+            all_targets.append(np.full(n, driver))
+        else:
+            all_sources.append(np.full(n, driver))
+            all_targets.append(partners)
+        all_weights.append(
+            _value(projection.get("weights", 1.0), distance, rng, n)
+        )
+        all_delays.append(
+            _value(projection.get("delays", 1.0), distance, rng, n)
+        )
+    if all_sources:
+        kernel.add_connections(
+            np.concatenate(all_sources),
+            np.concatenate(all_targets),
+            synapse_model,
+            np.concatenate(all_weights),
+            np.concatenate(all_delays),
+        )
+
+
+def GetTargetNodes(sources, tgt_layer, tgt_model=None, syn_model=None):
+    """Return the targets of each source within a layer."""
+    fake = _fake()
+    layer = _layer(tgt_layer)
+    conns = fake._kernel.connections()
+    in_layer = np.isin(conns["target"], layer.gids_array)
+    if syn_model is not None:
+        in_layer &= conns["synapse_model"] == syn_model
+    result = []
+    for source in fake._gids(sources):
+        targets = np.unique(conns["target"][in_layer & (conns["source"] == source)])
+        if tgt_model is not None:
+            targets = [
+                t for t in targets
+                if fake.GetStatus((int(t),), "model")[0] == tgt_model
+            ]
+        result.append(tuple(int(t) for t in targets))
+    return tuple(result)
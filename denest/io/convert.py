@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# convert.py
+
+"""Conversion of NEST's ASCII recorder output to typed binary formats."""
+
+import logging
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from .load import (
+    CHUNKSIZE, _iter_file_chunks, column_dtypes, get_filepaths, load_yaml,
+    metadata_paths
+)
+from .save import save_as_yaml
+
+log = logging.getLogger(__name__)
+
+# Format of the raw data saved by NEST
+ASCII_FORMAT = "ascii"
+# Binary formats the recorder data can be converted to. Parquet and Feather
+# require ``pyarrow``.
+FORMATS = ["npz", "parquet", "feather"]
+ARROW_FORMATS = ["parquet", "feather"]
+
+
+def _check_format(data_format):
+    if data_format not in FORMATS:
+        raise ValueError(
+            f"Unknown recorder data format `{data_format}`. Should be in "
+            f"{FORMATS}"
+        )
+    if data_format in ARROW_FORMATS:
+        try:
+            import pyarrow  # noqa: F401  pylint: disable=unused-import
+        except ImportError:
+            raise ImportError(
+                f"The `{data_format}` recorder data format requires `pyarrow`"
+            )
+
+
+def write_chunks(chunks, path, data_format, dtypes):
+    """Write DataFrame chunks to ``path`` in a binary format.
+
+    Only one chunk is held in memory at a time. Parquet and Feather files are
+    written incrementally. The columns of ``.npz`` files are first appended to
+    temporary raw files, which are then copied to the archive.
+
+    Args:
+        chunks (iterable(pd.DataFrame)): Chunks of the data, in order.
+        path (str or Path): Path to the written file.
+        data_format (str): One of ``FORMATS``.
+        dtypes (dict): ``{<column>: <dtype>}`` dictionary of the columns.
+
+    Returns:
+        Path: ``path``
+    """
+    path = Path(path)
+    if data_format == "npz":
+        _write_npz_chunks(chunks, path, dtypes)
+    elif data_format in ARROW_FORMATS:
+        _write_arrow_chunks(chunks, path, data_format, dtypes)
+    return path
+
+
+def _write_npz_chunks(chunks, path, dtypes):
+    with tempfile.TemporaryDirectory(dir=path.parent) as tmp_dir:
+        column_paths = {
+            colname: Path(tmp_dir, f"{i}.raw") for i, colname in enumerate(dtypes)
+        }
+        files = {
+            colname: column_path.open("wb")
+            for colname, column_path in column_paths.items()
+        }
+        try:
+            for chunk in chunks:
+                for colname, f in files.items():
+                    chunk[colname].to_numpy(dtype=dtypes[colname]).tofile(f)
+        finally:
+            for f in files.values():
+                f.close()
+        # ``np.savez`` copies memory-mapped arrays to the archive in buffered
+        # blocks, so the columns are never loaded entirely
+        np.savez(
+            path,
+            **{
+                colname: (
+                    np.memmap(column_path, dtype=dtypes[colname], mode="r")
+                    if column_path.stat().st_size
+                    else np.array([], dtype=dtypes[colname])
+                )
+                for colname, column_path in column_paths.items()
+            },
+        )
+
+
+def _write_arrow_chunks(chunks, path, data_format, dtypes):
+    import pyarrow
+
+    schema = pyarrow.schema(
+        [
+            (colname, pyarrow.from_numpy_dtype(np.dtype(dtype)))
+            for colname, dtype in dtypes.items()
+        ]
+    )
+    if data_format == "parquet":
+        import pyarrow.parquet
+
+        writer = pyarrow.parquet.ParquetWriter(path, schema)
+    else:
+        # Feather V2 files are Arrow IPC files, compressed like
+        # ``pandas.DataFrame.to_feather`` does by default
+        import pyarrow.ipc
+
+        compression = "lz4" if pyarrow.Codec.is_available("lz4") else None
+        writer = pyarrow.ipc.new_file(
+            path, schema,
+            options=pyarrow.ipc.IpcWriteOptions(compression=compression),
+        )
+    with writer:
+        for chunk in chunks:
+            writer.write_table(
+                pyarrow.Table.from_pandas(
+                    chunk, schema=schema, preserve_index=False
+                )
+            )
+
+
+def convert(metadata_path, data_format="npz", value_dtype="float64",
+            delete_ascii=False, chunksize=CHUNKSIZE):
+    """Convert the ASCII data of a recorder to a binary format.
+
+    The converted data is saved in a single ``<label>.<data_format>`` file in
+    the directory of the metadata file. The ASCII data is read and written in
+    chunks of ``chunksize`` rows, so that recordings larger than the available
+    memory can be converted. The metadata's ``filenames`` are
+    updated to point at the converted file, and the ``format`` and ``dtypes``
+    of the data are added to the metadata.
+
+    Recorders that don't save data to file, recorders without known column
+    names and recorders whose data was already converted are left unchanged.
+
+    Args:
+        metadata_path (str or Path): Path to the recorder's metadata file.
+
+    Keyword Args:
+        data_format (str): One of ``FORMATS``. (default ``'npz'``)
+        value_dtype (str): dtype of the recorded variables (eg ``'float32'``).
+            GIDs are saved as int32 and times as float64. (default
+            ``'float64'``)
+        delete_ascii (bool): Whether the ASCII files are deleted after
+            conversion. (default ``False``)
+        chunksize (int): Maximum number of rows read from the ASCII files at
+            once. (default ``CHUNKSIZE``)
+
+    Returns:
+        Path | None: Path to the converted file, or ``None`` if the recorder
+        was left unchanged.
+    """
+    _check_format(data_format)
+    metadata_path = Path(metadata_path)
+    metadata = load_yaml(metadata_path)
+    if metadata.get("format", ASCII_FORMAT) != ASCII_FORMAT:
+        log.debug("Data of recorder %s is already converted", metadata["label"])
+        return None
+    if not metadata["filenames"] or metadata["colnames"] is None:
+        log.debug("Not converting the data of recorder %s", metadata["label"])
+        return None
+    ascii_paths = get_filepaths(metadata_path)
+    dtypes = column_dtypes(metadata["colnames"], value_dtype=value_dtype)
+    chunks = _iter_file_chunks(
+        ASCII_FORMAT, metadata["colnames"], ascii_paths, metadata["colnames"],
+        dtypes, chunksize,
+    )
+    filename = f"{metadata['label']}.{data_format}"
+    path = write_chunks(chunks, metadata_path.parent / filename, data_format, dtypes)
+    log.info("Converted data of recorder %s to %s", metadata["label"], path)
+    metadata.update(
+        {"format": data_format, "dtypes": dtypes, "filenames": [filename]}
+    )
+    save_as_yaml(metadata_path, metadata)
+    if delete_ascii:
+        for ascii_path in ascii_paths:
+            ascii_path.unlink()
+    return path
+
+
+def convert_all(output_dir, data_format="npz", value_dtype="float64",
+                delete_ascii=False, chunksize=CHUNKSIZE):
+    """Convert the ASCII data of all the recorders of a simulation.
+
+    Args:
+        output_dir (str or Path): Output directory of the simulation.
+
+    Keyword Args:
+        data_format, value_dtype, delete_ascii, chunksize: Passed to
+            :func:`convert`.
+
+    Returns:
+        list(Path): The paths to the converted files.
+    """
+    _check_format(data_format)
+    paths = [
+        convert(
+            metadata_path, data_format=data_format, value_dtype=value_dtype,
+            delete_ascii=delete_ascii, chunksize=chunksize,
+        )
+        for metadata_path in metadata_paths(output_dir)
+    ]
+    return [path for path in paths if path is not None]
@@ -4,9 +4,13 @@
 
 """Utility functions for data loading."""
 
+import functools
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import yaml
 
@@ -14,6 +18,23 @@ from .save import output_path, output_subdir
 
 log = logging.getLogger(__name__)
 
+# Maximum number of arrays kept in memory by ``load_array``
+ARRAY_CACHE_SIZE = 32
+
+# dtype of the GID columns of recorder data. The other columns use the
+# ``value_dtype`` of ``column_dtypes``, except for the time column which always
+# uses float64.
+GID_COLUMNS = ["gid", "target"]
+GID_DTYPE = "int32"
+TIME_DTYPE = "float64"
+
+# Name of the empty field after the trailing tab of NEST's ASCII lines, when
+# read with the pyarrow engine (see ``load_as_df``)
+TRAILING_FIELD = "_trailing_field"
+
+# Default number of rows of the chunks yielded by ``iter_chunks``
+CHUNKSIZE = 1000000
+
 
 def load_session_times(output_dir):
     """Load session time from output dir."""
@@ -27,7 +48,7 @@ def metadata_paths(output_dir):
     return sorted(metadata_dir.glob("*.yml"))
 
 
-def load(metadata_path):
+def load(metadata_path, **kwargs):
     """Load tabular data from metadata file and return a pandas df.
 
     The data files are assumed to be in the same directory as the metadata.
@@ -36,6 +57,9 @@ def load(metadata_path):
         metadata_path (str or Path): Path to the yaml file containing the
             metadata for a recorder.
 
+    Keyword Args:
+        **kwargs: Passed to :func:`load_as_df` for NEST's ASCII data.
+
     Returns:
         pd.DataFrame : pd dataframe containing the raw data, possibly
             subsampled. Columns may be dropped ( see `usecols` kwarg) and 'x',
@@ -45,41 +69,314 @@ def load(metadata_path):
     metadata = load_yaml(metadata_path)
     filepaths = get_filepaths(metadata_path)
 
-    return load_as_df(metadata["colnames"], *filepaths)
+    # Data harvested from the recorders' memory (see ``BaseRecorder.harvest``)
+    data_format = metadata.get("format", "ascii")
+    if data_format == "columnar":
+        return load_columnar(metadata["colnames"], filepaths, metadata["dtypes"])
+    # Data converted from NEST's ASCII output (see ``io.convert``)
+    if data_format != "ascii":
+        return pd.concat(
+            [load_binary(path, data_format) for path in filepaths],
+            ignore_index=True,
+        )
+    return load_as_df(metadata["colnames"], *filepaths, **kwargs)
+
 
+def load_columnar(colnames, paths, dtypes):
+    """Load tabular data saved as one raw binary file per column.
 
-def load_as_df(colnames, *paths, sep="\t", index_col=False, header=None, **kwargs):
+    Args:
+        colnames (list[str]): The names of the columns.
+        paths (list[filepath]): The file of each column.
+        dtypes (dict): ``{<column>: <dtype>}`` dictionary.
+
+    Returns:
+        pd.DataFrame: The loaded data.
+    """
+    return pd.DataFrame(
+        {
+            colname: np.fromfile(path, dtype=dtypes[colname])
+            for colname, path in zip(colnames, paths)
+        }
+    )
+
+
+def load_binary(path, data_format):
+    """Load tabular data from a ``.npz``, Parquet or Feather file.
+
+    Args:
+        path (str or Path): Path to the file.
+        data_format (str): ``'npz'``, ``'parquet'`` or ``'feather'``.
+
+    Returns:
+        pd.DataFrame: The loaded data, with the dtypes it was saved with.
+    """
+    if data_format == "npz":
+        with np.load(path) as arrays:
+            return pd.DataFrame({name: arrays[name] for name in arrays.files})
+    if data_format == "parquet":
+        return pd.read_parquet(path)
+    if data_format == "feather":
+        return pd.read_feather(path)
+    raise ValueError(f"Unknown recorder data format `{data_format}`")
+
+
+def column_dtypes(colnames, value_dtype="float64"):
+    """Return ``{<column>: <dtype>}`` for the columns of recorder data."""
+    dtypes = {}
+    for colname in colnames:
+        if colname in GID_COLUMNS:
+            dtypes[colname] = GID_DTYPE
+        elif colname == "time":
+            dtypes[colname] = TIME_DTYPE
+        else:
+            dtypes[colname] = str(np.dtype(value_dtype))
+    return dtypes
+
+
+def load_as_df(colnames, *paths, sep="\t", index_col=False, header=None,
+               n_workers=None, **kwargs):
     """Load tabular data from one or more files and return a pandas df.
 
-    Keyword arguments are passed to ``pandas.read_csv()``.
+    The files are read concurrently by a pool of threads. Empty files (eg the
+    files of virtual processes without recorded events) are skipped. If the
+    column names are known, the columns are parsed with explicit dtypes (see
+    :func:`column_dtypes`) unless ``dtype`` is specified.
+
+    Keyword arguments are passed to ``pandas.read_csv()``. Pass
+    ``engine='pyarrow'`` to use the multithreaded CSV parser of ``pyarrow``.
+    The files are then expected to be in NEST's format, with a tab after the
+    last field of each line.
 
     Arguments:
         colnames (tuple[str]): The names of the columns.
         *paths (filepath or buffer): The file(s) to load data from.
 
     Keyword Args:
+        n_workers (int | None): Number of threads reading files. Defaults to
+            the number of files, up to the number of CPUs.
         **Keyword Args: Passed to pd.read_csv
 
     Returns:
         pd.DataFrame: The loaded data.
     """
-
+    if colnames is not None and "dtype" not in kwargs:
+        kwargs["dtype"] = column_dtypes(colnames)
+    names = colnames
+    if kwargs.get("engine") == "pyarrow":
+        # NEST ends each line with a tab, ie with an empty last field. The
+        # pyarrow engine doesn't support ``index_col=False``, which discards
+        # it, so we read the empty field under a placeholder name and drop it.
+        if colnames is None:
+            raise ValueError("Column names are required by the pyarrow engine")
+        names = list(colnames) + [TRAILING_FIELD]
+        index_col = None
+    paths = [
+        path for path in paths
+        if not isinstance(path, (str, Path)) or Path(path).stat().st_size > 0
+    ]
     if not paths:
-        return pd.DataFrame()
-    # Read data from disk
-    return pd.concat(
-        [
-            pd.read_csv(
-                path,
-                names=colnames,
-                sep=sep,
-                index_col=index_col,
-                header=header,
-                **kwargs
-            )
-            for path in paths
-        ]
+        if colnames is None:
+            return pd.DataFrame()
+        return pd.DataFrame(
+            {
+                colname: np.array([], dtype=kwargs.get("dtype", {}).get(colname))
+                for colname in colnames
+            }
+        )
+
+    def read_csv(path):
+        df = pd.read_csv(
+            path, names=names, sep=sep, index_col=index_col, header=header,
+            **kwargs
+        )
+        if TRAILING_FIELD in df:
+            if df[TRAILING_FIELD].notna().any():
+                raise ValueError(
+                    f"Unexpected number of fields in {path}: expected "
+                    f"{len(colnames)} fields followed by a tab"
+                )
+            df = df.drop(columns=TRAILING_FIELD)
+        return df
+
+    if n_workers is None:
+        n_workers = min(len(paths), os.cpu_count() or 1)
+    if n_workers <= 1 or len(paths) == 1:
+        frames = [read_csv(path) for path in paths]
+    else:
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            frames = list(executor.map(read_csv, paths))
+    return pd.concat(frames, ignore_index=True)
+
+
+def iter_chunks(metadata_path, chunksize=CHUNKSIZE, time_window=None,
+                gids=None, usecols=None):
+    """Iterate over the data of a recorder in chunks of fixed size.
+
+    Only one chunk of each data file is held in memory at a time, so that
+    reductions can be computed over recordings larger than the available
+    memory. Filters are applied to each chunk as it is read, and only the
+    columns that are returned or filtered on are read from disk. Chunks
+    contain ``chunksize`` rows, except for the last one. No chunk is yielded
+    if no rows match the filters.
+
+    Example:
+        >>> # Spike counts of each unit
+        >>> counts = sum(
+        ...     chunk["gid"].value_counts()
+        ...     for chunk in iter_chunks(metadata_path, usecols=["gid"])
+        ... )
+
+    Args:
+        metadata_path (str or Path): Path to the yaml file containing the
+            metadata for a recorder.
+
+    Keyword Args:
+        chunksize (int): Number of rows of each chunk.
+        time_window (tuple(float) | None): ``(start, stop)`` tuple. Only the
+            rows with ``start <= time < stop`` are yielded. Either bound may
+            be ``None``.
+        gids (iterable(int) | None): Only the rows of these GIDs are yielded.
+        usecols (list(str) | None): Columns of the yielded chunks. All
+            columns by default.
+
+    Yields:
+        pd.DataFrame: Chunks of the recorder's data.
+    """
+    metadata = load_yaml(metadata_path)
+    filepaths = get_filepaths(metadata_path)
+    colnames = metadata["colnames"]
+    if colnames is None:
+        raise ValueError(f"Unknown column names for recorder at {metadata_path}")
+    if usecols is None:
+        usecols = list(colnames)
+    unknown_cols = set(usecols) - set(colnames)
+    if unknown_cols:
+        raise ValueError(
+            f"Unknown columns {sorted(unknown_cols)}. Should be in {colnames}"
+        )
+    # Columns read from disk: returned columns and columns filtered on
+    filtered_cols = {"time": time_window is not None, "gid": gids is not None}
+    readcols = [
+        colname for colname in colnames
+        if colname in usecols or filtered_cols.get(colname, False)
+    ]
+    dtypes = metadata.get("dtypes", column_dtypes(colnames))
+    if gids is not None:
+        gids = np.asarray(list(gids), dtype=dtypes["gid"])
+
+    chunks = _iter_file_chunks(
+        metadata.get("format", "ascii"), colnames, filepaths, readcols,
+        dtypes, chunksize,
     )
+    yield from _rechunk(
+        (
+            _filter_chunk(chunk, time_window=time_window, gids=gids)[usecols]
+            for chunk in chunks
+        ),
+        chunksize,
+    )
+
+
+def _iter_file_chunks(data_format, colnames, paths, readcols, dtypes, chunksize):
+    """Yield chunks of at most ``chunksize`` rows from each data file."""
+    if data_format == "ascii":
+        for path in paths:
+            if Path(path).stat().st_size == 0:
+                continue
+            with pd.read_csv(
+                path, names=colnames, sep="\t", index_col=False, header=None,
+                usecols=readcols,
+                dtype={colname: dtypes[colname] for colname in readcols},
+                chunksize=chunksize,
+            ) as reader:
+                yield from reader
+    elif data_format == "columnar":
+        arrays = {
+            colname: (
+                np.memmap(path, dtype=dtypes[colname], mode="r")
+                if Path(path).stat().st_size
+                else np.array([], dtype=dtypes[colname])
+            )
+            for colname, path in zip(colnames, paths)
+            if colname in readcols
+        }
+        yield from _array_chunks(arrays, chunksize)
+    elif data_format == "npz":
+        for path in paths:
+            with np.load(path) as npz:
+                yield from _array_chunks(
+                    {colname: npz[colname] for colname in readcols}, chunksize
+                )
+    elif data_format == "parquet":
+        import pyarrow.parquet
+
+        for path in paths:
+            yield from (
+                batch.to_pandas()
+                for batch in pyarrow.parquet.ParquetFile(path).iter_batches(
+                    batch_size=chunksize, columns=readcols
+                )
+            )
+    elif data_format == "feather":
+        import pyarrow.feather
+
+        for path in paths:
+            table = pyarrow.feather.read_table(
+                path, columns=readcols, memory_map=True
+            )
+            yield from (
+                batch.to_pandas()
+                for batch in table.to_batches(max_chunksize=chunksize)
+            )
+    else:
+        raise ValueError(f"Unknown recorder data format `{data_format}`")
+
+
+def _array_chunks(arrays, chunksize):
+    """Yield DataFrames from slices of ``{<column>: <array>}``."""
+    n_rows = min((len(array) for array in arrays.values()), default=0)
+    for start in range(0, n_rows, chunksize):
+        yield pd.DataFrame(
+            {
+                colname: np.array(array[start:start + chunksize])
+                for colname, array in arrays.items()
+            }
+        )
+
+
+def _filter_chunk(chunk, time_window=None, gids=None):
+    """Return the rows of a chunk within a time window and GID set."""
+    mask = np.ones(len(chunk), dtype=bool)
+    if time_window is not None:
+        start, stop = time_window
+        if start is not None:
+            mask &= chunk["time"].to_numpy() >= start
+        if stop is not None:
+            mask &= chunk["time"].to_numpy() < stop
+    if gids is not None:
+        mask &= np.isin(chunk["gid"].to_numpy(), gids)
+    if mask.all():
+        return chunk
+    return chunk[mask]
+
+
+def _rechunk(chunks, chunksize):
+    """Yield DataFrames of ``chunksize`` rows from DataFrames of any size."""
+    buffer = []
+    n_rows = 0
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        buffer.append(chunk)
+        n_rows += len(chunk)
+        while n_rows >= chunksize:
+            data = pd.concat(buffer, ignore_index=True)
+            yield data.iloc[:chunksize]
+            buffer = [data.iloc[chunksize:]]
+            n_rows = len(buffer[0])
+    if n_rows:
+        yield pd.concat(buffer, ignore_index=True)
 
 
 def get_filepaths(metadata_path):
@@ -91,6 +388,44 @@ def get_filepaths(metadata_path):
     return [metadata_path.parent / filename for filename in metadata["filenames"]]
 
 
+def load_array(path, mmap_mode=None):
+    """Load a numpy array from a ``.npy`` file, reusing previously loaded arrays.
+
+    Arrays are cached by resolved path, modification time and size, so that
+    input files reused across populations, layers and sessions are read only
+    once, and modified files are read again. Once more than
+    ``ARRAY_CACHE_SIZE`` arrays are cached, the least recently used are
+    evicted. The returned arrays are shared and therefore read-only.
+
+    Args:
+        path (str or Path): Path to the ``.npy`` file.
+
+    Keyword Args:
+        mmap_mode (str | None): Passed to ``numpy.load``. If ``'r'``, the
+            array is memory-mapped and its values are read from disk lazily.
+            (Default: ``None``)
+
+    Returns:
+        np.ndarray: The loaded (read-only) array.
+    """
+    path = Path(path).resolve()
+    stat = path.stat()
+    return _load_array(path, stat.st_mtime_ns, stat.st_size, mmap_mode)
+
+
+@functools.lru_cache(maxsize=ARRAY_CACHE_SIZE)
+def _load_array(path, mtime_ns, size, mmap_mode):
+    # pylint: disable=unused-argument
+    log.debug("Loading array from %s (mmap_mode=%s)", path, mmap_mode)
+    array = np.load(path, mmap_mode=mmap_mode)
+    array.flags.writeable = False
+    return array
+
+
+load_array.cache_clear = _load_array.cache_clear
+load_array.cache_info = _load_array.cache_info
+
+
 def load_yaml(*args):
     """Load a YAML file from a path."""
     path = Path(*args)
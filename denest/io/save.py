@@ -4,7 +4,9 @@
 
 """Utility functions for data saving."""
 
+import contextlib
 import logging
+import os
 import shutil
 from pathlib import Path
 
@@ -21,10 +23,15 @@ OUTPUT_SUBDIRS = {
     "recorders_metadata": ("data",),
     "projection_recorders_metadata": ("data",),
     "session_times": (),
+    "checkpoint": ("checkpoints",),
+    "instrumentation": (),
 }
 
-# Subdirectories that are cleared during OUTPUT_DIR initialization
-CLEAR_SUBDIRS = [subdir for subdir in OUTPUT_SUBDIRS.values()]
+# Subdirectories that are cleared during OUTPUT_DIR initialization.
+# Checkpoints are kept so that they can be restored by later runs.
+CLEAR_SUBDIRS = [
+    subdir for key, subdir in OUTPUT_SUBDIRS.items() if key != "checkpoint"
+]
 
 
 def save_as_yaml(path, tree):
@@ -34,6 +41,35 @@ def save_as_yaml(path, tree):
         yaml.dump(tree, f, default_flow_style=False)
 
 
+@contextlib.contextmanager
+def atomic_write(path, mode="wb"):
+    """Context manager yielding a file that replaces ``path`` when closed.
+
+    The data is written to a temporary file in the same directory, which is
+    moved to ``path`` only if the block exits without error, so that
+    concurrent readers never see a partially written file.
+
+    Args:
+        path (str | Path): Path to the written file.
+
+    Keyword Args:
+        mode (str): Mode in which the temporary file is opened. (default
+            ``'wb'``)
+
+    Yields:
+        file: The temporary file.
+    """
+    path = Path(path)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, mode) as f:
+            yield f
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
 #
 # Paths, filenames and output directory organisation
 #
@@ -147,6 +183,14 @@ def session_times_filename():
     return "session_times.yml"
 
 
+def checkpoint_filename(session_name):
+    return session_name + ".npz"
+
+
+def instrumentation_filename():
+    return "instrumentation.json"
+
+
 def tree_filename():
     return "parameter_tree.yml"
 
@@ -165,4 +209,6 @@ FILENAME_FUNCS = {
     "session_times": session_times_filename,
     "session_metadata": metadata_filename,
     "versions": version_info_filename,
+    "checkpoint": checkpoint_filename,
+    "instrumentation": instrumentation_filename,
 }
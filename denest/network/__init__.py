@@ -7,14 +7,16 @@
 import itertools
 import logging
 
+import numpy as np
 from tqdm import tqdm
 
 from ..parameters import ParamsTree
 from ..utils import validation
+from ..utils.instrumentation import Instrumentation
 from ..utils.validation import ParameterError
 from .projections import ProjectionModel, TopoProjection
 from .layers import InputLayer, Layer
-from .models import Model, SynapseModel
+from .models import Model, RecorderModel, SynapseModel
 from .recorders import ProjectionRecorder, PopulationRecorder
 from .utils import if_not_created, log
 
@@ -74,6 +76,11 @@ class Network(object):
               ``recorders`` parameters by the
               :func:`Network.build_recorders` method. Refer to this method
               for a description of the ``recorders`` parameter.
+
+    Keyword Args:
+        instrumentation (Instrumentation | None): Object recording the
+            duration and memory use of the building and creation steps. A new
+            :class:`Instrumentation` object is used if ``None``.
     """
 
     MANDATORY_CHILDREN = []
@@ -82,11 +89,14 @@ class Network(object):
         'topology', 'recorder_models', 'recorders'
     ]
 
-    def __init__(self, tree=None):
+    def __init__(self, tree=None, instrumentation=None):
         """Initialize the network object without creating it in NEST."""
 
         if tree is None:
             tree = ParamsTree({})
+        if instrumentation is None:
+            instrumentation = Instrumentation()
+        self.instrumentation = instrumentation
 
         self._created = False
         self._changed = False
@@ -119,22 +129,26 @@ class Network(object):
         self.population_recorders = []
         self.projection_recorders = []
 
-        self.build_neuron_models(self.tree.children['neuron_models'])
-        self.build_synapse_models(self.tree.children['synapse_models'])
-        self.build_recorder_models(self.tree.children['recorder_models'])
-        self.build_layers(self.tree.children['layers'])
-        self.build_projection_models(self.tree.children['projection_models'])
-        # Projections must be built after layers and projection models
-        self.build_projections(self.tree.children['topology'])
-        # Initialize population recorders and projection recorders
-        self.build_recorders(self.tree.children['recorders'])
+        # Projections must be built after layers and projection models.
+        # Population recorders and projection recorders are initialized last.
+        for build, child_name in [
+            (self.build_neuron_models, 'neuron_models'),
+            (self.build_synapse_models, 'synapse_models'),
+            (self.build_recorder_models, 'recorder_models'),
+            (self.build_layers, 'layers'),
+            (self.build_projection_models, 'projection_models'),
+            (self.build_projections, 'topology'),
+            (self.build_recorders, 'recorders'),
+        ]:
+            with self.instrumentation.phase(f"network.{build.__name__}"):
+                build(self.tree.children[child_name])
 
     @staticmethod
     def build_named_leaves_dict(constructor, node):
         """Construct all leaves and return as a dictionary."""
         named_leaves = {
             name: constructor(name, dict(leaf.params), dict(leaf.nest_params))
-            for name, leaf in node.named_leaves(root=False)
+            for name, leaf in node.compiled().named_leaves(root=False)
         }
         msg = f"Build N={len(named_leaves)} ``{constructor.__name__}`` objects"
         log.info(msg)
@@ -146,11 +160,7 @@ class Network(object):
         if not isinstance(tree, ParamsTree):
             child_tree = ParamsTree(tree, parent=self.tree, name=child_name)
         else:
-            child_tree = ParamsTree(
-                tree.asdict(),
-                parent=self.tree,
-                name=child_name
-            )
+            child_tree = tree.copy(parent=self.tree, name=child_name)
         # Add as child
         self.tree.children[child_name] = child_tree
 
@@ -196,12 +206,12 @@ class Network(object):
 
         Args:
             tree (tree-like or ``ParamsTree``). Parameter tree, the leaves of
-                which define neuron models. Each leaf is used to initialize a
-                :class:`Model` object.
+                which define recorder models. Each leaf is used to initialize
+                a :class:`RecorderModel` object.
         """
         self._update_tree_child('recorder_models', tree)
         self.recorder_models = self.build_named_leaves_dict(
-            Model,
+            RecorderModel,
             self.tree.children['recorder_models']
         )
 
@@ -223,7 +233,7 @@ class Network(object):
                 name, dict(leaf.params), dict(leaf.nest_params)
             )
             for name, leaf
-            in self.tree.children['layers'].named_leaves(root=False)
+            in self.tree.children['layers'].compiled().named_leaves(root=False)
         }
         log.info(
             f"Build N={len(self.layers)} ``Layer`` or ``InputLayer`` objects."
@@ -520,7 +530,9 @@ class Network(object):
             projection = matching_projections[0]
             # Create projection recorder
             projection_recorders.append(
-                ProjectionRecorder(model, projection)
+                ProjectionRecorder(
+                    model, projection, harvest=self._harvested_model(model)
+                )
             )
 
         # Verbose
@@ -529,6 +541,13 @@ class Network(object):
 
         return projection_recorders
 
+    def _harvested_model(self, model):
+        """Whether recorders of a model are harvested (see ``RecorderModel``)."""
+        return (
+            model in self.recorder_models
+            and self.recorder_models[model].params["harvest"]
+        )
+
     def _build_population_recorders(self, population_recorders_items):
         """Return population recorders specified by a list of recorder parameters.
 
@@ -597,7 +616,8 @@ class Network(object):
             PopulationRecorder(
                 model,
                 layer=self.layers[layer_name],
-                population_name=population_name
+                population_name=population_name,
+                harvest=self._harvested_model(model),
             )
             for (model, layer_name, population_name)
             in sorted(set(population_recorders_args))
@@ -610,10 +630,13 @@ class Network(object):
     def __str__(self):
         return repr(self)
 
-    @staticmethod
-    def _create_all(objects):
-        for obj in tqdm(objects):
-            obj.create()
+    def _create_all(self, objects, name):
+        objects = list(objects)
+        with self.instrumentation.phase(
+            f"network.create.{name}", n_objects=len(objects)
+        ):
+            for obj in tqdm(objects):
+                obj.create()
 
     def _layer_call(self, method_name, *args, layer_type=None, **kwargs):
         """Call a method on each layer."""
@@ -709,23 +732,66 @@ class Network(object):
         ]
 
     @if_not_created
-    def create(self):
+    def create(self, connectivity_cache_dir=None):
+        """Create the network in NEST.
+
+        Keyword Args:
+            connectivity_cache_dir (str | None): Directory in which the
+                connections of each projection are cached. If specified,
+                projections whose connections were cached by a previous
+                run with the same parameters and seeds are created from the
+                cache rather than with ``tp.ConnectLayers`` (see
+                :meth:`TopoProjection.create`). Note that the state of NEST's
+                random number generators then differs from that of a run
+                without cache. Since the connections drawn for a projection
+                depend on the projections drawn before it, the cache is used
+                only if the connections of all the projections are cached.
+                Otherwise, all the projections are drawn and cached again.
+                Ignored if ``None``. (default ``None``)
+        """
         # TODO: use progress bar from PyPhi?
         log.info('Creating neuron models...')
-        self._create_all(self.neuron_models.values())
+        self._create_all(self.neuron_models.values(), 'neuron_models')
         log.info('Creating synapse models...')
-        self._create_all(self.synapse_models.values())
+        self._create_all(self.synapse_models.values(), 'synapse_models')
         log.info('Creating recorder models...')
-        self._create_all(self.recorder_models.values())
+        self._create_all(self.recorder_models.values(), 'recorder_models')
         log.info('Creating layers...')
-        self._create_all(self._get_layers())
+        self._create_all(self._get_layers(), 'layers')
         log.info('Creating population recorders...')
-        self._create_all(self.population_recorders)
+        self._create_all(self.population_recorders, 'population_recorders')
         log.info('Creating projection recorders...')
         # ProjectionRecorders must be created BEFORE Projections
-        self._create_all(self.projection_recorders)
+        self._create_all(self.projection_recorders, 'projection_recorders')
         log.info('Connecting layers...')
-        self._create_all(self.projections)
+        if connectivity_cache_dir is None:
+            self._create_all(self.projections, 'projections')
+        else:
+            with self.instrumentation.phase(
+                "network.create.projections", n_objects=len(self.projections)
+            ):
+                cache_keys = []
+                cache_key = ""
+                for projection in self.projections:
+                    cache_key = projection.connectivity_key(previous_key=cache_key)
+                    cache_keys.append(cache_key)
+                # The keys assume that all the previous projections were drawn
+                overwrite_cache = not all(
+                    projection.cache_path(connectivity_cache_dir, key).exists()
+                    for projection, key in zip(self.projections, cache_keys)
+                )
+                for i, (projection, cache_key) in enumerate(
+                    zip(tqdm(self.projections), cache_keys)
+                ):
+                    projection.create(
+                        cache_dir=connectivity_cache_dir,
+                        cache_key=cache_key,
+                        overwrite_cache=overwrite_cache,
+                        exclude_existing=any(
+                            projection.may_share_connections(previous)
+                            for previous in self.projections[:i]
+                        ),
+                    )
         self.print_network_size()
 
     @staticmethod
@@ -770,6 +836,7 @@ class Network(object):
                         'population': <pop_name>,
                         'change_type': <change_type>,
                         'from_array': <from_array>,
+                        'mmap_mode': <mmap_mode>,
                         'nest_params': {
                             <param_name>: <param_change>,
                         },
@@ -809,6 +876,11 @@ class Network(object):
                     used to set the ``<param_name>`` parameter for all the
                     population's units.
 
+                - ``<mmap_mode>`` (str | None) is passed to ``numpy.load`` when
+                  arrays are loaded from file. Use ``'r'`` to memory-map large
+                  arrays rather than reading them into memory. Loaded arrays
+                  are cached across calls. (Default: ``None``)
+
                 - ``'nest_params'`` (Default: ``{}``) is the dictionary specifying
                   the parameter changes applied to the population units.
                   Items are the name of the modified NEST parameters
@@ -870,6 +942,7 @@ class Network(object):
             'population_name': None,
             'change_type': 'constant',
             'from_array': False,
+            'mmap_mode': None,
             'layers': [],
         }
 
@@ -900,8 +973,99 @@ class Network(object):
                     change_type=changes['change_type'],
                     from_array=changes['from_array'],
                     input_dir=input_dir,
+                    mmap_mode=changes['mmap_mode'],
                 )
 
+    def restore_state(self):
+        """Restore the unit parameters changed by ``set_state``.
+
+        Parameters are restored to the value they had before ``set_state``
+        first changed them (see :meth:`Layer.restore_state`). Dynamic state
+        variables should be reset with ``nest.ResetNetwork``.
+        """
+        for layer in self._get_layers():
+            layer.restore_state()
+
+    def save_checkpoint(self, path):
+        """Save the dynamic state of the network to a ``.npz`` file.
+
+        The checkpoint contains:
+
+            - the dynamic state of each population (see
+              :meth:`Layer.get_dynamic_state`), queried with one
+              ``nest.GetStatus`` call per population,
+            - the weights of each projection's connections.
+
+        Note that spikes in transit, the internal buffers of units and the
+        kernel time are not saved: NEST 2.x only allows resetting the kernel
+        time to 0, so restored runs start at time 0.
+
+        Only unit parameters with a single numeric value per unit can be
+        saved. A ValueError is raised before anything is written if a
+        population's dynamic state contains other parameters (eg the
+        ``spike_times`` of ``spike_generator`` units set with ``set_state``).
+
+        Args:
+            path (str | Path): Path to the checkpoint file.
+        """
+        log.info(f"Saving network checkpoint at {path}")
+        arrays = {}
+        for layer in self._get_layers():
+            for population_name in layer.population_names:
+                state = layer.get_dynamic_state(population_name)
+                for param_name, values in state.items():
+                    arrays[f"units/{layer.name}/{population_name}/{param_name}"] \
+                        = values
+        for projection in self.projections:
+            sources, targets, weights = projection.get_weights()
+            arrays[f"projections/{projection}/sources"] = sources
+            arrays[f"projections/{projection}/targets"] = targets
+            arrays[f"projections/{projection}/weights"] = weights
+        np.savez(path, **arrays)
+
+    def load_checkpoint(self, path):
+        """Restore the dynamic state of the network from a checkpoint file.
+
+        The kernel time is not restored (see :meth:`save_checkpoint`).
+
+        Args:
+            path (str | Path): Path to a checkpoint file saved by
+                :meth:`save_checkpoint` for the same network.
+        """
+        log.info(f"Restoring network checkpoint from {path}")
+        projections = {str(projection): projection for projection in self.projections}
+        with np.load(path) as checkpoint:
+            states = {}  # {(<layer_name>, <population_name>): <state>}
+            for key in checkpoint.files:
+                if key.startswith("units/"):
+                    _, layer_name, population_name, param_name = key.split("/")
+                    states.setdefault((layer_name, population_name), {})[
+                        param_name
+                    ] = checkpoint[key]
+            for (layer_name, population_name), state in states.items():
+                if (
+                    layer_name not in self.layers
+                    or population_name not in self.layers[layer_name].populations
+                ):
+                    raise ValueError(
+                        f"Invalid checkpoint at {path}: unknown population "
+                        f"`{population_name}` of layer `{layer_name}`"
+                    )
+                self.layers[layer_name].set_dynamic_state(population_name, state)
+            for key in checkpoint.files:
+                if key.startswith("projections/") and key.endswith("/weights"):
+                    name = key[len("projections/"):-len("/weights")]
+                    if name not in projections:
+                        raise ValueError(
+                            f"Invalid checkpoint at {path}: unknown projection "
+                            f"`{name}`"
+                        )
+                    projections[name].set_weights(
+                        checkpoint[f"projections/{name}/sources"],
+                        checkpoint[f"projections/{name}/targets"],
+                        checkpoint[key],
+                    )
+
     def save_metadata(self, output_dir):
         """Save network metadata.
 
@@ -910,6 +1074,31 @@ class Network(object):
         # Save recorder metadata
         self._recorder_call('save_metadata', output_dir)
 
+    def harvest_recorders(self, output_dir):
+        """Save and clear the events of the recorders recording to memory.
+
+        The events of all harvested recorders (see :class:`RecorderModel`) are
+        obtained with a single ``nest.GetStatus`` call, appended to the
+        recorders' columnar data files, and cleared with a single
+        ``nest.SetStatus`` call, so that the recorders' memory use doesn't
+        grow over the simulation.
+
+        Args:
+            output_dir (str or Path): Output directory of the simulation.
+        """
+        import nest
+
+        recorders = [
+            recorder for recorder in self.get_recorders() if recorder.harvested
+        ]
+        if not recorders:
+            return
+        log.info('Harvesting events of N=%s recorders...', len(recorders))
+        gids = tuple(recorder.gid[0] for recorder in recorders)
+        for recorder, events in zip(recorders, nest.GetStatus(gids, "events")):
+            recorder.harvest(events, output_dir)
+        nest.SetStatus(gids, {"n_events": 0})
+
     @staticmethod
     def print_network_size():
         import nest
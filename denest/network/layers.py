@@ -6,11 +6,13 @@
 
 import itertools
 import logging
+from collections.abc import Mapping
 from pathlib import Path
 
 import numpy as np
 
 from ..base_object import NestObject
+from ..io.load import load_array
 from ..utils.validation import ParameterError
 from .utils import flatten, if_created, if_not_created
 
@@ -29,6 +31,16 @@ class AbstractLayer(NestObject):
         self._gids = None  # list of layer GIDs
         self._layer_locations = {}  # {<gid>: (row, col)}
         self._population_locations = {}  # {<gid>: (row, col, unit_index)}
+        # Index of the layer's units, built during creation. Parallel int
+        # arrays (in the order of ``self._gids``) of the form
+        # ``{'gid': ..., 'population': ..., 'row': ..., 'col': ..., 'unit': ...}``
+        # where 'population' is the index in ``self.population_names``.
+        self._index = None
+        # {<population>: <array of GIDs of shape `population_shape`>}
+        self._population_gids = {}
+        # Values of the parameters changed by `set_state` before their first
+        # change: {<population>: {<param_name>: <list of values>}}
+        self._initial_state = {}
         self._populations = params["populations"]  # {<population>: <number>}
         self._shape = nest_params["rows"], nest_params["columns"]
         # Record if we change some of the layer units' state probabilistically
@@ -148,8 +160,13 @@ class AbstractLayer(NestObject):
 
     @if_created
     def set_state(self, nest_params=None, population_name=None,
-                  change_type='constant', from_array=False, input_dir=None):
-        """Set the state of some of the layer's populations."""
+                  change_type='constant', from_array=False, input_dir=None,
+                  mmap_mode=None):
+        """Set the state of some of the layer's populations.
+
+        Arrays loaded from files are cached (see :func:`io.load.load_array`)
+        and memory-mapped if ``mmap_mode`` is not None.
+        """
 
         if input_dir is None:
             input_dir = Path('./')
@@ -162,13 +179,15 @@ class AbstractLayer(NestObject):
 
         for population_name in population_names:
             population_shape = self.population_shape[population_name]
+            # GIDs of the population's units, in C order of the population
+            # shape
+            gids = self._population_gids[population_name].ravel().tolist()
 
             # For all the considered parameters, unfold the `param_change` value
-            # into an array to map to the population
-            param_arrays = {}
+            # into a list of values (one per unit) if it is given as an array.
+            param_values = {}
             for param_name, param_change in nest_params.items():
 
-                # Get array of values the same shape as the population
                 # Option 1: map from numpy array directly provided
                 if from_array and isinstance(param_change, (np.ndarray)):
                     values_array = param_change
@@ -180,20 +199,17 @@ class AbstractLayer(NestObject):
                         raise FileNotFoundError(
                             f"Could not load array from file at {path}"
                         )
-                    values_array = np.load(path)
+                    values_array = load_array(path, mmap_mode=mmap_mode)
                     from_file = True
                 # Option 3: Same value applied to all the units in the pop
                 else:
-                    # This does not work to make an array of lists
-                    # values_array = np.full(population_shape, param_change)
-                    # This can make array of lists
-                    values_array = np.frompyfunc(
-                        lambda: param_change, 0, 1)(
-                            np.empty(population_shape, dtype=object)
-                    )
+                    values_array = None
 
                 # Provided array has correct dimension
-                if not sorted(values_array.shape) == sorted(population_shape):
+                if (
+                    values_array is not None
+                    and not tuple(values_array.shape) == tuple(population_shape)
+                ):
                     raise ValueError(
                         f'Layer `{self.name}`, population `{population_name}`, '
                         f'parameter `{param_name}``, '
@@ -209,22 +225,142 @@ class AbstractLayer(NestObject):
                     f"{'from array' if from_array else 'from single value'}')"
                 )
 
-                param_arrays[param_name] = values_array
+                if values_array is None:
+                    param_values[param_name] = param_change
+                else:
+                    param_values[param_name] = values_array.ravel()
+
+            # Set all the parameters for all the units of the population at
+            # once. Arrays are used directly as per-unit operands for
+            # multiplicative and additive changes.
+            if from_array and change_type == "constant":
+                params = [
+                    dict(zip(param_values.keys(), unit_values))
+                    for unit_values in zip(
+                        *(values.tolist() for values in param_values.values())
+                    )
+                ]
+            else:
+                params = param_values
+            self._save_initial_state(population_name, gids, list(param_values))
+            self.set_unit_state(gids, params, change_type=change_type)
+
+    def _save_initial_state(self, population_name, gids, param_names):
+        """Save the current value of parameters that were not changed yet."""
+        import nest
+
+        initial_state = self._initial_state.setdefault(population_name, {})
+        param_names = [name for name in param_names if name not in initial_state]
+        if not param_names:
+            return
+        values = nest.GetStatus(gids, param_names)
+        for param_name, param_values in zip(param_names, zip(*values)):
+            initial_state[param_name] = list(param_values)
+
+    @if_created
+    def get_dynamic_state(self, population_name):
+        """Return the dynamic state of a population's units.
+
+        The dynamic state consists in the state variables of the units (their
+        recordables that are part of their status) and the parameters changed
+        by ``set_state``. Only parameters with a single numeric value per unit
+        are supported: a ValueError is raised for others (eg the
+        ``spike_times`` of ``spike_generator`` units).
+
+        Returns:
+            dict: ``{<param_name>: <array>}`` dictionary, where the arrays have
+            the shape of the population.
+        """
+        import nest
+
+        gids = self._population_gids[population_name].ravel().tolist()
+        status = nest.GetStatus(gids[:1])[0]
+        recordables = nest.GetDefaults(population_name).get('recordables', [])
+        param_names = [str(name) for name in recordables if str(name) in status]
+        param_names += [
+            name for name in self._initial_state.get(population_name, {})
+            if name not in param_names
+        ]
+        if not param_names:
+            return {}
+        values = nest.GetStatus(gids, param_names)
+        state = {}
+        for param_name, param_values in zip(param_names, zip(*values)):
+            try:
+                array = np.array(param_values)
+            except ValueError:  # Sequences of different lengths
+                array = None
+            if (
+                array is None
+                or array.shape != (len(gids),)
+                or array.dtype.kind not in "biuf"
+            ):
+                raise ValueError(
+                    f"Can't get the dynamic state of population "
+                    f"`{population_name}` of layer `{self.name}`: parameter "
+                    f"`{param_name}` doesn't have a single numeric value per "
+                    f"unit."
+                )
+            state[param_name] = array.reshape(self.population_shape[population_name])
+        return state
+
+    @if_created
+    def set_dynamic_state(self, population_name, state):
+        """Set the dynamic state of a population's units.
 
-            # Set all the parameters at once for each unit in the population
-            for idx, x in np.ndenumerate(values_array):
-                tgt_gid = self.gids(
-                    population=population_name,
-                    population_location=idx,
+        Args:
+            population_name (str): Name of the population.
+            state (dict): ``{<param_name>: <array>}`` dictionary, as returned by
+                :meth:`get_dynamic_state`.
+        """
+        if not state:
+            return
+        for param_name, values in state.items():
+            if tuple(values.shape) != tuple(
+                self.population_shape[population_name]
+            ):
+                raise ValueError(
+                    f"Layer `{self.name}`, population `{population_name}`, "
+                    f"parameter `{param_name}`: Array has incorrect shape. "
+                    f"Expected shape `{self.population_shape[population_name]}`"
+                    f", got shape `{values.shape}`"
                 )
-                self.set_unit_state(
-                    tgt_gid,
-                    {
-                        param_name: param_arrays[param_name][idx]
-                        for param_name in param_arrays.keys()
-                    },
-                    change_type=change_type
+        gids = self._population_gids[population_name].ravel().tolist()
+        self.set_unit_state(
+            gids,
+            [
+                dict(zip(state.keys(), unit_values))
+                for unit_values in zip(
+                    *(np.asarray(values).ravel().tolist() for values in state.values())
                 )
+            ],
+        )
+
+    @if_created
+    def restore_state(self):
+        """Restore the parameters changed by ``set_state`` to their initial value.
+
+        Parameters are restored to the value they had before the first call to
+        ``set_state`` that changed them.
+        """
+        import nest
+
+        for population_name, initial_state in self._initial_state.items():
+            if not initial_state:
+                continue
+            log.info(
+                f"Layer='{self.name}', pop='{population_name}': Restoring "
+                f"initial value of params {list(initial_state)}"
+            )
+            gids = self._population_gids[population_name].ravel().tolist()
+            nest.SetStatus(
+                gids,
+                [
+                    dict(zip(initial_state.keys(), unit_values))
+                    for unit_values in zip(*initial_state.values())
+                ],
+            )
+        self._initial_state = {}
 
     @staticmethod
     def set_unit_state(gids, params, change_type="constant"):
@@ -232,11 +368,15 @@ class AbstractLayer(NestObject):
 
         Args:
             gids (list(int)): Gids of units to change the state of
-            params (dict): ``{param_name: param_change}`` dictionary describing
-                the modified parameters. The `param_change` values used for
-                modification are set directly or added/multiplied to the current
-                value of the parameter for each unit, depending on the
-                ``'change_type'`` kwarg
+            params (dict | list(dict)): ``{param_name: param_change}``
+                dictionary describing the modified parameters, or list of such
+                dictionaries (one per unit in ``gids``). The `param_change`
+                values used for modification are set directly or
+                added/multiplied to the current value of the parameter for
+                each unit, depending on the ``'change_type'`` kwarg. For
+                'multiplicative' and 'additive' changes, `param_change` may be
+                a numpy array broadcastable to ``(len(gids),)``, in which case
+                each unit is changed by its own value.
 
         Keyword Args:
             change_type ('constant', 'multiplicative' or 'additive'). If
@@ -257,46 +397,63 @@ class AbstractLayer(NestObject):
         if change_type == "constant":
             nest.SetStatus(gids, params)
         else:
+            if not len(gids):
+                return
+            # Operands as arrays of shape (len(gids),)
+            if isinstance(params, Mapping):
+                param_names = list(params.keys())
+                operands = {
+                    param_name: params[param_name] for param_name in param_names
+                }
+            else:
+                param_names = list(params[0].keys())
+                operands = {
+                    param_name: [unit_params[param_name] for unit_params in params]
+                    for param_name in param_names
+                }
+            try:
+                operands = {
+                    param_name: np.broadcast_to(
+                        np.asarray(operand, dtype=float), (len(gids),)
+                    )
+                    for param_name, operand in operands.items()
+                }
+            except (TypeError, ValueError) as error:
+                raise ValueError(
+                    f"Invalid values for '{change_type}' change of parameter(s)"
+                    f" {param_names}: expecting numbers or arrays broadcastable"
+                    f" to the number of units ({len(gids)})."
+                ) from error
+            # Current values of all the parameters, in one call
             current_values = {
-                param_name: nest.GetStatus(gids, param_name)
-                for param_name in params.keys()
+                param_name: np.array(values)
+                for param_name, values in zip(
+                    param_names, zip(*nest.GetStatus(gids, param_names))
+                )
             }
-            if not all([
-                isinstance(v, float)
-                for unit_values in current_values.values()
-                for v in unit_values
-            ]):
+            if not all(
+                values.dtype.kind == "f" for values in current_values.values()
+            ):
                 raise ValueError(
                     "Can't set state multiplicatively for non-float"
-                    f" parameter(s) {params.keys()}."
+                    f" parameter(s) {param_names}."
                     f" Expecting ``change_type='constant'``."
                 )
             if change_type == 'multiplicative':
-                set_values = {
-                    param_name: [
-                        v * params[param_name]
-                        for v in current_values[param_name]
-                    ]
-                    for param_name in params.keys()
-                }  # {param: [v_gid1, v_gid2, ...]}
+                operation = np.multiply
             elif change_type == 'additive':
-                set_values = {
-                    param_name: [
-                        v + params[param_name]
-                        for v in current_values[param_name]
-                    ]
-                    for param_name in params.keys()
-                }  # {param: [v_gid1, v_gid2, ...]}
+                operation = np.add
             else:
                 assert False
+            set_values = [
+                operation(current_values[param_name], operands[param_name]).tolist()
+                for param_name in param_names
+            ]  # [[v_gid1, v_gid2, ...] for each param]
             nest.SetStatus(
                 gids,
                 [
-                    {
-                        param_name: set_values[param_name][gid_i]
-                        for param_name in params.keys()
-                    }  # {param: gid_param_value}
-                    for gid_i in range(len(gids))
+                    dict(zip(param_names, unit_values))
+                    for unit_values in zip(*set_values)
                 ]  # One param dict per unit
             )
 
@@ -364,35 +521,123 @@ class Layer(AbstractLayer):
 
         self._gid = tp.CreateLayer(self.nest_params)
         self._gids = nest.GetNodes(self.gid)[0]
+        gids = np.asarray(self._gids, dtype=int)
+        # Population of each unit, from a single bulk query
+        models = np.array(
+            [str(model) for model in nest.GetStatus(self._gids, "model")]
+        )
+        population = np.full(len(gids), -1, dtype=int)
+        for pop_i, population_name in enumerate(self.population_names):
+            population[models == population_name] = pop_i
+        assert np.all(population >= 0)
+        # Location of each unit, from its position in space. Columns are
+        # ordered along x and rows along decreasing y.
+        positions = np.round(np.array(tp.GetPosition(self._gids)), decimals=9)
+        x_values, col = np.unique(positions[:, 0], return_inverse=True)
+        y_values, row = np.unique(positions[:, 1], return_inverse=True)
+        assert (len(y_values), len(x_values)) == self.shape
+        row = len(y_values) - 1 - row
+        # Index of each unit within its population at its location: rank by
+        # GID among the units sharing population and location
+        order = np.lexsort((gids, col, row, population))
+        keys = np.stack([population[order], row[order], col[order]])
+        is_first = np.ones(len(order), dtype=bool)
+        is_first[1:] = np.any(keys[:, 1:] != keys[:, :-1], axis=0)
+        positions_in_order = np.arange(len(order))
+        group_start = np.maximum.accumulate(
+            np.where(is_first, positions_in_order, 0)
+        )
+        unit = np.empty(len(order), dtype=int)
+        unit[order] = positions_in_order - group_start
+        self._build_index(gids, population, row, col, unit)
+
+    def _build_index(self, gid, population, row, col, unit):
+        """Build the index of the layer's units and the location mappings.
+
+        Args:
+            gid, population, row, col, unit (array-like): Parallel arrays with
+                one entry per unit: GID, population (index in
+                ``self.population_names``), location within the layer and
+                index of the unit within the population at that location.
+        """
+        index = {
+            "gid": np.asarray(gid, dtype=int),
+            "population": np.asarray(population, dtype=int),
+            "row": np.asarray(row, dtype=int),
+            "col": np.asarray(col, dtype=int),
+            "unit": np.asarray(unit, dtype=int),
+        }
+        # Reorder to match the order of ``self._gids``
+        layer_gids = np.asarray(self._gids, dtype=int)
+        sorter = np.argsort(index["gid"])
+        order = sorter[
+            np.searchsorted(index["gid"], layer_gids, sorter=sorter)
+            % len(sorter)
+        ]
+        assert np.array_equal(index["gid"][order], layer_gids)
+        self._index = {key: array[order] for key, array in index.items()}
+        # Grid of GIDs for each population
+        self._population_gids = {}
+        for pop_i, population in enumerate(self.population_names):
+            mask = self._index["population"] == pop_i
+            grid = np.zeros(self.population_shapes[population], dtype=int)
+            grid[
+                self._index["row"][mask],
+                self._index["col"][mask],
+                self._index["unit"][mask],
+            ] = self._index["gid"][mask]
+            assert np.all(grid > 0)
+            self._population_gids[population] = grid
         # Update _layer_locations: eg ``{gid: (row, col)}``
         # and _population_locations: ``{gid: (row, col, unit_index)}``
-        for index, _ in np.ndenumerate(np.empty(self.shape)):  # Hacky
-            for population in self.population_names:
-                # Match population and location
-                loc_pop_gids = [
-                    gid for gid in tp.GetElement(self._gid, index[::-1])
-                    if nest.GetStatus((gid,), "model")[0] == population
-                ]
-                # IMPORTANT: rows and columns are switched in the GetElement
-                # query
-                for k, gid in enumerate(loc_pop_gids):
-                    self._layer_locations[gid] = index
-                    self._population_locations[gid] = index + (k,)
-        assert set(self._gids) == set(self._layer_locations.keys())
+        gids = self._index["gid"].tolist()
+        rows = self._index["row"].tolist()
+        cols = self._index["col"].tolist()
+        units = self._index["unit"].tolist()
+        self._layer_locations = dict(zip(gids, zip(rows, cols)))
+        self._population_locations = dict(zip(gids, zip(rows, cols, units)))
 
     @if_created
     def gids(self, population=None, location=None, population_location=None):
-        import nest
-
-        return [
-            gid for gid in self._gids
-            if (population is None
-                or nest.GetStatus((gid,), "model")[0] == population) \
-            and (location is None
-                 or list(self.locations[gid]) == list(location)) \
-            and (population_location is None
-                 or list(self.population_locations[gid]) == list(population_location))
-        ]
+        if population is not None and population not in self.populations:
+            return []
+        # Direct lookup in the population's grid of GIDs
+        if population is not None and population_location is not None:
+            population_location = tuple(population_location)
+            if not _in_bounds(
+                population_location, self.population_shapes[population]
+            ) or (
+                location is not None
+                and tuple(location) != population_location[:2]
+            ):
+                return []
+            return [int(self._population_gids[population][population_location])]
+        if population is not None and location is not None:
+            location = tuple(location)
+            if not _in_bounds(location, self.shape):
+                return []
+            return self._population_gids[population][location].tolist()
+        # Otherwise mask the index
+        mask = np.ones(len(self._index["gid"]), dtype=bool)
+        if population is not None:
+            mask &= (
+                self._index["population"] == self.population_names.index(population)
+            )
+        if location is not None:
+            if len(location) != 2:
+                return []
+            mask &= (self._index["row"] == location[0]) & (
+                self._index["col"] == location[1]
+            )
+        if population_location is not None:
+            if len(population_location) != 3:
+                return []
+            mask &= (
+                (self._index["row"] == population_location[0])
+                & (self._index["col"] == population_location[1])
+                & (self._index["unit"] == population_location[2])
+            )
+        return self._index["gid"][mask].tolist()
 
     @property
     def shape(self):
@@ -447,6 +692,13 @@ class Layer(AbstractLayer):
         return self.population_names
 
 
+def _in_bounds(index, shape):
+    """Return True if ``index`` is a valid (non-negative) index for ``shape``."""
+    return len(index) == len(shape) and all(
+        0 <= i < n for i, n in zip(index, shape)
+    )
+
+
 class InputLayer(Layer):
     """A layer of stimulators
 
@@ -502,13 +754,17 @@ class InputLayer(Layer):
         super().create()
         import nest
 
-        # Connect stimulators to parrots, one-to-one
-        stim_gids = []
-        parrot_gids = []
-        for loc in self:
-            stim_gids += self.gids(location=loc, population=self.stimulator_model)
-            parrot_gids += self.gids(location=loc, population=self.PARROT_MODEL)
-        nest.Connect(stim_gids, parrot_gids, "one_to_one", {"model": "static_synapse"})
+        # Connect stimulators to parrots, one-to-one. Both populations have
+        # the same shape so their GID grids pair units by location.
+        if self.PARROT_MODEL in self.populations:
+            stim_gids = self._population_gids[self.stimulator_model].ravel()
+            parrot_gids = self._population_gids[self.PARROT_MODEL].ravel()
+            nest.Connect(
+                stim_gids.tolist(),
+                parrot_gids.tolist(),
+                "one_to_one",
+                {"model": "static_synapse"},
+            )
         # Get stimulator type
         self.stimulator_type = nest.GetDefaults(self.stimulator_model, "type_id")
 
@@ -104,3 +104,27 @@ class SynapseModel(Model):
             nest_params["receptor_type"] = receptor_ids[receptor_name]
         # Initialize Model
         super().__init__(name, params, nest_params)
+
+
+class RecorderModel(Model):
+    """Represents a NEST recorder model.
+
+    Args:
+        name (str): Name of the model
+        params (dict-like): `params` of the object. Should countain the
+            `nest_model` key. The following keys are recognized:
+                - ``harvest`` (bool): If true, recorders of this model record
+                    to memory only (the ``record_to`` NEST parameter is set to
+                    ``['memory']``), and their events are saved to binary
+                    files and cleared from memory after each session (see
+                    :meth:`Network.harvest_recorders`). (default ``False``)
+        nest_params (dict-like): Dictionary passed to NEST during the
+            ``nest.CopyModel`` of ``nest.SetDefaults`` call.
+    """
+
+    OPTIONAL_PARAMS = {"harvest": False}
+
+    def __init__(self, name, params, nest_params):
+        super().__init__(name, params, nest_params)
+        if self.params["harvest"]:
+            self.nest_params["record_to"] = ["memory"]
@@ -4,9 +4,19 @@
 
 """ProjectionModel and Projection objects."""
 
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+import numpy as np
+
 from ..base_object import NestObject
+from ..io.save import atomic_write
 from ..utils.validation import ParameterError
-from .utils import if_not_created
+from .utils import if_created, if_not_created
+
+log = logging.getLogger(__name__)
 
 
 class ProjectionModel(NestObject):
@@ -174,6 +184,165 @@ class BaseProjection(NestObject):
     def _nest_synapse_model_name(self):
         return f"{self._base_synapse_model}-{self.__str__()}"
 
+    def _connections(self):
+        """Return the NEST connections of this projection."""
+        import nest
+
+        return nest.GetConnections(
+            source=self.source.gids(population=self.source_population),
+            target=self.target.gids(population=self.target_population),
+            synapse_model=self.nest_synapse_model,
+        )
+
+    def may_share_connections(self, other):
+        """Return whether ``other`` may create connections of this projection.
+
+        Two projections may create the same connections if they connect the
+        same layers with the same synapse model and their source and target
+        populations overlap. The connections of both projections are then
+        returned by :meth:`_connections`.
+        """
+
+        def overlap(population, other_population):
+            return (
+                population is None
+                or other_population is None
+                or population == other_population
+            )
+
+        return (
+            self.source is other.source
+            and self.target is other.target
+            and self.nest_synapse_model == other.nest_synapse_model
+            and overlap(self.source_population, other.source_population)
+            and overlap(self.target_population, other.target_population)
+        )
+
+    def connectivity_key(self, previous_key=""):
+        """Return a key identifying the connections created by this projection.
+
+        The key hashes the projection's parameters, the default weight and
+        delay of its synapse model, the geometry and populations of the source
+        and target layers, and the kernel's seeds and number of virtual
+        processes. Since the connections drawn by NEST depend on the state of
+        the random number generators, and therefore on the projections created
+        earlier, the key of the previously created projection should be passed
+        as ``previous_key``.
+        """
+        import nest
+
+        def layer_spec(layer):
+            return {
+                "type": type(layer).__name__,
+                "populations": layer.populations,
+                "nest_params": layer.nest_params,
+            }
+
+        spec = {
+            "previous_key": previous_key,
+            "projection": str(self),
+            "nest_params": self.nest_params,
+            "synapse_defaults": nest.GetDefaults(
+                self.nest_synapse_model, ["weight", "delay"]
+            ),
+            "source": layer_spec(self.source),
+            "target": layer_spec(self.target),
+            "kernel": nest.GetKernelStatus(
+                ["grng_seed", "rng_seeds", "total_num_virtual_procs"]
+            ),
+        }
+        return hashlib.sha256(
+            json.dumps(spec, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+    def _save_connections(self, path, connections):
+        """Save connections to a file, with layer-relative sources and targets."""
+        import nest
+
+        sources, targets, weights, delays = (
+            np.array(values) for values in zip(
+                *nest.GetStatus(connections, ["source", "target", "weight", "delay"])
+            )
+        ) if connections else ([], [], [], [])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(path) as f:
+            np.savez(
+                f,
+                sources=np.searchsorted(sorted(self.source.gids()), sources),
+                targets=np.searchsorted(sorted(self.target.gids()), targets),
+                weights=np.asarray(weights, dtype=float),
+                delays=np.asarray(delays, dtype=float),
+            )
+
+    def _load_connections(self, path):
+        """Create the connections saved in a file."""
+        import nest
+
+        with np.load(path) as connections:
+            sources = np.array(sorted(self.source.gids()))[connections["sources"]]
+            targets = np.array(sorted(self.target.gids()))[connections["targets"]]
+            if not len(sources):
+                return
+            nest.Connect(
+                sources.tolist(),
+                targets.tolist(),
+                "one_to_one",
+                {
+                    "model": self.nest_synapse_model,
+                    "weight": connections["weights"],
+                    "delay": connections["delays"],
+                },
+            )
+
+    @if_created
+    def get_weights(self):
+        """Return the weights of this projection's connections.
+
+        Returns:
+            tuple(np.ndarray): ``(sources, targets, weights)`` arrays with an
+            entry per connection.
+        """
+        import nest
+
+        connections = self._connections()
+        if not connections:
+            return (np.array([], dtype=int), np.array([], dtype=int),
+                    np.array([], dtype=float))
+        sources, targets, weights = zip(
+            *nest.GetStatus(connections, ["source", "target", "weight"])
+        )
+        return np.array(sources), np.array(targets), np.array(weights, dtype=float)
+
+    @if_created
+    def set_weights(self, sources, targets, weights):
+        """Set the weights of this projection's connections.
+
+        ``sources``, ``targets`` and ``weights`` are arrays with an entry per
+        connection, in the order returned by :meth:`get_weights`. Raises a
+        ``ValueError`` if the sources and targets don't match the
+        projection's connections.
+        """
+        import nest
+
+        connections = self._connections()
+        if connections:
+            current_sources, current_targets = (
+                np.array(values)
+                for values in zip(*nest.GetStatus(connections, ["source", "target"]))
+            )
+        else:
+            current_sources = current_targets = np.array([], dtype=int)
+        if not (
+            np.array_equal(current_sources, sources)
+            and np.array_equal(current_targets, targets)
+        ):
+            raise ValueError(
+                f"Projection `{self}`: Can't set weights: the given sources "
+                f"and targets don't match the projection's connections."
+            )
+        if connections:
+            nest.SetStatus(connections, "weight", np.asarray(weights).tolist())
+
     # Save and plot stuff
     def save(self, output_dir):
         pass
@@ -211,7 +380,53 @@ class TopoProjection(BaseProjection):
 
     # Creation functions not inherited from BaseProjection
 
+    @staticmethod
+    def cache_path(cache_dir, cache_key):
+        """Return the path to the file of cached connections."""
+        return Path(cache_dir, f"connections-{cache_key}.npz")
+
     @if_not_created
-    def create(self):
-        """Create the projections in NEST using ``tp.ConnectLayers``."""
+    def create(self, cache_dir=None, cache_key=None, overwrite_cache=False,
+               exclude_existing=True):
+        """Create the projections in NEST using ``tp.ConnectLayers``.
+
+        Keyword Args:
+            cache_dir (str | Path | None): Directory in which the realized
+                connections are cached. If a file for ``cache_key`` exists in
+                ``cache_dir``, connections are created from the file with
+                ``nest.Connect`` rather than drawn with ``tp.ConnectLayers``.
+                Otherwise, the connections created by ``tp.ConnectLayers`` are
+                saved in the file. Only the source, target, weight and delay
+                of each connection are cached. Ignored if ``None``.
+            cache_key (str | None): Key of the cached connections (see
+                :meth:`connectivity_key`). Required if ``cache_dir`` is set.
+            overwrite_cache (bool): If true, connections are drawn and saved
+                even if they are cached. (default ``False``)
+            exclude_existing (bool): Whether the connections that exist before
+                the projection is created are excluded from the cached
+                connections. Requires querying the connections of the
+                projection before creating it. May be false if no projection
+                sharing connections with this one (see
+                :meth:`may_share_connections`) was created before.
+                (default ``True``)
+        """
+        if cache_dir is None:
+            self.source._connect(self.target, self.nest_params)
+            return
+        path = self.cache_path(cache_dir, cache_key)
+        if path.exists() and not overwrite_cache:
+            log.info(f"Loading connections of projection `{self}` from {path}")
+            self._load_connections(path)
+            return
+        existing = (
+            set(tuple(conn) for conn in self._connections())
+            if exclude_existing else set()
+        )
         self.source._connect(self.target, self.nest_params)
+        log.info(f"Caching connections of projection `{self}` at {path}")
+        connections = self._connections()
+        if existing:
+            connections = [
+                conn for conn in connections if tuple(conn) not in existing
+            ]
+        self._save_connections(path, connections)
@@ -6,8 +6,11 @@
 
 import logging
 
+import numpy as np
+
 from ..base_object import NestObject
 from ..io import save
+from ..io.load import column_dtypes
 from .utils import if_created, if_not_created
 
 log = logging.getLogger(__name__)
@@ -17,6 +20,17 @@ log = logging.getLogger(__name__)
 # parameters are set in `populations.yml` rather than `recorders.yml`
 NON_NEST_PARAMS = {}
 
+# Format of the data of harvested recorders (see ``BaseRecorder.harvest``)
+COLUMNAR_FORMAT = "columnar"
+# Keys of the recorders' ``events`` dictionary holding the columns of the
+# recorded data. Other columns (recorded variables) have the same name.
+EVENT_KEYS = {
+    "gid": "senders",
+    "target": "targets",
+    "time": "times",
+    "weight": "weights",
+}
+
 
 class BaseRecorder(NestObject):
     """Base class for all recorder classes. Represent nodes (not models).
@@ -25,11 +39,20 @@ class BaseRecorder(NestObject):
         model (str): Model of the recorder in NEST. This should be a native
             model in NEST, or a recorder model defined via ``recorder_models``
             network parameters.
+
+    Keyword Args:
+        harvest (bool): Whether the recorder is "harvested": after each
+            session, its events are appended to one binary file per column in
+            the raw data directory and cleared from memory (see
+            :meth:`Network.harvest_recorders`). Set from the ``harvest``
+            parameter of the recorder model (see :class:`RecorderModel`).
+            (default ``False``)
     """
 
-    def __init__(self, model):
+    def __init__(self, model, harvest=False):
         super().__init__(model, {}, {})
         self._model = model
+        self._harvest = harvest
         self._type = None
         # Attributes below may depend on NEST default and recorder models and
         # are updated after creation
@@ -61,6 +84,11 @@ class BaseRecorder(NestObject):
         """Return type of recorder ('spike_detector', 'multimeter', ...)"""
         return self._type
 
+    @property
+    def harvested(self):
+        """Whether the recorder's events are harvested from memory."""
+        return self._harvest
+
     def __str__(self):
         raise NotImplementedError
 
@@ -104,6 +132,10 @@ class BaseRecorder(NestObject):
         """
         import nest
 
+        if self.harvested:
+            return [
+                f"{self._label}-{colname}.bin" for colname in self.raw_data_colnames()
+            ]
         if "file" not in self._record_to:
             return []
         assert self._label is not None  # Check that the label has been set
@@ -118,12 +150,42 @@ class BaseRecorder(NestObject):
     @if_created
     def get_base_metadata_dict(self):
         """Return metadata dict common to all recorder types."""
-        return {
+        metadata = {
             "type": self._type,
             "label": self._label,
             "colnames": self.raw_data_colnames(),
             "filenames": self.raw_data_filenames(),
         }
+        if self.harvested:
+            metadata.update(
+                {
+                    "format": COLUMNAR_FORMAT,
+                    "dtypes": column_dtypes(metadata["colnames"]),
+                }
+            )
+        return metadata
+
+    @if_created
+    def harvest(self, events, output_dir):
+        """Append events to the recorder's columnar data files.
+
+        Each column is appended in binary form to its own file (see
+        :meth:`raw_data_filenames`) with the dtype saved in the metadata.
+
+        Args:
+            events (dict): ``events`` dictionary of the recorder node in NEST.
+            output_dir (str or Path): Output directory of the simulation.
+        """
+        colnames = self.raw_data_colnames()
+        dtypes = column_dtypes(colnames)
+        data_dir = save.output_subdir(output_dir, "raw_data")
+        for colname, filename in zip(colnames, self.raw_data_filenames()):
+            values = np.asarray(
+                events.get(EVENT_KEYS.get(colname, colname), []),
+                dtype=dtypes[colname],
+            )
+            with open(data_dir / filename, "ab") as f:
+                values.tofile(f)
 
     def save_metadata(self):
         """Save metadata for recorder."""
@@ -147,13 +209,16 @@ class PopulationRecorder(BaseRecorder):
             network parameters. (eg: 'multimeter' or 'modified_multimeter')
         layer (Layer): Layer object
         population_name (str): Name of population to connect to.
+
+    Keyword Args:
+        harvest (bool): Passed to :class:`BaseRecorder`.
     """
 
     POP_RECORDER_TYPES = ["multimeter", "spike_detector"]
 
-    def __init__(self, model, layer, population_name):
+    def __init__(self, model, layer, population_name, harvest=False):
         """Initialize PopulationRecorder object."""
-        super().__init__(model)
+        super().__init__(model, harvest=harvest)
         self.layer = layer
         self._population_name = population_name  # Name of recorded population
         self._layer_name = self.layer.name  # Name of recorded pop's layer
@@ -295,13 +360,16 @@ class ProjectionRecorder(BaseRecorder):
             ``recorder_models`` network parameters. (eg: 'weight_recorder')
         projection (``Projection``): ``Projection`` object the recorder is
             connected to.
+
+    Keyword Args:
+        harvest (bool): Passed to :class:`BaseRecorder`.
     """
 
     # pylint:disable=too-many-instance-attributes
     CONNECTION_RECORDER_TYPES = ["weight_recorder"]
 
-    def __init__(self, model, projection):
-        super().__init__(model)
+    def __init__(self, model, projection, harvest=False):
+        super().__init__(model, harvest=harvest)
         self._model = model
         self._projection = projection
         self._projection_name = str(projection)
@@ -357,6 +425,8 @@ class ProjectionRecorder(BaseRecorder):
     def raw_data_colnames(self):
         """Return column names of raw data files for pandas loading."""
         if self._type == "weight_recorder":
+            if self.harvested:
+                return ["gid", "target", "time", "weight"]
             # TODO
             return None
 
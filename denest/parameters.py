@@ -4,6 +4,8 @@
 
 """Provide the ``ParamsTree`` class."""
 
+import hashlib
+import weakref
 from collections import ChainMap, UserDict
 from collections.abc import Mapping
 from pprint import pformat
@@ -12,6 +14,9 @@ import yaml
 
 _MAX_LINES = 30
 
+# Use the LibYAML parser when available
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 class InvalidTreeError(ValueError):
     """Raised when a mapping is not a valid ``ParamsTree``."""
@@ -20,9 +25,15 @@ class InvalidTreeError(ValueError):
 
 
 class DeepChainMap(ChainMap):
-    """Variant of ChainMap that allows direct updates to inner scopes."""
+    """Variant of ChainMap that allows direct updates to inner scopes.
+
+    If ``node`` is set, the node is notified of updates.
+    """
+
+    node = None
 
     def __setitem__(self, key, value):
+        self._touch()
         for mapping in self.maps:
             if key in mapping:
                 mapping[key] = value
@@ -32,10 +43,86 @@ class DeepChainMap(ChainMap):
     def __delitem__(self, key):
         for mapping in self.maps:
             if key in mapping:
+                self._touch()
                 del mapping[key]
                 return
         raise KeyError(key)
 
+    # ``update`` and ``setdefault`` call ``__setitem__``. The other mutating
+    # methods of ChainMap modify the first mapping directly.
+
+    def pop(self, key, *args):
+        self._touch()
+        return super().pop(key, *args)
+
+    def popitem(self):
+        self._touch()
+        return super().popitem()
+
+    def clear(self):
+        self._touch()
+        super().clear()
+
+    def __ior__(self, other):
+        self._touch()
+        return super().__ior__(other)
+
+    def _touch(self):
+        if self.node is not None:
+            self.node._touch()
+
+
+class _Children(dict):
+    """Dictionary of a node's children that notifies the node of updates."""
+
+    def __init__(self, node, *args, **kwargs):
+        self.node = node
+        super().__init__(*args, **kwargs)
+
+    def __setitem__(self, key, value):
+        self.node._touch()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self.node._touch()
+        super().__delitem__(key)
+
+    def pop(self, key, *args):
+        self.node._touch()
+        return super().pop(key, *args)
+
+    def popitem(self):
+        self.node._touch()
+        return super().popitem()
+
+    def clear(self):
+        self.node._touch()
+        super().clear()
+
+    def update(self, *args, **kwargs):
+        self.node._touch()
+        super().update(*args, **kwargs)
+
+    def setdefault(self, key, default=None):
+        self.node._touch()
+        return super().setdefault(key, default)
+
+    def __ior__(self, other):
+        self.node._touch()
+        return super().__ior__(other)
+
+
+def _canonical(value):
+    """Return a string representation of a value independent of key order."""
+    if isinstance(value, Mapping):
+        items = sorted(
+            f"{_canonical(key)}:{_canonical(item)}" for key, item in value.items()
+        )
+        return "{" + ",".join(items) + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join(_canonical(item) for item in value) + "]"
+    return repr(value)
+
 
 class ParamsTree(UserDict):
     """A tree of nodes that inherit and override ancestors' data.
@@ -46,6 +133,14 @@ class ParamsTree(UserDict):
     keys.
     Note that the order of traversals is undefined.
 
+    Children are built when they are first accessed, and the mapping is
+    validated once when building the root. Copied and merged trees share
+    structure with the trees they are created from: subtrees are only copied
+    when they are first accessed, or before a shared subtree is modified
+    through its ``params``, ``nest_params`` or ``children`` attributes
+    (copy-on-write), so that modifications of a tree are never visible in its
+    copies.
+
     Keyword Args:
         mapping (Mapping): A dictionary-like object that maps names to
             children, but with special key-value pairs containing the node's
@@ -81,21 +176,40 @@ class ParamsTree(UserDict):
         # Data internal to this node. Keys are those specified by DATA_KEYS.
         # Each data key contains an empty dictionary by default.
         self._data = {key: mapping.get(key, {}) for key in self.DATA_KEYS}
-        # Accessible data (inherits from parents)
+        # Accessible data (inherits from parents). The parent's data already
+        # chains all the ancestors' data, so we reuse its maps.
         super().__init__(self._data)
         self.data = {
             key: DeepChainMap(
                 self.data[key],
-                *(ancestor.node_data[key] for ancestor in self.ancestors()),
+                *(
+                    () if parent is None
+                    else getattr(parent.data[key], 'maps', [parent.data[key]])
+                ),
             )
             for key in self.DATA_KEYS
         }
+        for value in self.data.values():
+            value.node = self
         # Children
-        self._children = {
-            key: ParamsTree(value, parent=self, name=key)
-            for key, value in mapping.items()
-            if key not in self.DATA_KEYS
-        }
+        self._children = _Children(self)
+        # Sources of the children that are built on first access: either
+        # tree-like mappings (validated along with this node's mapping) or
+        # nodes from other trees that are copied.
+        self._child_sources = {}
+        # Nodes holding this node as the source of one of their children:
+        # ``[(<weakref to node>, <child name>)]``. They copy this node
+        # before it is modified (see ``_unshare``).
+        self._sharers = []
+        for key, value in mapping.items():
+            if key not in self.DATA_KEYS:
+                self._set_child_source(key, value)
+        # Content hash cache: ``(<root version>, <hash>)``. The version of the
+        # root is incremented whenever the tree is modified.
+        self._version = 0
+        self._hash = None
+        # Compiled tree cache: ``(<root version>, <compiled tree>)``
+        self._compiled = None
         # Syntactic sugar to allow data keys to be accessed as attributes
         for data_key, value in self.data.items():
             setattr(self, data_key, value)
@@ -125,9 +239,124 @@ class ParamsTree(UserDict):
 
     @property
     def children(self):
-        """A dictionary of this node's children"""
+        """A dictionary of this node's children
+
+        Children are built on first access.
+        """
+        for name in list(self._child_sources):
+            self._build_child(name)
         return self._children
 
+    def _build_child(self, name):
+        """Build a child from its source and return it."""
+        source = self._child_sources.pop(name)
+        if isinstance(source, ParamsTree):
+            source._sharers = [
+                (ref, child_name) for ref, child_name in source._sharers
+                if not (ref() is self and child_name == name)
+            ]
+            child = source.copy(parent=self, name=name)
+        else:
+            # Own data is copied so that trees built from the same mapping
+            # don't share data
+            if source is None:
+                source = {}
+            source = {
+                key: dict(value) if key in self.DATA_KEYS else value
+                for key, value in source.items()
+            }
+            child = type(self)(source, parent=self, name=name, validate=False)
+        dict.__setitem__(self._children, name, child)
+        return child
+
+    def _set_child_source(self, name, source):
+        """Set the source of a child that is built on first access."""
+        self._child_sources[name] = source
+        if isinstance(source, ParamsTree):
+            source._sharers.append((weakref.ref(self), name))
+
+    def _unshare(self):
+        """Build the children copied from this node or its ancestors.
+
+        Called before this node is modified, so that the trees sharing this
+        node (or an ancestor of it) as the source of a child that was not
+        built yet copy it in its current state. Nodes are unshared from the
+        root down, since copying an ancestor shares its children with the
+        copy.
+        """
+        for node in reversed([self] + self.ancestors()):
+            sharers, node._sharers = node._sharers, []
+            for ref, name in sharers:
+                sharer = ref()
+                if sharer is not None and sharer._child_sources.get(name) is node:
+                    sharer._build_child(name)
+
+    def _child(self, name):
+        """Return a child, building only that child if needed."""
+        if name in self._child_sources:
+            return self._build_child(name)
+        return self._children[name]
+
+    def _all_children(self):
+        """Return this node's children without building them.
+
+        Children that have not been built yet are represented by their source
+        (a mapping or a node from another tree).
+        """
+        return {**self._children, **self._child_sources}
+
+    def root(self):
+        """Return the root of the tree this node belongs to."""
+        node = self
+        while node.parent is not None:
+            node = node.parent
+        return node
+
+    def _touch(self):
+        """Prepare the node for a modification.
+
+        Copies of the node are built (see ``_unshare``) and the content hashes
+        of the tree are invalidated.
+        """
+        self._unshare()
+        self.root()._version += 1
+
+    def content_hash(self):
+        """Return a hash of the content of this node and its descendants.
+
+        The hash covers the node's own data and the hashes of its named
+        children. For leaves, the data inherited from ancestors is hashed as
+        well, so that two leaves have the same hash if their accessible data
+        is the same. The hash doesn't depend on the node's name or on the
+        order of keys.
+
+        Hashes are cached until the tree is modified through the ``params``,
+        ``nest_params`` or ``children`` attributes. Modifications of the
+        ``node_data`` dictionaries or of the data of compiled trees (see
+        :meth:`compile`) are not detected.
+
+        Returns:
+            str: Hexadecimal SHA-256 digest.
+        """
+        version = self.root()._version
+        if self._hash is not None and self._hash[0] == version:
+            return self._hash[1]
+        children = self.children
+        data = self.node_data if children else self.data
+        digest = hashlib.sha256(
+            _canonical(
+                {
+                    "data": {key: dict(value) for key, value in data.items()},
+                    "children": {
+                        name: child.content_hash()
+                        for name, child in children.items()
+                    },
+                }
+            ).encode()
+        ).hexdigest()
+        self._hash = (version, digest)
+        return digest
+
     def ancestors(self):
         """Return a list of ancestors of this node.
 
@@ -176,6 +405,10 @@ class ParamsTree(UserDict):
 
         Equivalent nodes' data is merged horizontally before hierarchical
         inheritance.
+
+        Subtrees that exist in a single tree are shared rather than rebuilt, so
+        the cost of merging a small tree onto a large one is proportional to
+        the size of the small tree.
         """
         # Merge node's own data
         data = {
@@ -186,26 +419,105 @@ class ParamsTree(UserDict):
         merged = cls(mapping=data, parent=parent, name=name)
         # Merge children recursively, passing parent so that children inherit
         # merged node's data
-        children = set.union(*(set(tree.children) for tree in trees))
-        merged._children = {
-            name: cls.merge(
-                *(tree.children[name] for tree in trees if name in tree.children),
-                parent=merged,
-                name=name,
+        all_children = [tree._all_children() for tree in trees]
+        for name in set.union(*(set(children) for children in all_children)):
+            having = [
+                (tree, children) for tree, children in zip(trees, all_children)
+                if name in children
+            ]
+            if len(having) == 1:
+                merged._set_child_source(name, having[0][1][name])
+            else:
+                merged._children[name] = cls.merge(
+                    *(tree._child(name) for tree, _ in having),
+                    parent=merged,
+                    name=name,
+                )
+        return merged
+
+    def compile(self, parent=None):
+        """Return a copy of this tree with inheritance resolved.
+
+        In the compiled tree, the data accessible from each node (``params``
+        and ``nest_params``) is a plain dictionary containing the node's data
+        and that inherited from its ancestors, so that lookups don't walk the
+        ancestor chain. Inheritance is resolved once, top-down.
+
+        .. note::
+            The compiled tree is a snapshot: subsequent changes to the
+            original tree (or to a compiled node's data) are not propagated to
+            the compiled nodes' descendants.
+
+        Keyword Args:
+            parent (ParamsTree | None): Parent of the compiled tree. Ignored if
+                ``None``. Data inherited from ``parent`` is resolved as well.
+        """
+        compiled = type(self)(
+            {key: dict(value) for key, value in self.node_data.items()},
+            parent=parent,
+            name=self.name,
+            validate=False,
+        )
+        # Resolve inherited data: {**parent_data, **own_data}
+        compiled.data = {
+            key: (
+                dict(compiled.node_data[key]) if parent is None
+                else {**parent.data[key], **compiled.node_data[key]}
             )
-            for name in children
+            for key in self.DATA_KEYS
         }
-        return merged
+        for data_key, value in compiled.data.items():
+            setattr(compiled, data_key, value)
+        compiled._children = _Children(compiled, {
+            name: child.compile(parent=compiled)
+            for name, child in self.children.items()
+        })
+        return compiled
+
+    def compiled(self):
+        """Return this tree compiled with the data inherited from its parent.
+
+        Equivalent to ``self.compile(parent=self.parent)``. Like content
+        hashes (see :meth:`content_hash`), the compiled tree is cached until
+        the tree is modified, so it should not be modified itself.
+        """
+        version = self.root()._version
+        if self._compiled is None or self._compiled[0] != version:
+            self._compiled = (version, self.compile(parent=self.parent))
+        return self._compiled[1]
 
-    def copy(self):
-        """Copy this ``ParamsTree``."""
-        return ParamsTree(self.asdict())
+    def copy(self, parent=None, name=None):
+        """Copy this ``ParamsTree``.
+
+        The node's data is copied. Children are shared with this tree until
+        they are first accessed or until they are modified in this tree.
+
+        Keyword Args:
+            parent (ParamsTree | None): Parent of the copy, from which the
+                copy inherits data.
+            name (str | None): Name of the copy.
+        """
+        copy = type(self)(
+            {key: dict(value) for key, value in self.node_data.items()},
+            parent=parent,
+            name=name,
+            validate=False,
+        )
+        for child_name, child in self._all_children().items():
+            copy._set_child_source(child_name, child)
+        return copy
 
     def asdict(self):
         """Convert this ``ParamsTree`` to a nested dictionary."""
         return {
             **{key: dict(value) for key, value in self.node_data.items()},
-            **{name: child.asdict() for name, child in self.children.items()},
+            **{
+                name: (
+                    child if isinstance(child, ParamsTree)
+                    else type(self)(child, validate=False)
+                ).asdict()
+                for name, child in self._all_children().items()
+            },
         }
 
     def __str__(self):
@@ -228,8 +540,18 @@ class ParamsTree(UserDict):
     @classmethod
     def read(cls, path):
         """Load a YAML representation of a tree from disk."""
+        return cls(cls.read_mapping(path), validate=False)
+
+    @classmethod
+    def read_mapping(cls, path):
+        """Load and validate a YAML representation of a tree from disk.
+
+        Returns:
+            dict: The tree-like mapping, from which a tree can be built
+            without validation.
+        """
         with open(path, "rt") as f:
-            return cls(yaml.load(f, Loader=yaml.SafeLoader))
+            return cls().validate(yaml.load(f, Loader=YAML_LOADER))
 
     def write(self, path):
         """Write a YAML representation of a tree to disk."""
@@ -6,9 +6,16 @@
 
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from pprint import pformat
 
+import numpy as np
+
 from .base_object import ParamObject
+from .io.load import load_array
+from .utils import validation
+from .utils.instrumentation import phase
 from .utils.misc import pretty_time
 from .utils.validation import ParameterError
 
@@ -47,12 +54,27 @@ class Session(ParamObject):
                     method for a description of how ``synapse_changes`` is
                     formatted and interpreted. No changes happen if empty.
                     (default [])
+                - ``stimulus_frames`` (dict | None): Stacked arrays from which
+                    successive frames are streamed into some populations. A
+                    session model with ``stimulus_frames`` is expanded into
+                    one session per frame. Refer to :class:`StimulusFrames`
+                    for a description of how ``stimulus_frames`` is
+                    formatted and interpreted. (default None)
+                - ``checkpoint`` (bool): If true, the dynamic state of the
+                    network is saved at the end of the session (see
+                    :meth:`Network.save_checkpoint`). Checkpoints are saved in
+                    the ``checkpoints`` subdirectory of the output directory
+                    and can be restored with the ``restore_checkpoint``
+                    simulation parameter. (default False)
 
     Keyword Args:
         start_time (float): Time of kernel in ms when the session starts
             running.
         input_dir (str): Path to the directory in which input files are searched
             for for each session.
+        frames (tuple(StimulusFrames, int) | None): Frame stream and index of
+            the frame applied during this session. Set for sessions expanded
+            from a session model with ``stimulus_frames``.
     """
 
     # Validation of `params`
@@ -64,13 +86,17 @@ class Session(ParamObject):
         "shift_origin": False,
         "unit_changes": [],
         "synapse_changes": [],
+        "stimulus_frames": None,
+        "checkpoint": False,
     }
 
-    def __init__(self, name, params, start_time=None, input_dir=None):
+    def __init__(self, name, params, start_time=None, input_dir=None,
+                 frames=None):
         log.info('Creating session "%s"', name)
         # Sets self.name / self.params  and validates params
         super().__init__(name, params)
         self.input_dir = input_dir
+        self._frames = frames
         # Initialize the session start and end times
         if start_time is None:
             import nest
@@ -109,6 +135,8 @@ class Session(ParamObject):
             4. Change network's dynamic variables by calling the
                 `Network.set_state` function (`unit_changes` and
                 `synapse_changes` parameter)
+            5. Apply the session's stimulus frame (`stimulus_frames`
+                parameter) and start reading the next one.
 
         Args:
             self (Session): ``Session`` object
@@ -135,6 +163,12 @@ class Session(ParamObject):
             input_dir=self.input_dir,
         )
 
+        # Apply stimulus frame and prefetch the next one while simulating
+        if self._frames is not None:
+            stream, frame = self._frames
+            network.set_state(unit_changes=stream.unit_changes(frame))
+            stream.prefetch(frame + 1)
+
     @staticmethod
     def reset():
         """Call `nest.ResetNetwork()`"""
@@ -186,7 +220,7 @@ class Session(ParamObject):
             {"start": nest.GetKernelStatus("time") + self._simulation_time},
         )
 
-    def run(self, network):
+    def run(self, network, instrumentation=None):
         """Initialize and run session.
 
         Session initialization consists in the following steps:
@@ -204,16 +238,23 @@ class Session(ParamObject):
         Args:
             self (Session): ``Session`` object
             network (Network): ``Network`` object.
+
+        Keyword Args:
+            instrumentation (Instrumentation | None): Object recording the
+                duration and memory use of the initialization and simulation.
+                Ignored if ``None``.
         """
         import nest
 
         assert self.start == int(nest.GetKernelStatus("time"))
         log.info("Initializing session...")
-        self.initialize(network)
+        with phase(instrumentation, "session.initialize", session=self.name):
+            self.initialize(network)
         log.info("Finished initializing session\n")
         log.info("Running session '%s' for %s ms", self.name, self.simulation_time)
         start_real_time = time.time()
-        nest.Simulate(self.simulation_time)
+        with phase(instrumentation, "session.simulate", session=self.name):
+            nest.Simulate(self.simulation_time)
         log.info("Finished running session")
         log.info(
             "Session '%s' virtual running time: %s ms", self.name, self.simulation_time
@@ -233,3 +274,106 @@ class Session(ParamObject):
     @property
     def simulation_time(self):
         return self._simulation_time
+
+
+class StimulusFrames:
+    """Stream successive frames of stacked arrays into some populations.
+
+    Frames are read lazily from memory-mapped ``.npy`` files. Reading the
+    next frame can be started in the background with :meth:`prefetch` while
+    the current session is running.
+
+    Args:
+        name (str): Name of the session model the frames belong to.
+        params (dict): Content of the ``stimulus_frames`` session parameter,
+            of the form::
+
+                {
+                    'layers': <layer_name_list>,
+                    'population_name': <pop_name>,
+                    'change_type': <change_type>,
+                    'nest_params': {
+                        <param_name>: <array_path>,
+                    },
+                }
+
+            ``layers``, ``population_name`` and ``change_type`` are
+            interpreted as in the ``unit_changes`` session parameter (see
+            :meth:`Network.set_state`). Each ``<array_path>`` is the
+            relative path from ``input_dir`` to an array of shape
+            ``(n_frames, nrows, ncols, nunits)``, the first dimension of
+            which indexes the frames. All arrays should have the same number
+            of frames. Frame ``k`` is applied to the ``k``th session
+            expanded from the session model.
+
+    Keyword Args:
+        input_dir (str | None): Directory in which the arrays are searched
+            for.
+    """
+
+    MANDATORY_PARAMS = ["layers", "nest_params"]
+    OPTIONAL_PARAMS = {
+        "population_name": None,
+        "change_type": "constant",
+    }
+
+    def __init__(self, name, params, input_dir=None):
+        self.name = name
+        self.params = validation.validate(
+            f"{name}: stimulus_frames",
+            dict(params),
+            mandatory=self.MANDATORY_PARAMS,
+            optional=self.OPTIONAL_PARAMS,
+        )
+        if input_dir is None:
+            input_dir = Path("./")
+        self.arrays = {}
+        for param_name, relative_path in self.params["nest_params"].items():
+            path = Path(input_dir) / Path(relative_path)
+            if not path.exists():
+                raise FileNotFoundError(
+                    f"Could not load stimulus frames from file at {path}"
+                )
+            self.arrays[param_name] = load_array(path, mmap_mode="r")
+        n_frames = {array.shape[0] for array in self.arrays.values()}
+        if len(n_frames) != 1:
+            raise ParameterError(
+                f"Invalid `stimulus_frames` parameter for session model {name}:"
+                f" all arrays should have the same number of frames."
+            )
+        self.n_frames = n_frames.pop()
+        self._executor = None
+        self._prefetched = {}  # {<frame>: <future>}
+
+    def read(self, frame):
+        """Read a frame from disk. Return ``{<param_name>: <array>}``."""
+        return {
+            param_name: np.array(array[frame])
+            for param_name, array in self.arrays.items()
+        }
+
+    def prefetch(self, frame):
+        """Start reading a frame in the background."""
+        if not 0 <= frame < self.n_frames or frame in self._prefetched:
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        self._prefetched[frame] = self._executor.submit(self.read, frame)
+
+    def get(self, frame):
+        """Return a frame, reading it unless it was prefetched."""
+        if frame in self._prefetched:
+            return self._prefetched.pop(frame).result()
+        return self.read(frame)
+
+    def unit_changes(self, frame):
+        """Return ``unit_changes`` applying a frame (see `Network.set_state`)."""
+        return [
+            {
+                "layers": self.params["layers"],
+                "population_name": self.params["population_name"],
+                "change_type": self.params["change_type"],
+                "from_array": True,
+                "nest_params": self.get(frame),
+            }
+        ]
@@ -6,11 +6,13 @@
 
 import logging
 
+from .io.convert import ASCII_FORMAT, FORMATS, convert_all
 from .io.save import make_output_dir, output_path, output_subdir, save_as_yaml
 from .network import Network
 from .parameters import ParamsTree
-from .session import Session
+from .session import Session, StimulusFrames
 from .utils import misc, validation
+from .utils.instrumentation import Instrumentation
 
 log = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
@@ -39,6 +41,33 @@ class Simulation(object):
                       should be the name of session models defined in the
                       ``session_models`` parameter subtree. (Default:
                       ``[]``)
+                    ``restore_checkpoint`` (str | None)
+                      Path to a checkpoint file saved by a previous run of the
+                      same network (see the ``checkpoint`` session
+                      parameter). If defined, the dynamic state of the network
+                      is restored from the checkpoint after the network is
+                      created, so that warmup sessions can be skipped. The
+                      kernel time is not restored: session and recorder times
+                      of the restored run start at 0. (Default: ``None``)
+                    ``connectivity_cache_dir`` (str | None)
+                      Directory in which the connections of each projection
+                      are cached across runs. Refer to :meth:`Network.create`.
+                      (Default: ``None``)
+                    ``recorder_data_format`` (str)
+                      Format of the recorder data. If ``'ascii'``, NEST's
+                      per-virtual-process ASCII files are kept as is.
+                      Otherwise, at the end of :meth:`run`, the data of each
+                      recorder is converted to a single typed binary file in
+                      the given format (``'npz'``, ``'parquet'`` or
+                      ``'feather'``), and the recorder metadata is updated
+                      accordingly. Refer to :func:`io.convert.convert`.
+                      (Default: ``'ascii'``)
+                    ``recorder_value_dtype`` (str)
+                      dtype of the recorded variables in the converted data.
+                      (Default: ``'float64'``)
+                    ``delete_ascii_data`` (bool)
+                      Whether NEST's ASCII files are deleted after conversion.
+                      (Default: ``False``)
             ``kernel`` (:class:`ParamsTree`)
                 Used for NEST kernel initialization. Refer to
                 :meth:`Simulation.init_kernel` for a description of kernel
@@ -57,6 +86,13 @@ class Simulation(object):
             overrides the ``input_dir`` simulation parameter.
         output_dir (str | None): None or the path to the output directory. If
             defined, overrides the ``output_dir`` simulation parameter.
+
+    Attributes:
+        instrumentation (Instrumentation): Duration and memory use of the
+            simulation phases (kernel initialization, network building and
+            creation steps, session initialization and simulation, metadata
+            saving). Saved as a JSON report in the output directory at the
+            end of :meth:`run`.
     """
 
     # Validate children subtrees
@@ -70,6 +106,11 @@ class Simulation(object):
         "sessions": [],
         "input_dir": "input",
         "output_dir": "output",
+        "restore_checkpoint": None,
+        "connectivity_cache_dir": None,
+        "recorder_data_format": ASCII_FORMAT,
+        "recorder_value_dtype": "float64",
+        "delete_ascii_data": False,
     }
 
     def __init__(self, tree=None, input_dir=None, output_dir=None):
@@ -81,6 +122,9 @@ class Simulation(object):
         - Create sessions
         - Save simulation metadata
         """
+        # Timing and memory use of the simulation phases
+        self.instrumentation = Instrumentation()
+
         # Full parameter tree
         if tree is None:
             tree = ParamsTree()
@@ -145,24 +189,41 @@ class Simulation(object):
                 = str(input_dir)
         self.input_dir = self.sim_params["input_dir"]
 
+        if self.sim_params["recorder_data_format"] not in [ASCII_FORMAT] + FORMATS:
+            raise ValueError(
+                f"Unknown `recorder_data_format` simulation parameter: "
+                f"`{self.sim_params['recorder_data_format']}`. Should be in "
+                f"{[ASCII_FORMAT] + FORMATS}"
+            )
+
         # Initialize kernel (should be after getting output dirs)
-        self.init_kernel(self.tree.children['kernel'])
+        with self.instrumentation.phase("init_kernel"):
+            self.init_kernel(self.tree.children['kernel'])
 
         # Create session models
         self.session_models = None
-        self.build_session_models(self.tree.children['session_models'])
+        with self.instrumentation.phase("build_session_models"):
+            self.build_session_models(self.tree.children['session_models'])
 
         # Create sessions
         self.sessions = None
         self.session_times = None
-        self.build_sessions(self.sim_params['sessions'])
+        with self.instrumentation.phase("build_sessions"):
+            self.build_sessions(self.sim_params['sessions'])
 
         # Create network
         self.network = None
-        self.create_network(self.tree.children["network"])
+        with self.instrumentation.phase("create_network"):
+            self.create_network(self.tree.children["network"])
+
+        # Restore network state
+        if self.sim_params["restore_checkpoint"] is not None:
+            with self.instrumentation.phase("load_checkpoint"):
+                self.network.load_checkpoint(self.sim_params["restore_checkpoint"])
 
         # Save simulation metadata
-        self.save_metadata(clear_output_dir=True)
+        with self.instrumentation.phase("save_metadata"):
+            self.save_metadata(clear_output_dir=True)
 
     def _update_tree_child(self, child_name, tree):
         """Add a child to ``self.tree``"""
@@ -170,11 +231,7 @@ class Simulation(object):
         if not isinstance(tree, ParamsTree):
             child_tree = ParamsTree(tree, parent=self.tree, name=child_name)
         else:
-            child_tree = ParamsTree(
-                tree.asdict(),
-                parent=self.tree,
-                name=child_name
-            )
+            child_tree = tree.copy(parent=self.tree, name=child_name)
         # Add as child
         self.tree.children[child_name] = child_tree
 
@@ -187,9 +244,11 @@ class Simulation(object):
         self._update_tree_child('network', network_tree)
 
         log.info("Building network.")
-        self.network = Network(network_tree)
+        self.network = Network(network_tree, instrumentation=self.instrumentation)
         log.info("Creating network.")
-        self.network.create()
+        self.network.create(
+            connectivity_cache_dir=self.sim_params["connectivity_cache_dir"]
+        )
         log.info("Finished creating network")
 
     def save_metadata(self, clear_output_dir=False):
@@ -226,20 +285,125 @@ class Simulation(object):
         """Run simulation.
 
         Run sessions in the order specified by the ``'sessions'`` simulation
-        parameter.
+        parameter. After each session, the events of the recorders recording
+        to memory only are saved and cleared (see
+        :meth:`Network.harvest_recorders`).
         """
         # Get list of recorders
         log.info("Running %s sessions...", len(self.sessions))
         for session in self.sessions:
             log.info("Running session: '%s'...", session.name)
-            session.run(self.network)
+            session.run(self.network, instrumentation=self.instrumentation)
+            with self.instrumentation.phase(
+                "harvest_recorders", session=session.name
+            ):
+                self.network.harvest_recorders(self.output_dir)
             log.info("Done running session '%s'", session.name)
+            if session.params["checkpoint"]:
+                with self.instrumentation.phase(
+                    "save_checkpoint", session=session.name
+                ):
+                    self.network.save_checkpoint(
+                        output_path(self.output_dir, "checkpoint", session.name)
+                    )
         log.info("Finished running simulation")
+        if self.sim_params["recorder_data_format"] != ASCII_FORMAT:
+            with self.instrumentation.phase("convert_recorder_data"):
+                self.convert_recorder_data()
+        self.save_instrumentation()
+
+    def convert_recorder_data(self):
+        """Convert the recorders' ASCII data to a binary format.
+
+        Refer to the ``recorder_data_format``, ``recorder_value_dtype`` and
+        ``delete_ascii_data`` simulation parameters.
+        """
+        log.info(
+            "Converting recorder data to `%s` format...",
+            self.sim_params["recorder_data_format"],
+        )
+        convert_all(
+            self.output_dir,
+            data_format=self.sim_params["recorder_data_format"],
+            value_dtype=self.sim_params["recorder_value_dtype"],
+            delete_ascii=self.sim_params["delete_ascii_data"],
+        )
+        log.info("Finished converting recorder data")
+
+    def save_instrumentation(self):
+        """Save the timing and memory use of the simulation phases.
+
+        The report is written in JSON format in the output directory (see
+        :class:`Instrumentation`).
+        """
+        path = output_path(self.output_dir, "instrumentation")
+        log.info("Saving instrumentation report at %s", path)
+        self.instrumentation.write(path)
+
+    def rerun(self, output_dir, sessions=None, session_models=None):
+        """Run new sessions on the already created network.
+
+        The network is not rebuilt. Its state is reset as follows:
+
+            1. Restore the unit parameters changed by previous sessions
+                (:meth:`Network.restore_state`)
+            2. Reset the dynamic state of the network with
+                ``nest.ResetNetwork``. Note that this doesn't reset synaptic
+                weights changed by plasticity, nor the kernel time.
+            3. Set the output directory and the kernel's ``data_path``.
+            4. Build the new session models and sessions (starting at the
+                current kernel time) and save the simulation metadata in the
+                new output directory.
+            5. Run the sessions.
+
+        The ``instrumentation`` attribute is replaced by a new
+        :class:`Instrumentation` object so that the instrumentation report of
+        the rerun only contains the phases of the rerun.
+
+        Args:
+            output_dir (str): Path to the new output directory.
+
+        Keyword Args:
+            sessions (list(str) | None): Order in which sessions are run. If
+                ``None``, the value of the ``sessions`` simulation parameter
+                is used.
+            session_models (tree-like | ParamsTree | None): New
+                ``session_models`` parameter subtree. If ``None``, the current
+                session models are used.
+        """
+        import nest
+
+        log.info(f"Resetting network for rerun in {output_dir}...")
+        # Record the phases of the rerun separately from the previous runs
+        self.instrumentation = Instrumentation()
+        self.network.instrumentation = self.instrumentation
+        self.network.restore_state()
+        nest.ResetNetwork()
+
+        # Set output dir
+        self.sim_params["output_dir"] = output_dir
+        self.tree.children['simulation'].params['output_dir'] = str(output_dir)
+        self.output_dir = output_dir
+        data_path = output_subdir(self.output_dir, "raw_data", create_dir=True)
+        nest.SetKernelStatus({"data_path": str(data_path)})
+
+        # Build sessions
+        if session_models is not None:
+            self.build_session_models(session_models)
+        if sessions is not None:
+            self.sim_params["sessions"] = sessions
+        self.build_sessions(self.sim_params["sessions"])
+
+        with self.instrumentation.phase("save_metadata"):
+            self.save_metadata(clear_output_dir=True)
+        self.run()
 
     def build_sessions(self, sessions_order):
         """Build a list of sessions.
 
-        Session params are inherited from session models.
+        Session params are inherited from session models. Session models with
+        a ``stimulus_frames`` parameter are expanded into one session per
+        stimulus frame.
         """
         import nest
 
@@ -247,17 +411,40 @@ class Simulation(object):
         self.tree.children['simulation'].params['sessions'] \
             = sessions_order
 
-        log.info(f"Build N={len(sessions_order)} sessions")
+        # Expand session models into (<session_name>, <model>, <frames>)
+        expanded = []
+        streams = {}
+        for session_model in sessions_order:
+            params = self.session_models[session_model].params
+            if params.get('stimulus_frames') is None:
+                expanded.append((session_model, session_model, None))
+                continue
+            if session_model not in streams:
+                streams[session_model] = StimulusFrames(
+                    session_model,
+                    params['stimulus_frames'],
+                    input_dir=self.input_dir,
+                )
+            stream = streams[session_model]
+            width = len(str(stream.n_frames - 1))
+            expanded += [
+                (f"{session_model}_{str(k).zfill(width)}", session_model,
+                 (stream, k))
+                for k in range(stream.n_frames)
+            ]
+
+        log.info(f"Build N={len(expanded)} sessions")
         # Create session objects
         self.sessions = []
         session_start_time = nest.GetKernelStatus('time')
-        for i, session_model in enumerate(sessions_order):
+        for i, (name, session_model, frames) in enumerate(expanded):
             self.sessions.append(
                 Session(
-                    self._make_session_name(session_model, i),
+                    self._make_session_name(name, i),
                     dict(self.session_models[session_model].params),
                     start_time=session_start_time,
                     input_dir=self.input_dir,
+                    frames=frames,
                 )
             )
             # start of next session = end of current session
@@ -278,7 +465,9 @@ class Simulation(object):
         session_model_nodes = {
             session_name: session_node
             for session_name, session_node
-            in self.tree.children['session_models'].named_leaves(root=False)
+            in self.tree.children['session_models'].compiled().named_leaves(
+                root=False
+            )
         }
         # Validate session_model nodes: no nest_params
         for name, node in session_model_nodes.items():
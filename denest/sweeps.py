@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# sweeps.py
+
+"""Run parameter sweeps defined over paths of a parameter tree."""
+
+import collections
+import itertools
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+from .utils.autodict import AutoDict, dictify
+
+log = logging.getLogger(__name__)
+
+METHODS = ["grid", "random", "latin_hypercube"]
+
+# Difference between the ``nest_seed`` of successive runs. NEST seeds are
+# drawn from ``[nest_seed, nest_seed + 2 * n_vp]``, so runs don't share seeds
+# for up to ``SEED_STRIDE // 2`` virtual processes.
+SEED_STRIDE = 1000
+
+
+def _tree_path(path):
+    """Return a tree path as a tuple of keys.
+
+    Paths are either tuples or strings of keys separated by ``'/'``.
+    """
+    if isinstance(path, str):
+        return tuple(path.split("/"))
+    return tuple(path)
+
+
+def _override_tree(assignment):
+    """Return a tree-like dictionary from ``{<tree_path>: <value>}``."""
+    tree = AutoDict()
+    for path, value in assignment.items():
+        tree[_tree_path(path)] = value
+    return dictify(tree)
+
+
+def _sample(spec, u):
+    """Return a value from a quantile ``u`` in [0, 1) of a parameter range."""
+    if isinstance(spec, dict):
+        return float(spec["min"] + u * (spec["max"] - spec["min"]))
+    return spec[int(u * len(spec))]
+
+
+def overrides(space, method="grid", n=None, seed=None):
+    """Generate override trees covering a parameter space.
+
+    Args:
+        space (dict): Dictionary mapping tree paths to the range of values
+            they take. Tree paths are tuples of keys (eg ``('kernel',
+            'params', 'nest_seed')``) or strings of keys separated by ``'/'``
+            (eg ``'kernel/params/nest_seed'``). Ranges are either lists of
+            values or, for the ``'random'`` and ``'latin_hypercube'``
+            methods, dictionaries of the form ``{'min': <float>, 'max':
+            <float>}`` specifying a uniform interval.
+
+    Keyword Args:
+        method (str): How the space is covered. ``'grid'``: all combinations
+            of values. ``'random'``: ``n`` independent draws.
+            ``'latin_hypercube'``: ``n`` draws stratified along each
+            dimension. (default ``'grid'``)
+        n (int | None): Number of override trees for the ``'random'`` and
+            ``'latin_hypercube'`` methods. Ignored for ``'grid'``.
+        seed (int | None): Seed of the random number generator used by the
+            ``'random'`` and ``'latin_hypercube'`` methods.
+
+    Yields:
+        dict: Tree-like dictionaries that can be passed as overrides to
+        :func:`denest.load_trees` or :func:`denest.run`.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown sweep method `{method}`. Should be in {METHODS}")
+    paths = list(space)
+    if method == "grid":
+        for values in itertools.product(*(space[path] for path in paths)):
+            yield _override_tree(dict(zip(paths, values)))
+        return
+    if n is None:
+        raise ValueError(f"The number of draws `n` is required for method `{method}`")
+    rng = np.random.RandomState(seed)
+    if method == "random":
+        quantiles = rng.uniform(size=(n, len(paths)))
+    else:
+        # One draw in each of the ``n`` strata along every dimension
+        quantiles = (
+            np.stack([rng.permutation(n) for _ in paths], axis=1)
+            + rng.uniform(size=(n, len(paths)))
+        ) / n
+    for draw in quantiles:
+        yield _override_tree(
+            {path: _sample(space[path], u) for path, u in zip(paths, draw)}
+        )
+
+
+def _run(path, override_trees, output_dir, input_dir):
+    """Run a single simulation in a worker process."""
+    # Import here so that each worker process imports NEST only once, and
+    # only in the worker.
+    from . import run
+
+    run(path, *override_trees, output_dir=output_dir, input_dir=input_dir)
+    return output_dir
+
+
+def _runs(space, method, n, seed, output_dir, base_seed, sweep_file):
+    """Yield ``(<run_dir>, <override_trees>)`` for each run of a sweep.
+
+    The overrides of each run are appended to ``sweep_file`` as it is drawn.
+    """
+    for index, override_tree in enumerate(
+        overrides(space, method=method, n=n, seed=seed)
+    ):
+        run_dir = output_dir / f"run_{str(index).zfill(5)}"
+        yaml.dump({run_dir.name: override_tree}, sweep_file, default_flow_style=False)
+        sweep_file.flush()
+        # Overrides from the swept space take precedence
+        yield (
+            str(run_dir),
+            [
+                override_tree,
+                {"kernel": {"params": {"nest_seed": base_seed + index * SEED_STRIDE}}},
+            ],
+        )
+
+
+def sweep(path, space, method="grid", n=None, seed=None, output_dir="sweep",
+          input_dir=None, n_workers=1, base_seed=1):
+    """Run a simulation for each point of a parameter space.
+
+    Each run gets its own output directory (``<output_dir>/run_<index>``) and
+    its own deterministic kernel seed (``base_seed + index * SEED_STRIDE``),
+    unless ``nest_seed`` is part of the swept space. Runs are executed by a
+    pool of ``n_workers`` processes, each of which imports NEST once and
+    reuses its kernel across runs.
+
+    Runs are drawn lazily from :func:`overrides`: a new run is only drawn
+    when a worker is about to become free, so that at most ``2 *
+    n_workers`` runs are pending at any time. The overrides of each run are
+    appended to ``<output_dir>/sweep.yml`` as it is drawn.
+
+    Args:
+        path (str): Path to the ``tree_paths.yml`` file specifying the base
+            simulation (see :func:`denest.load_trees`).
+        space (dict): Parameter space (see :func:`overrides`).
+
+    Keyword Args:
+        method, n, seed: Passed to :func:`overrides`.
+        output_dir (str): Directory containing the runs' output directories.
+        input_dir (str | None): Passed to :func:`denest.run`.
+        n_workers (int): Number of worker processes. (default 1)
+        base_seed (int): ``nest_seed`` of the first run. (default 1)
+
+    Returns:
+        list(Path): The output directory of each run.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    log.info(f"Running sweep in {output_dir}")
+    run_dirs = []
+    with open(output_dir / "sweep.yml", "w") as sweep_file:
+        runs = _runs(space, method, n, seed, output_dir, base_seed, sweep_file)
+        if n_workers <= 1:
+            for run_dir, trees in runs:
+                run_dirs.append(Path(_run(path, trees, run_dir, input_dir)))
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                pending = collections.deque()
+                for run_dir, trees in runs:
+                    pending.append(
+                        executor.submit(_run, path, trees, run_dir, input_dir)
+                    )
+                    if len(pending) >= 2 * n_workers:
+                        run_dirs.append(Path(pending.popleft().result()))
+                run_dirs.extend(Path(future.result()) for future in pending)
+    log.info(f"Finished sweep of N={len(run_dirs)} simulations in {output_dir}")
+    return run_dirs
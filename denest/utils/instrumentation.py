@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# utils/instrumentation.py
+
+"""Timing and memory instrumentation of simulation phases."""
+
+import contextlib
+import json
+import sys
+import time
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+# Names of the phases being recorded, innermost last
+_ACTIVE_PHASES = []
+
+
+def current_phase():
+    """Return the name of the innermost phase being recorded, or ``None``."""
+    return _ACTIVE_PHASES[-1] if _ACTIVE_PHASES else None
+
+
+def max_rss():
+    """Return the peak resident set size of the process in bytes.
+
+    Returns ``None`` if it can't be measured on this platform.
+    """
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ``ru_maxrss`` is in bytes on macOS and in kilobytes on Linux
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+class Instrumentation:
+    """Record the duration and peak memory usage of simulation phases.
+
+    Phases are timed with the :meth:`phase` context manager and can be
+    nested. Each phase is recorded as a dictionary with the following keys:
+
+        - ``'phase'``: Name of the phase.
+        - ``'depth'``: Number of enclosing phases.
+        - ``'start'``: Start time in seconds, relative to the creation of the
+          ``Instrumentation`` object.
+        - ``'duration'``: Wall time of the phase in seconds.
+        - ``'max_rss'``: Peak resident set size of the process in bytes at the
+          end of the phase.
+        - ``'max_rss_increase'``: Increase of the peak resident set size during
+          the phase, in bytes.
+        - any additional information passed to :meth:`phase`.
+
+    Attributes:
+        records (list(dict)): Recorded phases, in the order in which they
+            started.
+    """
+
+    def __init__(self):
+        self.records = []
+        self._start = time.perf_counter()
+        self._depth = 0
+
+    @contextlib.contextmanager
+    def phase(self, name, **info):
+        """Context manager recording the duration and memory use of a phase.
+
+        Args:
+            name (str): Name of the phase.
+            **info: Additional information saved with the record (eg the name
+                of a session). Should be JSON-serializable.
+        """
+        record = {"phase": name, "depth": self._depth, **info}
+        self.records.append(record)
+        rss_before = max_rss()
+        start = time.perf_counter()
+        self._depth += 1
+        _ACTIVE_PHASES.append(name)
+        try:
+            yield record
+        finally:
+            _ACTIVE_PHASES.pop()
+            self._depth -= 1
+            end = time.perf_counter()
+            rss_after = max_rss()
+            record["start"] = start - self._start
+            record["duration"] = end - start
+            record["max_rss"] = rss_after
+            record["max_rss_increase"] = (
+                None if rss_after is None else rss_after - rss_before
+            )
+
+    def summary(self):
+        """Return ``{<phase>: {'count': <int>, 'duration': <float>}}``.
+
+        Durations are the total duration of each phase in seconds.
+        """
+        summary = {}
+        for record in self.records:
+            phase = summary.setdefault(record["phase"], {"count": 0, "duration": 0.0})
+            phase["count"] += 1
+            phase["duration"] += record.get("duration", 0.0)
+        return summary
+
+    def to_dict(self):
+        """Return the records and summary as a dictionary."""
+        return {
+            "max_rss": max_rss(),
+            "summary": self.summary(),
+            "records": self.records,
+        }
+
+    def write(self, path):
+        """Write the records and summary as a JSON report."""
+        path = Path(path)
+        with path.open("w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+
+def phase(instrumentation, name, **info):
+    """Time a phase with ``instrumentation``, unless it is ``None``."""
+    if instrumentation is None:
+        return contextlib.nullcontext()
+    return instrumentation.phase(name, **info)
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# utils/tracing.py
+
+"""Count and time the NEST API calls made by deNEST.
+
+Example:
+    >>> import denest
+    >>> from denest.utils.tracing import trace_nest
+    >>> with trace_nest() as tracer:
+    ...     denest.run('<path_to_tree_paths.yml>')
+    >>> tracer.report()[:5]  # The 5 most expensive call sites
+"""
+
+import contextlib
+import functools
+import json
+import sys
+import time
+from pathlib import Path
+
+from .instrumentation import current_phase
+
+# NEST functions that are traced
+NEST_FUNCTIONS = [
+    "Connect",
+    "CopyModel",
+    "Create",
+    "GetConnections",
+    "GetDefaults",
+    "GetKernelStatus",
+    "GetLeaves",
+    "GetNodes",
+    "GetStatus",
+    "Install",
+    "ResetKernel",
+    "ResetNetwork",
+    "SetDefaults",
+    "SetKernelStatus",
+    "SetStatus",
+    "Simulate",
+]
+TOPOLOGY_FUNCTIONS = [
+    "ConnectLayers",
+    "CreateLayer",
+    "GetElement",
+    "GetPosition",
+    "GetTargetNodes",
+]
+# Functions for which the number of GIDs or connections touched is the length
+# of the returned value rather than that of the first argument
+COUNT_RESULT = ["Create", "GetConnections"]
+# Functions for which the number of connections touched is the number of
+# connections they created, ie the change of the ``num_connections`` kernel
+# status
+COUNT_CONNECTIONS = ["Connect", "ConnectLayers"]
+
+_PACKAGE_DIR = str(Path(__file__).parents[1])
+_THIS_FILE = str(Path(__file__))
+
+
+def _call_site():
+    """Return ``'<module_path>:<function>:<line>'`` of the calling deNEST code."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_PACKAGE_DIR) and filename != _THIS_FILE:
+            relative_path = Path(filename).relative_to(_PACKAGE_DIR)
+            return f"{relative_path}:{frame.f_code.co_name}:{frame.f_lineno}"
+        frame = frame.f_back
+    return None
+
+
+def _n_items(name, args, result):
+    """Return the number of GIDs or connections touched by a call."""
+    value = result if name in COUNT_RESULT else (args[0] if args else None)
+    if isinstance(value, (str, bytes, dict)) or not hasattr(value, "__len__"):
+        return 0 if value is None else 1
+    return len(value)
+
+
+class NestTracer:
+    """Count and time the calls to NEST functions.
+
+    Calls are grouped by function, call site (the innermost deNEST frame
+    calling NEST) and phase (the innermost phase recorded by an
+    :class:`Instrumentation` object, see :mod:`denest.utils.instrumentation`).
+    Only calls made while the tracer is installed are traced, and calls made
+    from within a traced call are not.
+
+    Attributes:
+        calls (dict): ``{(<function>, <call_site>, <phase>): <stats>}``
+            dictionary, where ``<stats>`` is a dictionary with the keys
+            ``'count'`` (number of calls), ``'time'`` (total duration in
+            seconds) and ``'items'`` (total number of GIDs or connections
+            touched, or number of connections created for the functions in
+            ``COUNT_CONNECTIONS``).
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self._originals = {}  # {(<module>, <function_name>): <function>}
+        # Number of traced calls running. Calls made by a traced function
+        # (eg by the fake backend to its own functions) aren't traced.
+        self._depth = 0
+
+    def install(self):
+        """Wrap the NEST functions."""
+        import nest
+        from nest import topology
+
+        for module, names in [(nest, NEST_FUNCTIONS), (topology, TOPOLOGY_FUNCTIONS)]:
+            for name in names:
+                if (module, name) in self._originals or not hasattr(module, name):
+                    continue
+                original = getattr(module, name)
+                self._originals[(module, name)] = original
+                setattr(module, name, self._wrap(name, original))
+
+    def uninstall(self):
+        """Restore the original NEST functions."""
+        for (module, name), original in self._originals.items():
+            setattr(module, name, original)
+        self._originals = {}
+
+    def _num_connections(self):
+        """Return the number of connections in the network, untraced."""
+        import nest
+
+        get_kernel_status = self._originals.get(
+            (nest, "GetKernelStatus"), nest.GetKernelStatus
+        )
+        return get_kernel_status("num_connections")
+
+    def _wrap(self, name, function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if self._depth:
+                return function(*args, **kwargs)
+            if name in COUNT_CONNECTIONS:
+                num_connections = self._num_connections()
+            start = time.perf_counter()
+            self._depth += 1
+            try:
+                result = function(*args, **kwargs)
+            finally:
+                self._depth -= 1
+            duration = time.perf_counter() - start
+            if name in COUNT_CONNECTIONS:
+                n_items = self._num_connections() - num_connections
+            else:
+                n_items = _n_items(name, args, result)
+            stats = self.calls.setdefault(
+                (name, _call_site(), current_phase()),
+                {"count": 0, "time": 0.0, "items": 0},
+            )
+            stats["count"] += 1
+            stats["time"] += duration
+            stats["items"] += n_items
+            return result
+
+        return wrapper
+
+    def report(self, by=("function", "call_site", "phase")):
+        """Return the traced calls, most time-consuming first.
+
+        Keyword Args:
+            by (tuple(str)): Fields by which calls are grouped. Subset of
+                ``('function', 'call_site', 'phase')``.
+
+        Returns:
+            list(dict): One dictionary per group, with the grouping fields and
+            the ``'count'``, ``'time'`` and ``'items'`` keys.
+        """
+        fields = ("function", "call_site", "phase")
+        groups = {}
+        for key, stats in self.calls.items():
+            group_key = tuple(
+                value for field, value in zip(fields, key) if field in by
+            )
+            group = groups.setdefault(
+                group_key,
+                {
+                    **{
+                        field: value
+                        for field, value in zip(fields, key) if field in by
+                    },
+                    "count": 0,
+                    "time": 0.0,
+                    "items": 0,
+                },
+            )
+            for stat in ["count", "time", "items"]:
+                group[stat] += stats[stat]
+        return sorted(groups.values(), key=lambda group: -group["time"])
+
+    def write(self, path):
+        """Write the report as JSON."""
+        path = Path(path)
+        with path.open("w") as f:
+            json.dump(self.report(), f, indent=2)
+        return path
+
+
+@contextlib.contextmanager
+def trace_nest():
+    """Context manager tracing the NEST calls made within its scope.
+
+    Yields:
+        NestTracer: The tracer, which can be inspected after exiting.
+    """
+    tracer = NestTracer()
+    tracer.install()
+    try:
+        yield tracer
+    finally:
+        tracer.uninstall()
@@ -3,7 +3,16 @@
 # conftest.py
 
 import pytest
-from test_layers import BASE_LAYERS, INPUT_LAYERS, init_layer
+
+import denest
+
+# Run the tests with the fake backend if NEST isn't installed
+try:
+    import nest  # noqa: F401
+except ImportError:
+    denest.backend.use("fake")
+
+from test_layers import BASE_LAYERS, INPUT_LAYERS, init_layer  # noqa: E402
 
 
 @pytest.fixture(params=INPUT_LAYERS)
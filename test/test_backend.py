@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# test_backend.py
+
+"""Test the fake NEST backend."""
+
+import numpy as np
+import pytest
+
+from denest import backend
+from denest.backend import fake
+from denest.backend.fake import topology as tp
+
+
+@pytest.fixture
+def kernel():
+    fake.ResetKernel()
+    yield fake
+
+
+def test_use():
+    previous = backend.current()
+    try:
+        assert backend.use("fake") is fake
+        assert backend.current() == "fake"
+        import nest
+        from nest import topology
+
+        assert nest is fake
+        assert topology is tp
+    finally:
+        if previous != "fake":
+            backend.use(previous)
+    with pytest.raises(ValueError):
+        backend.use("unknown")
+
+
+def test_status(kernel):
+    gids = kernel.Create("iaf_psc_alpha", 3)
+    assert gids == (1, 2, 3)
+    assert kernel.GetStatus(gids, "V_m") == (-70.0,) * 3
+    assert kernel.GetStatus(gids, ["V_m", "V_th"]) == ((-70.0, -55.0),) * 3
+    kernel.SetStatus(gids, [{"V_m": float(v)} for v in range(3)])
+    assert kernel.GetStatus(gids, "V_m") == (0.0, 1.0, 2.0)
+    kernel.CopyModel("iaf_psc_alpha", "my_model", {"V_th": -50.0})
+    (gid,) = kernel.Create("my_model")
+    assert kernel.GetStatus((gid,), "model") == ("my_model",)
+    assert kernel.GetStatus((gid,), "V_th") == (-50.0,)
+    with pytest.raises(kernel.NESTError):
+        kernel.Create("unknown_model")
+
+
+def test_connections(kernel):
+    sources = kernel.Create("parrot_neuron", 3)
+    targets = kernel.Create("iaf_psc_alpha", 3)
+    kernel.Connect(
+        sources, targets, "one_to_one",
+        {"model": "static_synapse", "weight": np.array([1.0, 2.0, 3.0])},
+    )
+    connections = kernel.GetConnections(source=sources[:2])
+    assert len(connections) == 2
+    assert kernel.GetStatus(connections, ["target", "weight"]) == (
+        (targets[0], 1.0), (targets[1], 2.0),
+    )
+    kernel.SetStatus(connections, "weight", [5.0, 6.0])
+    assert kernel.GetStatus(connections, "weight") == (5.0, 6.0)
+
+
+def test_topology(kernel):
+    layer = tp.CreateLayer(
+        {"rows": 2, "columns": 3, "elements": ["iaf_psc_alpha", 2]}
+    )
+    leaves = kernel.GetLeaves(layer)[0]
+    assert len(leaves) == 12
+    # Elements at a (column, row) location
+    elements = tp.GetElement(layer, (2, 1))
+    assert len(elements) == 2
+    assert np.allclose(tp.GetPosition(elements), [(1 / 3, -0.25)] * 2)
+    tp.ConnectLayers(
+        layer, layer, {"connection_type": "divergent", "kernel": 1.0}
+    )
+    assert len(kernel.GetConnections()) == 12 * 12
+
+
+def test_recording_files(kernel, tmp_path):
+    kernel.SetKernelStatus({"data_path": str(tmp_path), "local_num_threads": 1})
+    neurons = kernel.Create("iaf_psc_alpha", 2)
+    multimeter = kernel.Create(
+        "multimeter", params={"record_to": ["file"], "record_from": ["V_m"]}
+    )
+    kernel.Connect(multimeter, neurons)
+    kernel.Simulate(5.0)
+    (path,) = tmp_path.glob("*.dat")
+    lines = path.read_text().splitlines()
+    assert lines
+    # NEST 2.x writes a tab after every field, including the last one
+    assert all(line.endswith("\t") for line in lines)
+    assert all(len(line.split("\t")) == 4 for line in lines)
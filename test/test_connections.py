@@ -5,10 +5,17 @@
 """Test ``ProjectionModel`` and ``Projection`` classes."""
 
 
+from copy import deepcopy
+
 import nest
 import nest.topology as tp
+import pytest
+from test_layers import BASE_LAYERS
 
+import denest
+from denest import Network
 from denest.network.projections import ProjectionModel, TopoProjection
+from denest.utils.tracing import trace_nest
 
 
 def test_full_base_layer_auto_projection(base_layer):
@@ -54,3 +61,87 @@ def test_full_population_auto_projection(base_layer):
             assert set(tp.GetTargetNodes((gid,), base_layer.gid)[0]) == set(pop_gids)
         else:
             assert not tp.GetTargetNodes((gid,), base_layer.gid)[0]
+
+
+@pytest.mark.parametrize("layer_args", BASE_LAYERS)
+def test_connectivity_cache(layer_args, tmp_path):
+    model = ProjectionModel(
+        "connmodel",
+        {},
+        {
+            "synapse_model": "static_synapse",
+            "kernel": 0.5,
+            "weights": {"uniform": {"min": 1.0, "max": 2.0}},
+            "connection_type": "divergent",
+        },
+    )
+
+    def connections():
+        nest.ResetKernel()
+        constructor, params, nest_params = layer_args
+        layer = constructor("", deepcopy(params), deepcopy(nest_params))
+        layer.create()
+        projection = TopoProjection(model, layer, None, layer, None)
+        key = projection.connectivity_key()
+        projection.create(cache_dir=tmp_path, cache_key=key)
+        return sorted(
+            nest.GetStatus(
+                nest.GetConnections(), ["source", "target", "weight", "delay"]
+            )
+        )
+
+    drawn = connections()
+    # No temporary file is left behind
+    assert [path.suffix for path in tmp_path.iterdir()] == [".npz"]
+    # Cached connections are identical to the drawn ones
+    assert connections() == drawn
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_network_connectivity_cache(tmp_path):
+    tree = denest.load_trees("./params/tree_paths.yml").children["network"]
+
+    def connections(cache_dir=None):
+        nest.ResetKernel()
+        Network(tree).create(connectivity_cache_dir=cache_dir)
+        return sorted(
+            nest.GetStatus(
+                nest.GetConnections(), ["source", "target", "weight", "delay"]
+            )
+        )
+
+    drawn = connections()
+    assert connections(cache_dir=tmp_path) == drawn
+    paths = sorted(tmp_path.iterdir())
+    assert len(paths) == len(Network(tree).projections)
+    # All the projections are drawn again if one of them isn't cached
+    paths[len(paths) // 2].unlink()
+    assert connections(cache_dir=tmp_path) == drawn
+    assert len(list(tmp_path.iterdir())) == len(paths)
+    # All the projections are loaded from the cache
+    assert connections(cache_dir=tmp_path) == drawn
+
+
+def test_network_connectivity_cache_queries(tmp_path):
+    tree = denest.load_trees("./params/tree_paths.yml").children["network"]
+    network = Network(tree)
+    # The projections of the test network don't share connections, so the
+    # connections of each projection are queried only once, after drawing
+    assert all(
+        projection.may_share_connections(projection)
+        for projection in network.projections
+    )
+    assert not any(
+        projection.may_share_connections(other)
+        for projection in network.projections
+        for other in network.projections
+        if other is not projection
+    )
+    nest.ResetKernel()
+    with trace_nest() as tracer:
+        network.create(connectivity_cache_dir=tmp_path)
+    get_connections = sum(
+        call["count"] for call in tracer.report(by=("function",))
+        if call["function"] == "GetConnections"
+    )
+    assert get_connections == len(network.projections)
@@ -49,6 +49,10 @@ def test_recorder_metadata(metadata_paths, data_regression):
     data_regression.check(all_metadata)
 
 
+@pytest.mark.skipif(
+    denest.backend.current() == "fake",
+    reason="The regression data was recorded with NEST",
+)
 def test_data(metadata_paths, data_regression):
     all_data = {}
     # Test equality of sorted data, rounded to 4 decimals
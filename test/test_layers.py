@@ -6,6 +6,8 @@
 """Test ``Layer`` class."""
 
 import nest
+import nest.topology as tp
+import numpy as np
 import pytest
 from pytest import approx
 
@@ -65,6 +67,58 @@ def test_layer(layer):
         )
 
 
+def test_gids(layer):
+    nest.ResetKernel()
+    layer.create()
+    for population in layer.populations:
+        pop_gids = layer.gids(population=population)
+        for gid in pop_gids:
+            location = layer.locations[gid]
+            population_location = layer.population_locations[gid]
+            assert population_location[:2] == location
+            # Lookup by location within the population
+            assert layer.gids(
+                population=population, population_location=population_location
+            ) == [gid]
+            assert gid in layer.gids(population=population, location=location)
+            assert gid in layer.gids(location=location)
+            assert gid in layer.gids(population_location=population_location)
+        # Out-of-bounds locations
+        assert not layer.gids(population=population, location=(-1, 0))
+        assert not layer.gids(
+            population=population,
+            population_location=layer.population_shape[population],
+        )
+    assert not layer.gids(population="not_a_population")
+
+
+def test_locations_off_center():
+    """Locations derived from positions match NEST's grid locations."""
+    nest.ResetKernel()
+    layer = Layer(
+        "",
+        {"populations": {"iaf_psc_alpha": 2, "iaf_cond_alpha": 1}},
+        {"rows": 3, "columns": 5, "extent": [2.5, 0.9], "center": [10.3, -4.7]},
+    )
+    layer.create()
+    assert layer.shape == (3, 5)
+    for row in range(3):
+        for col in range(5):
+            element = np.ravel(tp.GetElement(layer.gid, (col, row))).tolist()
+            assert sorted(layer.gids(location=(row, col))) == sorted(element)
+            for population in layer.populations:
+                # Units of a population at a location are indexed by GID
+                gids = sorted(
+                    gid for gid in element
+                    if nest.GetStatus((gid,), "model")[0] == population
+                )
+                located = layer.gids(population=population, location=(row, col))
+                assert located == gids
+                for unit, gid in enumerate(gids):
+                    assert layer.locations[gid] == (row, col)
+                    assert layer.population_locations[gid] == (row, col, unit)
+
+
 @pytest.fixture(params=BAD_LAYERS)
 def bad_layer(request):
     yield request.param
@@ -198,3 +252,55 @@ def test_set_state(base_layer, unit_changes):
                 )
             else:
                 assert 0
+
+
+def test_set_state_bad_shape(base_layer):
+    import numpy as np
+
+    nest.ResetKernel()
+    base_layer.create()
+    population = base_layer.population_names[0]
+    shape = base_layer.population_shape[population]
+    with pytest.raises(ValueError):
+        base_layer.set_state(
+            nest_params={"V_m": np.zeros(shape[::-1] + (2,))},
+            population_name=population,
+            from_array=True,
+        )
+
+
+@pytest.mark.parametrize("change_type", ["multiplicative", "additive"])
+def test_set_unit_state_array_operand(base_layer, change_type):
+    import numpy as np
+
+    nest.ResetKernel()
+    base_layer.create()
+    gids = base_layer.gids()
+    current = np.array(nest.GetStatus(gids, "V_m"))
+    operand = np.arange(len(gids), dtype=float)
+    base_layer.set_unit_state(gids, {"V_m": operand}, change_type=change_type)
+    if change_type == "multiplicative":
+        expected = current * operand
+    else:
+        expected = current + operand
+    assert nest.GetStatus(gids, "V_m") == approx(tuple(expected))
+    # Operands should be broadcastable to the number of units
+    with pytest.raises(ValueError):
+        base_layer.set_unit_state(
+            gids, {"V_m": np.zeros(len(gids) + 1)}, change_type=change_type
+        )
+
+
+def test_input_layer_parrots(input_layer):
+    nest.ResetKernel()
+    input_layer.create()
+    parrot = input_layer.PARROT_MODEL
+    for stim_gid in input_layer.gids(population=input_layer.stimulator_model):
+        targets = [
+            conn[1] for conn in nest.GetConnections(source=(stim_gid,))
+        ]
+        # Each stimulator drives the parrot neuron at the same location
+        assert targets == input_layer.gids(
+            population=parrot,
+            population_location=input_layer.population_locations[stim_gid],
+        )
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# test_load.py
+
+"""Test data loading utilities."""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from denest.io.convert import ARROW_FORMATS, convert
+from denest.io.load import iter_chunks, load, load_array, load_as_df, load_yaml
+from denest.io.save import atomic_write, save_as_yaml
+
+
+@pytest.fixture
+def array_path(tmp_path):
+    path = tmp_path / "array.npy"
+    np.save(path, np.arange(6.0).reshape(2, 3))
+    return path
+
+
+def test_atomic_write(tmp_path):
+    path = tmp_path / "file.bin"
+    with atomic_write(path) as f:
+        f.write(b"data")
+        assert not path.exists()
+    assert path.read_bytes() == b"data"
+    # The file is left unchanged if writing fails
+    with pytest.raises(RuntimeError):
+        with atomic_write(path) as f:
+            f.write(b"partial")
+            raise RuntimeError
+    assert path.read_bytes() == b"data"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_load_array_cache(array_path):
+    load_array.cache_clear()
+    array = load_array(array_path)
+    assert np.array_equal(array, np.arange(6.0).reshape(2, 3))
+    # Second load is a cache hit
+    assert load_array(array_path) is array
+    assert load_array.cache_info().hits == 1
+    # Cached arrays are read-only
+    with pytest.raises(ValueError):
+        array[0, 0] = 1.0
+    # Modified files are reloaded
+    np.save(array_path, np.zeros((2, 3)))
+    stat = os.stat(array_path)
+    os.utime(array_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert np.array_equal(load_array(array_path), np.zeros((2, 3)))
+
+
+def test_load_array_mmap(array_path):
+    array = load_array(array_path, mmap_mode="r")
+    assert isinstance(array, np.memmap)
+    assert np.array_equal(array, np.arange(6.0).reshape(2, 3))
+
+
+@pytest.fixture
+def recorder_metadata(tmp_path):
+    """Metadata and per-VP ASCII files of a multimeter, one of them empty."""
+    # NEST writes a tab after every field, including the last one
+    (tmp_path / "multimeter-1-0.dat").write_text(
+        "2\t1.0\t-70.5\t\n3\t1.0\t-69.0\t\n"
+    )
+    (tmp_path / "multimeter-1-1.dat").write_text("4\t2.0\t-65.25\t\n")
+    (tmp_path / "multimeter-1-2.dat").write_text("")
+    metadata = {
+        "type": "multimeter",
+        "label": "multimeter",
+        "colnames": ["gid", "time", "V_m"],
+        "filenames": [f"multimeter-1-{vp}.dat" for vp in range(3)],
+    }
+    save_as_yaml(tmp_path / "multimeter", metadata)
+    return tmp_path / "multimeter.yml"
+
+
+@pytest.mark.parametrize("chunksize", [1, 1000])
+@pytest.mark.parametrize("data_format", ["npz", "parquet", "feather"])
+def test_convert(recorder_metadata, data_format, chunksize):
+    if data_format in ARROW_FORMATS:
+        pytest.importorskip("pyarrow")
+    path = convert(
+        recorder_metadata, data_format=data_format, value_dtype="float32",
+        delete_ascii=True, chunksize=chunksize,
+    )
+    assert path == recorder_metadata.parent / f"multimeter.{data_format}"
+    assert not list(recorder_metadata.parent.glob("*.dat"))
+    metadata = load_yaml(recorder_metadata)
+    assert metadata["format"] == data_format
+    assert metadata["filenames"] == [path.name]
+    df = load(recorder_metadata)
+    assert list(df.columns) == ["gid", "time", "V_m"]
+    assert list(df.dtypes) == [np.int32, np.float64, np.float32]
+    assert df["gid"].tolist() == [2, 3, 4]
+    assert df["V_m"].tolist() == [-70.5, -69.0, -65.25]
+    # No temporary file is left behind
+    assert sorted(recorder_metadata.parent.iterdir()) == sorted(
+        [recorder_metadata, path]
+    )
+    # Converted data isn't converted again
+    assert convert(recorder_metadata, data_format=data_format) is None
+
+
+def test_convert_unknown_format(recorder_metadata):
+    with pytest.raises(ValueError):
+        convert(recorder_metadata, data_format="csv")
+
+
+@pytest.mark.parametrize("n_workers", [1, 2])
+@pytest.mark.parametrize("engine", ["c", "pyarrow"])
+def test_load_as_df(recorder_metadata, n_workers, engine):
+    if engine == "pyarrow":
+        pytest.importorskip("pyarrow")
+    paths = sorted(recorder_metadata.parent.glob("*.dat"))
+    df = load_as_df(
+        ["gid", "time", "V_m"], *paths, n_workers=n_workers, engine=engine
+    )
+    assert list(df.dtypes) == [np.int32, np.float64, np.float64]
+    assert df["gid"].tolist() == [2, 3, 4]
+    assert df["V_m"].tolist() == [-70.5, -69.0, -65.25]
+    # Empty files only
+    df = load_as_df(["gid", "time"], paths[-1], engine=engine)
+    assert df.empty
+    assert list(df.columns) == ["gid", "time"]
+
+
+@pytest.fixture(params=["ascii", "columnar", "npz", "parquet", "feather"])
+def recorder_data(request, recorder_metadata):
+    """Path to the metadata of a multimeter's data in each format."""
+    data_format = request.param
+    if data_format in ARROW_FORMATS:
+        pytest.importorskip("pyarrow")
+    if data_format == "columnar":
+        metadata = load_yaml(recorder_metadata)
+        data = load(recorder_metadata)
+        metadata.update({
+            "format": "columnar",
+            "dtypes": {colname: str(data[colname].dtype) for colname in data},
+            "filenames": [f"multimeter-{colname}.bin" for colname in data],
+        })
+        for colname, filename in zip(data, metadata["filenames"]):
+            data[colname].to_numpy().tofile(recorder_metadata.parent / filename)
+        save_as_yaml(recorder_metadata, metadata)
+    elif data_format != "ascii":
+        convert(recorder_metadata, data_format=data_format)
+    return recorder_metadata
+
+
+def test_iter_chunks(recorder_data):
+    chunks = list(iter_chunks(recorder_data, chunksize=2))
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert pd.concat(chunks)["gid"].tolist() == [2, 3, 4]
+    assert pd.concat(chunks)["gid"].dtype == np.int32
+    # Filters
+    chunks = list(
+        iter_chunks(recorder_data, time_window=(1.0, 2.0), usecols=["V_m"])
+    )
+    assert len(chunks) == 1
+    assert list(chunks[0].columns) == ["V_m"]
+    assert chunks[0]["V_m"].tolist() == [-70.5, -69.0]
+    chunks = list(iter_chunks(recorder_data, gids=[4], time_window=(None, 2.0)))
+    assert chunks == []
+    chunks = list(iter_chunks(recorder_data, gids={3, 4}, chunksize=1))
+    assert [chunk["gid"].tolist() for chunk in chunks] == [[3], [4]]
+    with pytest.raises(ValueError):
+        list(iter_chunks(recorder_data, usecols=["rate"]))
@@ -12,6 +12,7 @@ from pathlib import Path
 
 import pytest
 
+from denest import load_trees
 from denest.parameters import ParamsTree
 
 assert len(ParamsTree.DATA_KEYS) == 2
@@ -161,6 +162,36 @@ def test_asdict(t):
     assert t == ParamsTree(t.asdict())
 
 
+def test_compile(t):
+    compiled = t.compile()
+    assert compiled == t
+    for (name, leaf), (compiled_name, compiled_leaf) in zip(
+        sorted(t.named_leaves()), sorted(compiled.named_leaves())
+    ):
+        assert name == compiled_name
+        for key in DATA_KEYS:
+            assert type(compiled_leaf.data[key]) is dict
+            assert compiled_leaf.data[key] == dict(leaf.data[key])
+    # Inheritance from a parent outside the compiled subtree
+    c2 = t.children["c2"].compile(parent=t)
+    ccc2 = c2.children["cc2"].children["ccc2"]
+    original = t.children["c2"].children["cc2"].children["ccc2"]
+    assert ccc2.params == dict(original.params)
+    assert ccc2.nest_params["c0_2"] == "2"
+
+
+def test_compiled(t):
+    c2 = t.children["c2"]
+    compiled = c2.compiled()
+    assert compiled == c2.compile(parent=t)
+    assert compiled.nest_params["c0_2"] == "2"
+    # Cached until the tree is modified
+    assert c2.compiled() is compiled
+    t[DK2]["c0_2"] = "modified"
+    assert c2.compiled() is not compiled
+    assert c2.compiled().nest_params["c0_2"] == "modified"
+
+
 @pytest.fixture
 def trees():
     return [
@@ -255,3 +286,167 @@ def test_merge_access_traversal(merged):
 def test_merge_children(merged):
     assert set(merged.children.keys()) == set(["hi", 0, 1, 2])
 
+
+def test_copy(t):
+    copy = t.copy()
+    assert copy == t
+    # Copies are independent
+    leaf = copy.children["c2"].children["cc2"].children["ccc2"]
+    leaf[DK1]["a"] = "modified"
+    leaf[DK1]["new"] = "new"
+    original = t.children["c2"].children["cc2"].children["ccc2"]
+    assert original[DK1]["a"] == "ccc2_a1"
+    assert "new" not in original[DK1]
+    # Copied children inherit from the copy
+    copy[DK1]["c0_1"] = "modified"
+    assert leaf[DK1]["c0_1"] == "modified"
+    assert original[DK1]["c0_1"] == "1"
+
+
+def test_copy_on_write(t):
+    # Modifying the original after copying doesn't affect the copy, whether
+    # or not the shared subtrees were built
+    t.children
+    copy = t.copy()
+    leaf = t.children["c2"].children["cc2"].children["ccc2"]
+    leaf[DK1]["a"] = "modified"
+    t.children["c1"][DK1]["new"] = "new"
+    t.children["c3"].children["new_child"] = ParamsTree({}, parent=t, name="x")
+    copied_leaf = copy.children["c2"].children["cc2"].children["ccc2"]
+    assert copied_leaf[DK1]["a"] == "ccc2_a1"
+    assert "new" not in copy.children["c1"][DK1]
+    assert "new_child" not in copy.children["c3"].children
+    assert copy.content_hash() != t.content_hash()
+
+
+@pytest.mark.parametrize(
+    "modify",
+    [
+        lambda params: params.__setitem__("a", "modified"),
+        lambda params: params.__delitem__("a"),
+        lambda params: params.pop("a"),
+        lambda params: params.popitem(),
+        lambda params: params.clear(),
+        lambda params: params.update({"a": "modified"}),
+        lambda params: params.setdefault("new", "new"),
+        lambda params: params.__ior__({"a": "modified"}),
+    ],
+)
+def test_copy_on_write_params(t, modify):
+    t.children
+    copy = t.copy()
+    modify(t.children["c1"][DK1])
+    assert copy.children["c1"].node_data[DK1] == {"a": "c1_a1", "b": "c1_b1"}
+
+
+@pytest.mark.parametrize(
+    "modify",
+    [
+        lambda children, new: children.__setitem__("new", new),
+        lambda children, new: children.__delitem__("cc3"),
+        lambda children, new: children.pop("cc3"),
+        lambda children, new: children.popitem(),
+        lambda children, new: children.clear(),
+        lambda children, new: children.update({"new": new}),
+        lambda children, new: children.setdefault("new", new),
+        lambda children, new: children.__ior__({"new": new}),
+    ],
+)
+def test_copy_on_write_children(t, modify):
+    t.children
+    copy = t.copy()
+    node = t.children["c3"]
+    modify(node.children, ParamsTree({}, parent=node, name="new"))
+    assert list(copy.children["c3"].children) == ["cc3"]
+
+
+def test_merge_copy_on_write(inheritance_trees):
+    override, base = inheritance_trees
+    # Built subtrees of the base tree are shared with the merged tree
+    source = base.children["intermediate2"].children["leaf1"]
+    merged = ParamsTree.merge(override, base)
+    source[DK1]["other"] = "modified"
+    leaf = merged.children["intermediate2"].children["leaf1"]
+    assert leaf[DK1]["other"] == "other"
+
+
+def test_merge_sharing(inheritance_trees):
+    override, base = inheritance_trees
+    merged = ParamsTree.merge(override, base)
+    # Subtrees that exist in one tree only are shared until accessed
+    source = base._all_children()["intermediate2"]
+    assert merged._child_sources["intermediate2"] is source
+    assert "intermediate2" not in merged._children
+    merged.children["intermediate2"].children["leaf1"][DK1]["other"] = "modified"
+    assert merged._child_sources == {}
+    assert base.children["intermediate2"].children["leaf1"][DK1]["other"] == "other"
+
+
+def test_content_hash(x, t):
+    # Stable across instances and key order
+    assert t.content_hash() == ParamsTree(x).content_hash()
+    reordered = dict(reversed(list(x.items())))
+    reordered[DK1] = dict(reversed(list(x[DK1].items())))
+    assert ParamsTree(reordered).content_hash() == t.content_hash()
+    assert t.copy().content_hash() == t.content_hash()
+    # Leaves are hashed with inherited data
+    c1, c3 = t.children["c1"], t.children["c3"].children["cc3"]
+    assert c3.content_hash() != ParamsTree({}).content_hash()
+    assert c3.content_hash() == ParamsTree(
+        {key: dict(value) for key, value in c3.data.items()}
+    ).content_hash()
+    # Modifications invalidate cached hashes of the whole tree
+    before = (t.content_hash(), c1.content_hash(), c3.content_hash())
+    t[DK1]["a"] = "modified"
+    assert t.content_hash() != before[0]
+    assert c1.content_hash() == before[1]  # Value overriden by c1
+    assert c3.content_hash() != before[2]
+    before = t.content_hash()
+    t.children["new"] = ParamsTree({}, parent=t, name="new")
+    assert t.content_hash() != before
+    # In-place modifications that don't go through ``__setitem__``
+    before = t.content_hash()
+    t.children["c1"][DK1].pop("a")
+    assert t.content_hash() != before
+    before = t.content_hash()
+    t.children["c1"][DK2].clear()
+    assert t.content_hash() != before
+    before = t.content_hash()
+    t.children.update({"other": ParamsTree({}, parent=t, name="other")})
+    assert t.content_hash() != before
+
+
+def test_load_trees_cache(tmp_path):
+    cache_dir = tmp_path / "cache"
+    tree = load_trees("./params/tree_paths.yml", cache_dir=cache_dir)
+    assert len(list(cache_dir.iterdir())) == 1
+    # Loaded from cache
+    assert load_trees("./params/tree_paths.yml", cache_dir=cache_dir) == tree
+    assert len(list(cache_dir.iterdir())) == 1
+    # Override trees are part of the key
+    overrides = {"simulation": {DK1: {"output_dir": "other"}}}
+    overriden = load_trees("./params/tree_paths.yml", overrides, cache_dir=cache_dir)
+    assert len(list(cache_dir.iterdir())) == 2
+    assert overriden.children["simulation"][DK1]["output_dir"] == "other"
+    assert overriden == load_trees("./params/tree_paths.yml", overrides)
+
+
+def test_load_trees_parallel():
+    tree = load_trees("./params/tree_paths.yml")
+    assert load_trees("./params/tree_paths.yml", n_workers=2) == tree
+
+
+def test_lazy_children(x):
+    t = ParamsTree(x)
+    # Children are built on first access
+    assert not t._children
+    c2 = t._child("c2")
+    assert set(t._children) == {"c2"}
+    assert not c2._children
+    assert c2.children["cc2"].children["ccc2"][DK2]["c0_2"] == "2"
+    # Trees built from the same mapping don't share data
+    c2[DK1]["a"] = "modified"
+    assert ParamsTree(x).children["c2"][DK1]["a"] == "c2_a1"
+    # The whole mapping is validated when building the root
+    with pytest.raises(ValueError):
+        ParamsTree({"c1": {"cc1": {DK1: "not a mapping"}}})
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# test_session.py
+
+
+"""Test ``Session`` class."""
+
+import numpy as np
+import pytest
+
+from denest.session import StimulusFrames
+from denest.utils.validation import ParameterError
+
+
+def test_stimulus_frames(tmp_path):
+    rates = np.arange(3 * 2 * 2 * 1, dtype=float).reshape(3, 2, 2, 1)
+    np.save(tmp_path / "rates.npy", rates)
+    params = {
+        "layers": ["input_layer"],
+        "population_name": "input_exc",
+        "nest_params": {"rate": "rates.npy"},
+    }
+    stream = StimulusFrames("frames", params, input_dir=tmp_path)
+    assert stream.n_frames == 3
+    stream.prefetch(1)
+    stream.prefetch(3)  # Out of range: ignored
+    for frame in range(3):
+        (unit_change,) = stream.unit_changes(frame)
+        assert unit_change["from_array"]
+        assert unit_change["change_type"] == "constant"
+        assert np.array_equal(unit_change["nest_params"]["rate"], rates[frame])
+
+
+def test_stimulus_frames_mismatch(tmp_path):
+    np.save(tmp_path / "a.npy", np.zeros((3, 1, 1, 1)))
+    np.save(tmp_path / "b.npy", np.zeros((2, 1, 1, 1)))
+    params = {
+        "layers": ["input_layer"],
+        "nest_params": {"rate": "a.npy", "start": "b.npy"},
+    }
+    with pytest.raises(ParameterError):
+        StimulusFrames("frames", params, input_dir=tmp_path)
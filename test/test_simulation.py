@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# test_simulation.py
+
+"""Test ``Simulation`` class."""
+
+import json
+
+import nest
+import numpy as np
+import pytest
+
+import denest
+from denest.io.load import (
+    load, load_session_times, load_yaml, metadata_paths, output_path
+)
+from denest.io.save import output_subdir
+
+PARAMS_PATH = "./params/tree_paths.yml"
+INPUT_DIR = "./params/input"
+
+
+@pytest.fixture
+def simulation(tmp_path):
+    tree = denest.load_trees(PARAMS_PATH)
+    sim = denest.Simulation(
+        tree, input_dir=INPUT_DIR, output_dir=str(tmp_path / "first")
+    )
+    sim.run()
+    return sim
+
+
+def test_rerun(simulation, tmp_path):
+    end = nest.GetKernelStatus("time")
+    network_size = nest.GetKernelStatus("network_size")
+    output_dir = tmp_path / "second"
+    simulation.rerun(str(output_dir), sessions=["warmup"])
+    # The network is not rebuilt
+    assert nest.GetKernelStatus("network_size") == network_size
+    # Sessions start at the current kernel time
+    session_times = load_session_times(output_dir)
+    assert list(session_times) == ["00_warmup"]
+    assert session_times["00_warmup"][0] == end
+    tree = load_yaml(output_path(output_dir, "tree"))
+    assert tree["simulation"]["params"]["output_dir"] == str(output_dir)
+    assert tree["simulation"]["params"]["sessions"] == ["warmup"]
+    # Raw data is saved in the new output directory
+    assert any(output_subdir(output_dir, "raw_data").iterdir())
+    # The instrumentation report only contains the phases of the rerun
+    report = json.loads(output_path(output_dir, "instrumentation").read_text())
+    phases = {record["phase"] for record in report["records"]}
+    assert "save_metadata" in phases
+    assert "create_network" not in phases
+    assert simulation.network.instrumentation is simulation.instrumentation
+
+
+def test_rerun_restore_state(simulation, tmp_path):
+    layer = simulation.network.layers["input_layer"]
+    gids = layer.gids(population="input_exc")
+    initial = layer._initial_state["input_exc"]["rate"]
+    assert list(nest.GetStatus(gids, "rate")) != initial
+    simulation.rerun(str(tmp_path / "second"), sessions=[])
+    assert list(nest.GetStatus(gids, "rate")) == initial
+
+
+def test_checkpoint(tmp_path):
+    tree = denest.load_trees(PARAMS_PATH)
+    tree.children["session_models"].children["warmup"].params["checkpoint"] = True
+    first = denest.Simulation(
+        tree, input_dir=INPUT_DIR, output_dir=str(tmp_path / "first")
+    )
+    first.run()
+    path = output_path(first.output_dir, "checkpoint", first.sessions[0].name)
+    assert path.exists()
+    projection = first.network.projections[0]
+    weights = projection.get_weights()
+    # Modify the weights so that the restored checkpoint differs from the
+    # state of a freshly built network
+    projection.set_weights(weights[0], weights[1], weights[2] + 1.0)
+    first.network.save_checkpoint(tmp_path / "checkpoint.npz")
+
+    tree.children["simulation"].params["restore_checkpoint"] = str(
+        tmp_path / "checkpoint.npz"
+    )
+    second = denest.Simulation(
+        tree, input_dir=INPUT_DIR, output_dir=str(tmp_path / "second")
+    )
+    # The kernel time is not restored
+    assert nest.GetKernelStatus("time") == 0.0
+    with np.load(tmp_path / "checkpoint.npz") as checkpoint:
+        assert "time" not in checkpoint.files
+    restored = second.network.projections[0].get_weights()
+    for restored_values, values in zip(restored, weights[:2]):
+        assert list(restored_values) == list(values)
+    assert list(restored[2]) == list(weights[2] + 1.0)
+    layer = second.network.layers["input_layer"]
+    state = first.network.layers["input_layer"].get_dynamic_state("input_exc")
+    assert state
+    for param_name, values in layer.get_dynamic_state("input_exc").items():
+        assert (values == state[param_name]).all()
+
+
+def test_checkpoint_spike_generators(tmp_path):
+    nest.ResetKernel()
+    network = denest.Network(
+        denest.ParamsTree(
+            {
+                "neuron_models": {
+                    "generator": {"params": {"nest_model": "spike_generator"}}
+                },
+                "layers": {
+                    "params": {"type": None},
+                    "nest_params": {"rows": 2, "columns": 3},
+                    "l": {"params": {"populations": {"generator": 1}}},
+                },
+            }
+        )
+    )
+    network.create()
+    layer = network.layers["l"]
+    layer.set_state(nest_params={"origin": 5.0}, population_name="generator")
+    network.save_checkpoint(tmp_path / "numeric.npz")
+    with np.load(tmp_path / "numeric.npz") as checkpoint:
+        assert (checkpoint["units/l/generator/origin"] == 5.0).all()
+    # List-valued parameters can't be checkpointed
+    layer.set_state(
+        nest_params={"spike_times": [1.0, 2.0]}, population_name="generator"
+    )
+    with pytest.raises(ValueError, match="spike_times"):
+        network.save_checkpoint(tmp_path / "spike_times.npz")
+    assert not (tmp_path / "spike_times.npz").exists()
+
+
+def test_instrumentation(simulation):
+    summary = simulation.instrumentation.summary()
+    for phase in [
+        "init_kernel",
+        "create_network",
+        "network.build_layers",
+        "network.create.layers",
+        "network.create.projections",
+        "save_metadata",
+    ]:
+        assert summary[phase]["count"] == 1
+    n_sessions = len(simulation.sessions)
+    assert summary["session.initialize"]["count"] == n_sessions
+    assert summary["session.simulate"]["count"] == n_sessions
+    # Nested phases
+    records = simulation.instrumentation.records
+    create_network = next(r for r in records if r["phase"] == "create_network")
+    build_layers = next(r for r in records if r["phase"] == "network.build_layers")
+    assert build_layers["depth"] == create_network["depth"] + 1
+    assert all(record["duration"] >= 0 for record in records)
+    report_path = output_path(simulation.output_dir, "instrumentation")
+    report = json.loads(report_path.read_text())
+    assert report["summary"] == summary
+
+
+def test_convert_recorder_data(tmp_path):
+    tree = denest.load_trees(
+        PARAMS_PATH,
+        {
+            "simulation": {
+                "params": {"recorder_data_format": "npz", "delete_ascii_data": True}
+            }
+        },
+    )
+    sim = denest.Simulation(tree, input_dir=INPUT_DIR, output_dir=str(tmp_path))
+    sim.run()
+    assert sim.instrumentation.summary()["convert_recorder_data"]["count"] == 1
+    converted = 0
+    for metadata_path in metadata_paths(tmp_path):
+        metadata = load_yaml(metadata_path)
+        if metadata["colnames"] is None:
+            continue
+        assert metadata["format"] == "npz"
+        assert load(metadata_path)["gid"].dtype == np.int32
+        converted += 1
+    assert converted
+    assert not list(output_subdir(tmp_path, "raw_data").glob("*.dat"))
+
+
+def test_harvest_recorders(tmp_path):
+    tree = denest.load_trees(
+        PARAMS_PATH,
+        {
+            "network": {
+                "recorder_models": {
+                    model: {"params": {"harvest": True}}
+                    for model in ["multimeter", "spike_detector"]
+                }
+            }
+        },
+    )
+    sim = denest.Simulation(tree, input_dir=INPUT_DIR, output_dir=str(tmp_path))
+    sim.run()
+    harvested = [
+        recorder for recorder in sim.network.get_recorders() if recorder.harvested
+    ]
+    assert harvested
+    # Events are cleared from memory after each session
+    gids = tuple(recorder.gid[0] for recorder in harvested)
+    assert all(n_events == 0 for n_events in nest.GetStatus(gids, "n_events"))
+    n_spikes = 0
+    for recorder in harvested:
+        metadata_path = output_path(
+            tmp_path, "recorders_metadata", recorder._label
+        ).with_suffix(".yml")
+        metadata = load_yaml(metadata_path)
+        assert metadata["format"] == "columnar"
+        data = load(metadata_path)
+        assert list(data.columns) == metadata["colnames"]
+        assert data["gid"].dtype == np.int32
+        assert set(data["gid"]) <= set(recorder.gids)
+        if recorder.type == "spike_detector":
+            n_spikes += len(data)
+    assert n_spikes
+
+
+def test_memory_recorders_not_harvested(tmp_path):
+    # Recording to memory doesn't imply harvesting
+    tree = denest.load_trees(
+        PARAMS_PATH,
+        {"network": {"recorder_models": {"nest_params": {"record_to": ["memory"]}}}},
+    )
+    sim = denest.Simulation(tree, input_dir=INPUT_DIR, output_dir=str(tmp_path))
+    sim.run()
+    recorders = list(
+        sim.network.get_population_recorders(recorder_type="spike_detector")
+    )
+    assert not any(recorder.harvested for recorder in recorders)
+    gids = tuple(recorder.gid[0] for recorder in recorders)
+    assert sum(nest.GetStatus(gids, "n_events"))
+    assert not list(output_subdir(tmp_path, "raw_data").glob("*.bin"))
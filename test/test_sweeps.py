@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# test_sweeps.py
+
+"""Test parameter sweeps."""
+
+import numpy as np
+import pytest
+
+import denest
+from denest.sweeps import SEED_STRIDE, overrides
+
+SPACE = {
+    "network/layers/params/a": [1, 2, 3],
+    ("network", "layers", "nest_params", "b"): {"min": 0.0, "max": 10.0},
+}
+
+
+def test_overrides_grid():
+    trees = list(overrides({"a/b": [1, 2], "a/c": ["x", "y", "z"]}))
+    assert len(trees) == 6
+    assert trees[0] == {"a": {"b": 1, "c": "x"}}
+    assert trees[-1] == {"a": {"b": 2, "c": "z"}}
+
+
+@pytest.mark.parametrize("method", ["random", "latin_hypercube"])
+def test_overrides_sampling(method):
+    trees = list(overrides(SPACE, method=method, n=30, seed=0))
+    assert len(trees) == 30
+    # Deterministic
+    assert trees == list(overrides(SPACE, method=method, n=30, seed=0))
+    a = [tree["network"]["layers"]["params"]["a"] for tree in trees]
+    b = np.array([tree["network"]["layers"]["nest_params"]["b"] for tree in trees])
+    assert set(a) <= {1, 2, 3}
+    assert np.all((0.0 <= b) & (b < 10.0))
+    if method == "latin_hypercube":
+        # One draw per stratum
+        assert sorted(np.floor(b / 10.0 * 30).astype(int)) == list(range(30))
+        assert [a.count(value) for value in [1, 2, 3]] == [10, 10, 10]
+
+
+def test_overrides_errors():
+    with pytest.raises(ValueError):
+        list(overrides(SPACE, method="unknown"))
+    with pytest.raises(ValueError):
+        list(overrides(SPACE, method="random"))
+
+
+def test_sweep(tmp_path):
+    space = {"simulation/params/sessions": [["warmup"], ["warmup", "warmup"]]}
+    run_dirs = denest.sweep(
+        "./params/tree_paths.yml", space, output_dir=tmp_path,
+        input_dir="./params/input", base_seed=10,
+    )
+    assert [run_dir.name for run_dir in run_dirs] == ["run_00000", "run_00001"]
+    for index, run_dir in enumerate(run_dirs):
+        tree = denest.io.load.load_yaml(denest.io.load.output_path(run_dir, "tree"))
+        assert tree["kernel"]["params"]["nest_seed"] == 10 + index * SEED_STRIDE
+        assert tree["simulation"]["params"]["sessions"] == space[
+            "simulation/params/sessions"
+        ][index]
+    assert list(denest.io.load.load_yaml(tmp_path / "sweep.yml")) == [
+        "run_00000", "run_00001"
+    ]
+
+
+def test_sweep_lazy(tmp_path, monkeypatch):
+    drawn = []
+
+    def run(path, override_trees, output_dir, input_dir):
+        drawn.append(len(denest.io.load.load_yaml(tmp_path / "sweep.yml")))
+        return output_dir
+
+    monkeypatch.setattr(denest.sweeps, "_run", run)
+    denest.sweep(
+        "./params/tree_paths.yml", {"kernel/params/nest_seed": [1, 2, 3]},
+        output_dir=tmp_path,
+    )
+    # Each run is drawn just before it is executed
+    assert drawn == [1, 2, 3]
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# test_tracing.py
+
+"""Test the NEST call tracer."""
+
+import nest
+import nest.topology as tp
+
+from denest.network.layers import Layer
+from denest.utils.instrumentation import Instrumentation
+from denest.utils.tracing import trace_nest
+
+
+def test_trace_nest():
+    original = nest.SetStatus
+    nest.ResetKernel()
+    layer = Layer(
+        "layer", {"populations": {"iaf_psc_alpha": 2}}, {"rows": 2, "columns": 3}
+    )
+    instrumentation = Instrumentation()
+    with trace_nest() as tracer:
+        with instrumentation.phase("create"):
+            layer.create()
+        layer.set_state(nest_params={"V_m": -60.0})
+    # Original functions are restored
+    assert nest.SetStatus is original
+    set_status = [
+        call for call in tracer.report() if call["function"] == "SetStatus"
+    ]
+    assert len(set_status) == 1
+    assert set_status[0]["count"] == 1
+    assert set_status[0]["items"] == 12
+    assert set_status[0]["phase"] is None
+    assert set_status[0]["call_site"].startswith("network/layers.py:set_unit_state")
+    phases = {call["phase"] for call in tracer.report(by=("phase",))}
+    assert phases == {"create", None}
+    by_function = tracer.report(by=("function",))
+    assert set(by_function[0]) == {"function", "count", "time", "items"}
+
+
+def test_trace_connections():
+    nest.ResetKernel()
+    sources = nest.Create("iaf_psc_alpha", 3)
+    targets = nest.Create("iaf_psc_alpha", 4)
+    with trace_nest() as tracer:
+        nest.Connect(sources, targets, "all_to_all")
+    calls = tracer.report(by=("function",))
+    # Created connections are counted and their count isn't traced
+    assert [call["function"] for call in calls] == ["Connect"]
+    assert calls[0]["items"] == 12
+
+
+def test_trace_nested_calls():
+    nest.ResetKernel()
+    layer = Layer(
+        "layer", {"populations": {"iaf_psc_alpha": 2}}, {"rows": 2, "columns": 3}
+    )
+    layer.create()
+    with trace_nest() as tracer:
+        tp.ConnectLayers(
+            layer.gid,
+            layer.gid,
+            {
+                "connection_type": "divergent",
+                "synapse_model": "static_synapse",
+                "sources": {"model": "iaf_psc_alpha"},
+                "targets": {"model": "iaf_psc_alpha"},
+            },
+        )
+    # Calls made by ConnectLayers itself aren't traced
+    calls = tracer.report(by=("function",))
+    assert [call["function"] for call in calls] == ["ConnectLayers"]
+    assert calls[0]["count"] == 1
+    assert calls[0]["items"] == nest.GetKernelStatus("num_connections")